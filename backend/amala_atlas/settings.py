@@ -1,5 +1,7 @@
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 from amala_atlas.environment import ENV
 
 
@@ -37,6 +39,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'commons.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -73,9 +76,44 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # a file rather than the shared-cache in-memory default, so threaded tests get real SQLite locking
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+# DATABASE_PROFILE=production: WAL journaling with tuned pragmas, connections kept open across
+# requests, and a query-only 'replica' alias (a second connection to the same file, which WAL
+# lets read while 'default' writes) that read-only views are routed to (see commons.routers).
+DATABASE_PROFILE = ENV.str("DATABASE_PROFILE", default="development")
+if DATABASE_PROFILE == "production":
+    SQLITE_PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",  # fsync at checkpoints only; WAL still never corrupts on a crash
+        f"PRAGMA busy_timeout = {ENV.int('SQLITE_BUSY_TIMEOUT_MS', default=5000)}",
+        f"PRAGMA mmap_size = {ENV.int('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024)}",
+        f"PRAGMA cache_size = -{ENV.int('SQLITE_CACHE_KIB', default=64 * 1024)}",  # negative: KiB, not pages
+        "PRAGMA temp_store = MEMORY",
+    )
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': ENV.int("CONN_MAX_AGE", default=600),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': "; ".join(SQLITE_PRAGMAS),
+            # writers take the write lock at BEGIN and wait out busy_timeout for it, instead of
+            # failing with "database is locked" when a read transaction upgrades
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'OPTIONS': {'init_command': "; ".join((*SQLITE_PRAGMAS, "PRAGMA query_only = ON"))},
+        'TEST': {'MIRROR': 'default'},
+    }
+elif DATABASE_PROFILE != "development":
+    raise ImproperlyConfigured(f"Unknown DATABASE_PROFILE {DATABASE_PROFILE!r}, use 'development' or 'production'")
+
+DATABASE_ROUTERS = ['commons.routers.ReadReplicaRouter']
+
 AUTH_USER_MODEL = 'users.User'
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -103,6 +141,9 @@ LANGUAGE_CODE = 'en-us'
 
 TIME_ZONE = 'UTC'
 
+# Spot opening hours are local times; open_now/open_at are evaluated here (places.hours)
+OPEN_HOURS_TIME_ZONE = 'Africa/Lagos'
+
 USE_I18N = True
 
 USE_TZ = True
@@ -113,6 +154,31 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Vector tiles for /spots/tiles/{z}/{x}/{y}.pbf are cached here (see places.tiles)
+SPOT_TILE_CACHE_DIR = ENV.str("SPOT_TILE_CACHE_DIR", default=str(BASE_DIR / 'tile_cache'))
+
+# Uploaded photos and their WebP thumbnails, content-addressed (see media.storage)
+MEDIA_STORE_DIR = ENV.str("MEDIA_STORE_DIR", default=str(BASE_DIR / 'media_store'))
+MEDIA_MAX_UPLOAD_BYTES = ENV.int("MEDIA_MAX_UPLOAD_BYTES", default=10 * 1024 * 1024)
+MEDIA_FETCH_TIMEOUT = ENV.int("MEDIA_FETCH_TIMEOUT", default=15)  # seconds, importing remote photo URLs
+
+# Limits of one POST /ingest/ stream (see ingestion.services.iter_lines); bytes are counted after decompression
+INGEST_MAX_BYTES = ENV.int("INGEST_MAX_BYTES", default=256 * 1024 * 1024)
+INGEST_MAX_LINES = ENV.int("INGEST_MAX_LINES", default=500_000)
+
+# Background jobs (see commons.jobs): processed by `manage.py run_worker`, or inline after
+# commit when eager. Running jobs locked for longer than the timeout are re-queued.
+JOB_QUEUE_EAGER = ENV.bool("JOB_QUEUE_EAGER", default=False)
+JOB_LOCK_TIMEOUT = ENV.int("JOB_LOCK_TIMEOUT", default=10 * 60)
+
+# Review leases (see verification.services.claim_candidates): how long claimed candidates stay
+# reserved for a reviewer before others can claim them
+VERIFICATION_LEASE_SECONDS = ENV.int("VERIFICATION_LEASE_SECONDS", default=10 * 60)
+
+# Request metrics (see commons.metrics), scraped at /metrics. Slower requests are logged
+# to "commons.metrics.slow" with their SQL.
+METRICS_SLOW_REQUEST_MS = ENV.float("METRICS_SLOW_REQUEST_MS", default=500.0)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
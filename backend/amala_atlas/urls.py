@@ -19,7 +19,9 @@ from django.urls import path
 from django.contrib import admin
 from rest_framework import routers
 
+import commons.views
 import ingestion.views
+import media.views
 import places.views
 import verification.views
 
@@ -31,9 +33,22 @@ urlpatterns = router.urls
 
 urlpatterns += [
     path('admin/', admin.site.urls),
+    path('spots/tiles/<int:z>/<int:x>/<int:y>.pbf', places.views.SpotTileView.as_view()),
     # Not an endpoint, just for learning:: path('spot/create-spot', places.views.SpotApiView.as_view()),
     path('verify/queue/', verification.views.GetVerificationCandidateQueue.as_view()),
+    # async read path, for the ASGI application (amala_atlas.asgi)
+    path('async/spots/', places.views.AsyncSpotListView.as_view()),
+    path('async/spots/<int:pk>/', places.views.AsyncSpotDetailView.as_view()),
+    path('async/verify/queue/', verification.views.AsyncVerificationCandidateQueue.as_view()),
     path('verify/action/', verification.views.VerificationActionView.as_view()),
+    path('verify/claim/', verification.views.ClaimCandidatesView.as_view()),
+    path('verify/release/', verification.views.ReleaseCandidatesView.as_view()),
     path('ingest/', ingestion.views.IngestCandidateView.as_view()),
-    path('submit-candidate/', places.views.CandidateSubmissionView.as_view())
+    path('submit-candidate/', places.views.CandidateSubmissionView.as_view()),
+    path('submit-candidate/<uuid:public_id>/', places.views.CandidateSubmissionStatusView.as_view()),
+    path('cache/stats/', commons.views.CacheStatsView.as_view()),
+    path('metrics', commons.views.MetricsView.as_view()),
+    path('media/photos/', media.views.PhotoUploadView.as_view()),
+    path('media/<str:digest>', media.views.PhotoOriginalView.as_view()),
+    path('media/<str:digest>/<int:size>.webp', media.views.PhotoThumbnailView.as_view()),
 ]
\ No newline at end of file
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CommonsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'commons'
+
+    def ready(self):
+        from commons import metrics  # noqa: F401
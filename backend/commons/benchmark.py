@@ -0,0 +1,64 @@
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def scratch_database(alias: str = DEFAULT_DB_ALIAS):
+    """
+    Runs the block against a freshly migrated throwaway database (the test database),
+    so benchmarks never write into the real one. The test environment is set up too,
+    so the in-process test client can be used.
+    """
+    connection = connections[alias]
+    old_name = connection.settings_dict["NAME"]
+    # aliases mirroring this one (the read replica) follow it to the throwaway database
+    mirrors = {
+        mirror: connections[mirror].settings_dict["NAME"] for mirror in connections
+        if connections[mirror].settings_dict["TEST"].get("MIRROR") == alias
+    }
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    for mirror in mirrors:
+        connections[mirror].creation.set_as_test_mirror(connection.settings_dict)
+    try:
+        yield connection
+    finally:
+        for mirror, name in mirrors.items():
+            connections[mirror].close()
+            connections[mirror].settings_dict["NAME"] = name
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples_ms)
+    return {
+        "runs": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+    }
+
+
+def measure(fn: Callable[[], object], repeat: int = 50, warmup: int = 3) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
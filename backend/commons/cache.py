@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable
+
+_registry: Dict[str, "VersionedResponseCache"] = {}
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    content: bytes
+    content_type: str
+    etag: str
+
+
+class VersionedResponseCache:
+    """
+    Per-process LRU of rendered responses, bounded by entry count and total bytes.
+    Keys embed the dataset version (commons.versioning), so a write makes old entries
+    unreachable and they simply age out.
+    """
+
+    def __init__(self, name: str, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        _registry[name] = self
+
+    def get(self, key: Hashable) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: Hashable, entry: CachedResponse):
+        if len(entry.content) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.content)
+            self._entries[key] = entry
+            self._bytes += len(entry.content)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.content)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self._entries), "bytes": self._bytes,
+            }
+
+
+def all_cache_stats() -> Dict[str, Dict[str, int]]:
+    return {name: cache.stats() for name, cache in _registry.items()}
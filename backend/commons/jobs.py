@@ -0,0 +1,124 @@
+"""
+Local DB-backed job queue (no external broker).
+
+Apps register a handler per job kind with `@register("app.kind")` and enqueue work with
+`enqueue`; `manage.py run_worker` claims due jobs and runs them on a thread pool. A job is
+claimed with a conditional UPDATE (status still queued), so concurrent workers never run
+the same job twice. Failures are retried with exponential backoff until `max_attempts`;
+handlers must be idempotent, since a job whose worker died is re-queued after JOB_LOCK_TIMEOUT.
+"""
+import logging
+import traceback
+from datetime import timedelta
+from typing import Any, Callable, Dict, List
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from commons.models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_RETRY_BASE_SECONDS = 5
+JOB_RETRY_MAX_SECONDS = 15 * 60
+
+_handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+
+
+def register(kind: str):
+    def decorator(handler: Callable[[Dict[str, Any]], Any]):
+        _handlers[kind] = handler
+        return handler
+    return decorator
+
+
+def enqueue(kind: str, payload: Dict[str, Any] | None = None, idempotency_key: str | None = None,
+            max_attempts: int = 5) -> Job:
+    """Returns the existing job when one with the same idempotency key was already enqueued."""
+    if kind not in _handlers:
+        raise ValueError(f"No job handler registered for {kind!r}")
+    if idempotency_key is not None:
+        existing = Job.objects.filter(idempotency_key=idempotency_key).first()
+        if existing is not None:
+            return existing
+    try:
+        with transaction.atomic():
+            job = Job.objects.create(kind=kind, payload=payload or {}, idempotency_key=idempotency_key,
+                                     max_attempts=max_attempts)
+    except IntegrityError:
+        return Job.objects.get(idempotency_key=idempotency_key)
+    if settings.JOB_QUEUE_EAGER:
+        transaction.on_commit(lambda: _run_eagerly(job.pk))
+    return job
+
+
+def _run_eagerly(job_id: int):
+    if Job.objects.filter(pk=job_id, status=Job.Status.QUEUED).update(
+        status=Job.Status.RUNNING, locked_by="eager", locked_at=timezone.now(), attempts=F("attempts") + 1,
+    ):
+        run_job(Job.objects.get(pk=job_id))
+
+
+def requeue_stale(timeout: timedelta | None = None) -> int:
+    """
+    Puts back jobs locked for longer than the timeout: their worker crashed or was killed mid-run.
+    Jobs that used up their attempts are failed instead, in the same UPDATE, so a job that kills
+    its worker is not run forever.
+    """
+    timeout = timeout or timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    now = timezone.now()
+    exhausted = Q(attempts__gte=F("max_attempts"))
+    return Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=now - timeout).update(
+        status=Case(When(exhausted, then=Value(Job.Status.FAILED)), default=Value(Job.Status.QUEUED)),
+        finished_at=Case(When(exhausted, then=Value(now)), default=F("finished_at")),
+        locked_by="", locked_at=None, last_modified_at=now,
+    )
+
+
+def claim(worker_id: str, limit: int) -> List[Job]:
+    now = timezone.now()
+    due = (
+        Job.objects.filter(status=Job.Status.QUEUED, run_after__lte=now)
+        .order_by("run_after", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+    claimed = []
+    for job_id in list(due):
+        if Job.objects.filter(pk=job_id, status=Job.Status.QUEUED).update(
+            status=Job.Status.RUNNING, locked_by=worker_id, locked_at=now, attempts=F("attempts") + 1,
+        ):
+            claimed.append(job_id)
+    return list(Job.objects.filter(pk__in=claimed).order_by("run_after", "id"))
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1)))
+
+
+def run_job(job: Job) -> Job:
+    """Runs a claimed job and records its outcome."""
+    handler = _handlers.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No job handler registered for {job.kind!r}")
+        result = handler(job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.Status.FAILED
+            job.finished_at = timezone.now()
+            logger.error("Job %s failed after %s attempts", job, job.attempts)
+        else:
+            job.status = Job.Status.QUEUED
+            job.run_after = timezone.now() + _retry_delay(job.attempts)
+            logger.warning("Job %s failed, retrying at %s", job, job.run_after)
+    else:
+        job.status = Job.Status.SUCCEEDED
+        job.result = result
+        job.finished_at = timezone.now()
+    job.locked_by, job.locked_at = "", None
+    job.save(update_fields=["status", "result", "last_error", "run_after", "finished_at", "locked_by", "locked_at",
+                            "last_modified_at"])
+    return job
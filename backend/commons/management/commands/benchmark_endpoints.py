@@ -0,0 +1,132 @@
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from commons.benchmark import scratch_database, summarize
+from places.models import Candidate
+from places.synthetic import generate_atlas
+from places.views import SpotViewSet
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "endpoints.json"
+
+# name -> (method, path, params for one request)
+Scenario = Tuple[str, str, Callable[[random.Random], Dict]]
+
+
+def _scenarios(candidate_ids: List[int]) -> Dict[str, Scenario]:
+    page = {"page_size": 50, "format": "json"}
+    return {
+        "GET /spots/": ("get", "/spots/", lambda rng: page),
+        "GET /spots/?city": ("get", "/spots/", lambda rng: {**page, "city": rng.choice(("Lagos", "Ibadan", "Osogbo"))}),
+        "GET /spots/?price_band": ("get", "/spots/", lambda rng: {**page, "price_band": rng.choice(("₦", "₦₦", "₦₦₦"))}),
+        "GET /spots/?tags (all)": ("get", "/spots/", lambda rng: {**page, "tags": "amala,ewedu"}),
+        "GET /spots/?tags (any)": ("get", "/spots/", lambda rng: {**page, "tags": "abula|lafun"}),
+        "GET /spots/?query": ("get", "/spots/", lambda rng: {**page, "query": rng.choice(("iya", "buka", "mama risi"))}),
+        "GET /spots/?bbox": ("get", "/spots/", lambda rng: {**page, "bbox": "3.30,6.42,3.45,6.62"}),
+        "GET /verify/queue/": ("get", "/verify/queue/", lambda rng: page),
+        "POST /verify/action/": ("post", "/verify/action/", lambda rng: {
+            "candidate_id": rng.choice(candidate_ids), "action": rng.choice(("approve", "reject")),
+        }),
+        "POST /submit-candidate/": ("post", "/submit-candidate/", lambda rng: {
+            "name": f"Iya {rng.randint(1, 10_000)} Amala", "city": "Ibadan", "price_band": "₦",
+            "lat": round(rng.uniform(7.33, 7.45), 5), "lng": round(rng.uniform(3.85, 3.98), 5), "tags": ["amala"],
+        }),
+    }
+
+
+class Command(BaseCommand):
+    help = ("Time the main endpoints in-process on a synthetic atlas (places.synthetic) in a scratch database: "
+            "p50/p95/p99 latency and queries per request. Compares against a JSON baseline and fails on "
+            "regressions beyond --threshold; --record writes the baseline instead. Spot list response "
+            "caches are cleared before every request, so the numbers are for uncached work.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--spots", type=int, default=10_000)
+        parser.add_argument("--candidates", type=int, default=None, help="Defaults to half the spots.")
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=7)
+        parser.add_argument("--only", nargs="+", default=None, help="Endpoint names to run (default: all).")
+        parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+        parser.add_argument("--record", action="store_true", help="Write the results as the new baseline.")
+        parser.add_argument("--threshold", type=float, default=0.5,
+                            help="Allowed relative p50/p95 slowdown before failing (0.5 = 50%%).")
+        parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                            help="Slowdowns smaller than this many ms are treated as noise.")
+
+    def _request(self, client: Client, connection, name: str, method: str, path: str, data: Dict) -> Tuple[float, int]:
+        SpotViewSet.response_cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            if method == "post":
+                response = client.post(path, json.dumps(data), content_type="application/json")
+            else:
+                response = client.get(path, data)
+            elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code >= 400:
+            raise CommandError(f"{name}: HTTP {response.status_code} {response.content[:200]!r}")
+        return elapsed, len(captured)
+
+    def handle(self, *args, **options):
+        candidates = options["candidates"] if options["candidates"] is not None else options["spots"] // 2
+        scale = {"spots": options["spots"], "candidates": candidates, "seed": options["seed"]}
+        rng = random.Random(options["seed"])
+
+        results = {}
+        with scratch_database() as connection:
+            generate_atlas(spots=options["spots"], candidates=candidates, submissions=candidates,
+                           verifications=candidates, seed=options["seed"])
+            candidate_ids = list(Candidate.objects.filter(status="pending_verification").values_list("id", flat=True))
+            client = Client()
+            scenarios = {
+                name: scenario for name, scenario in _scenarios(candidate_ids).items()
+                if not options["only"] or name in options["only"]
+            }
+            samples: Dict[str, List[float]] = {name: [] for name in scenarios}
+            queries: Dict[str, List[int]] = {name: [] for name in scenarios}
+            # round-robin over the endpoints, so drift in machine load spreads over all of them
+            for run in range(options["warmup"] + options["repeat"]):
+                for name, (method, path, params) in scenarios.items():
+                    elapsed, count = self._request(client, connection, name, method, path, params(rng))
+                    if run >= options["warmup"]:
+                        samples[name].append(elapsed)
+                        queries[name].append(count)
+            for name in scenarios:
+                results[name] = {**summarize(samples[name]), "queries": statistics.median_low(queries[name])}
+                self.stdout.write(f"  {name:<26} {results[name]}")
+
+        report = {"scale": scale, "endpoints": results}
+        if options["record"]:
+            options["baseline"].parent.mkdir(parents=True, exist_ok=True)
+            options["baseline"].write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Recorded baseline {options['baseline']}"))
+            return
+        if not options["baseline"].exists():
+            self.stdout.write(self.style.WARNING(f"No baseline at {options['baseline']}; run with --record"))
+            return
+
+        baseline = json.loads(options["baseline"].read_text())
+        if baseline["scale"] != scale:
+            raise CommandError(f"Baseline was recorded at {baseline['scale']}, this run is {scale}")
+        regressions = []
+        for name, current in results.items():
+            previous = baseline["endpoints"].get(name)
+            if previous is None:
+                continue
+            for stat in ("p50_ms", "p95_ms"):
+                slower = current[stat] - previous[stat]
+                if slower > options["min_delta_ms"] and current[stat] > previous[stat] * (1 + options["threshold"]):
+                    regressions.append(f"{name}: {stat} {previous[stat]}ms -> {current[stat]}ms")
+            if current["queries"] > previous["queries"]:
+                regressions.append(f"{name}: {previous['queries']} -> {current['queries']} queries per request")
+        if regressions:
+            raise CommandError("Regressions against the baseline:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
@@ -0,0 +1,50 @@
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from commons import jobs
+
+
+def _run_in_thread(job):
+    try:
+        return jobs.run_job(job)
+    finally:
+        connection.close()  # each pool thread holds its own connection
+
+
+class Command(BaseCommand):
+    help = "Process queued background jobs (see commons.jobs) on a thread pool until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit once no job is due instead of polling.")
+
+    def handle(self, *args, **options):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        threads = options["threads"]
+        processed = 0
+        self.stdout.write(f"Worker {worker_id} started with {threads} threads")
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="job") as pool:
+            try:
+                while True:
+                    close_old_connections()
+                    jobs.requeue_stale()
+                    claimed = jobs.claim(worker_id, limit=threads)
+                    if not claimed:
+                        if options["once"]:
+                            break
+                        time.sleep(options["poll_interval"])
+                        continue
+                    done, _ = wait([pool.submit(_run_in_thread, job) for job in claimed])
+                    for future in done:
+                        job = future.result()
+                        processed += 1
+                        self.stdout.write(f"{job} attempt {job.attempts}")
+            except KeyboardInterrupt:
+                pass
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} job runs"))
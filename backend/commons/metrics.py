@@ -0,0 +1,252 @@
+"""
+Per-endpoint request metrics, exposed in the Prometheus text format at /metrics.
+
+MetricsMiddleware records, per resolved URL pattern, method and status: a latency histogram,
+response sizes, DB query count and DB time (through a connection execute wrapper), and app time,
+the request time outside SQL (view code, serializers and rendering). Each thread writes only its
+own bucket, so recording takes no lock; a scrape sums the buckets. When a thread ends, its bucket
+is folded into a shared total, so servers that start a thread per request or connection do not
+accumulate buckets. Requests slower than
+settings.METRICS_SLOW_REQUEST_MS are logged to "commons.metrics.slow" with their SQL.
+"""
+import logging
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from commons.cache import all_cache_stats
+
+slow_logger = logging.getLogger("commons.metrics.slow")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+SIZE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)  # bytes
+SLOW_REQUEST_MAX_QUERIES = 50  # statements kept per request for the slow log
+UNMATCHED_ROUTE = "<unmatched>"
+
+SeriesKey = Tuple[str, str, int]  # route, method, status
+
+
+class _Series:
+    __slots__ = ("count", "seconds", "latency", "queries", "db_seconds", "app_seconds", "bytes", "sizes")
+
+    def __init__(self):
+        self.count = self.queries = self.bytes = 0
+        self.seconds = self.db_seconds = self.app_seconds = 0.0
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)  # per bucket, last one is +Inf
+        self.sizes = [0] * (len(SIZE_BUCKETS) + 1)
+
+
+class _Bucket(threading.local):
+    """One thread's series; registered once per thread so scrapes can find it, retired when it ends."""
+
+    def __init__(self):
+        self.series: Dict[SeriesKey, _Series] = {}
+        with _buckets_lock:
+            _buckets[id(self.series)] = self.series
+        weakref.finalize(threading.current_thread(), _retire, self.series)
+
+
+_buckets: Dict[int, Dict[SeriesKey, _Series]] = {}  # live threads' series, by id()
+_retired: Dict[SeriesKey, _Series] = {}  # the summed series of threads that have ended
+_buckets_lock = threading.Lock()
+
+
+def _add(total: Dict[SeriesKey, _Series], bucket: Dict[SeriesKey, _Series]):
+    for key, series in list(bucket.items()):
+        into = total.setdefault(key, _Series())
+        into.count += series.count
+        into.seconds += series.seconds
+        into.queries += series.queries
+        into.db_seconds += series.db_seconds
+        into.app_seconds += series.app_seconds
+        into.bytes += series.bytes
+        into.latency = [a + b for a, b in zip(into.latency, series.latency)]
+        into.sizes = [a + b for a, b in zip(into.sizes, series.sizes)]
+
+
+def _retire(series: Dict[SeriesKey, _Series]):
+    # the thread is gone, so nothing writes to its series any more
+    with _buckets_lock:
+        if _buckets.pop(id(series), None) is not None:
+            _add(_retired, series)
+
+
+_bucket = _Bucket()
+
+
+class _RequestStats:
+    __slots__ = ("queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: List[Tuple[float, str]] = []
+
+
+_current: ContextVar[_RequestStats | None] = ContextVar("request_metrics", default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        if len(stats.statements) < SLOW_REQUEST_MAX_QUERIES:
+            stats.statements.append((elapsed, sql))
+
+
+@receiver(connection_created)
+def _install_query_wrapper(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _route(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return match.route if match is not None and match.route else UNMATCHED_ROUTE
+
+
+def _record(request, response, stats: _RequestStats, seconds: float, size: int):
+    key = (_route(request), request.method, response.status_code)
+    series = _bucket.series.get(key)
+    if series is None:
+        series = _bucket.series[key] = _Series()
+    series.count += 1
+    series.seconds += seconds
+    series.latency[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+    series.queries += stats.queries
+    series.db_seconds += stats.db_seconds
+    series.app_seconds += max(0.0, seconds - stats.db_seconds)
+    series.bytes += size
+    series.sizes[bisect_left(SIZE_BUCKETS, size)] += 1
+    if seconds * 1000 >= settings.METRICS_SLOW_REQUEST_MS:
+        _log_slow(key, stats, seconds)
+
+
+def _log_slow(key: SeriesKey, stats: _RequestStats, seconds: float):
+    statements = "".join(f"\n  {elapsed * 1000:8.2f}ms  {sql}" for elapsed, sql in sorted(stats.statements, reverse=True))
+    slow_logger.warning("Slow request %s %s -> %s: %.1fms, %d queries in %.1fms%s", key[1], key[0], key[2],
+                        seconds * 1000, stats.queries, stats.db_seconds * 1000, statements)
+
+
+def _size(response) -> int:
+    return 0 if response.streaming else len(response.content)
+
+
+class MetricsMiddleware:
+    """Outermost middleware, so the latency covers the whole stack. Works under WSGI and ASGI."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = _RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        _record(request, response, stats, time.perf_counter() - started, _size(response))
+        return response
+
+    async def __acall__(self, request):
+        stats = _RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        _record(request, response, stats, time.perf_counter() - started, _size(response))
+        return response
+
+
+def _merged() -> Dict[SeriesKey, _Series]:
+    merged: Dict[SeriesKey, _Series] = {}
+    with _buckets_lock:
+        _add(merged, _retired)
+        for bucket in _buckets.values():
+            _add(merged, bucket)
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: SeriesKey) -> str:
+    route, method, status = key
+    return f'route="{_escape(route)}",method="{method}",status="{status}"'
+
+
+def _histogram(name: str, labels: str, bounds: Tuple, counts: List[int], total: float) -> Iterator[str]:
+    cumulative = 0
+    for bound, count in zip(bounds, counts):
+        cumulative += count
+        yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+    yield f'{name}_bucket{{{labels},le="+Inf"}} {cumulative + counts[-1]}'
+    yield f"{name}_sum{{{labels}}} {total}"
+    yield f"{name}_count{{{labels}}} {cumulative + counts[-1]}"
+
+
+def render_prometheus() -> str:
+    series = sorted(_merged().items())
+    lines = [
+        "# HELP http_request_duration_seconds Request latency, whole middleware stack.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for key, values in series:
+        lines += _histogram("http_request_duration_seconds", _labels(key), LATENCY_BUCKETS, values.latency, values.seconds)
+    lines += [
+        "# HELP http_response_size_bytes Response body size; 0 for streamed responses.",
+        "# TYPE http_response_size_bytes histogram",
+    ]
+    for key, values in series:
+        lines += _histogram("http_response_size_bytes", _labels(key), SIZE_BUCKETS, values.sizes, values.bytes)
+    counters = (
+        ("http_request_db_queries_total", "SQL statements executed.", "queries"),
+        ("http_request_db_seconds_total", "Time spent executing SQL.", "db_seconds"),
+        ("http_request_app_seconds_total", "Request time outside SQL: view code, serializers and rendering.",
+         "app_seconds"),
+    )
+    for name, help_text, attribute in counters:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        lines += [f"{name}{{{_labels(key)}}} {getattr(values, attribute)}" for key, values in series]
+
+    caches = sorted(all_cache_stats().items())
+    for stat, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"),
+                       ("entries", "gauge"), ("bytes", "gauge")):
+        name = f"response_cache_{stat}" + ("_total" if kind == "counter" else "")
+        lines += [f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{cache="{_escape(cache)}"}} {values[stat]}' for cache, values in caches]
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Drops every recorded series (tests and benchmarks)."""
+    with _buckets_lock:
+        _retired.clear()
+        for bucket in _buckets.values():
+            bucket.clear()
@@ -2,6 +2,7 @@ import uuid
 from typing import ClassVar
 
 from django.db import models
+from django.utils import timezone
 
 # Create your models here.
 class BaseModel(models.Model):
@@ -14,3 +15,47 @@ class BaseModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+"""
+Monotonic change counter per dataset (e.g. "spots"), bumped on every write; see commons.versioning
+"""
+class DatasetVersion(models.Model):
+    key     = models.CharField(max_length=64, unique=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key}@{self.version}"
+
+
+"""
+Unit of background work for the local job queue; see commons.jobs and `manage.py run_worker`
+"""
+class Job(BaseModel):
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    kind            = models.CharField(max_length=100)
+    payload         = models.JSONField(default=dict, blank=True)
+    idempotency_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    status          = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    attempts        = models.PositiveIntegerField(default=0)
+    max_attempts    = models.PositiveIntegerField(default=5)
+    run_after       = models.DateTimeField(default=timezone.now)
+    locked_by       = models.CharField(max_length=100, blank=True)
+    locked_at       = models.DateTimeField(null=True, blank=True)
+    finished_at     = models.DateTimeField(null=True, blank=True)
+    result          = models.JSONField(null=True, blank=True)
+    last_error      = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.kind}#{self.pk} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after", "id"]),
+        ]
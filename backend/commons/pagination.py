@@ -0,0 +1,106 @@
+import base64
+import json
+from typing import Any, List, Sequence
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Forward-only cursor pagination over a composite, unique ordering (e.g. ("-created_at", "-id")).
+
+    Each page is a single indexed range scan: the cursor carries the ordering values of the last row
+    served and the next page is `WHERE (k1, k2, ...) < (v1, v2, ...)`, so page cost does not grow with
+    depth the way OFFSET does. Pagination only kicks in when `cursor` or `page_size` is passed; without
+    them the view keeps returning the full, unpaginated list.
+    """
+    ordering: Sequence[str] = ("-created_at", "-id")
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    default_page_size = 50
+    max_page_size = 500
+    invalid_cursor_message = "Invalid cursor"
+
+    def _page_queryset(self, queryset: QuerySet, request) -> QuerySet | None:
+        """The rows of the requested page plus one (tells whether a next page exists); None when unpaginated."""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor is None and self.page_size_query_param not in request.query_params:
+            return None
+        self.request = request
+        self.model = queryset.model
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode_cursor(cursor)))
+        return queryset[:self.page_size + 1]
+
+    def _page(self, rows: List[Any]) -> List[Any]:
+        self.next_position = self._position(rows[self.page_size - 1]) if len(rows) > self.page_size else None
+        return rows[:self.page_size]
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None):
+        queryset = self._page_queryset(queryset, request)
+        return None if queryset is None else self._page(list(queryset))
+
+    async def apaginate_queryset(self, queryset: QuerySet, request, view=None):
+        """paginate_queryset for async views, fetching the page through the async ORM."""
+        queryset = self._page_queryset(queryset, request)
+        return None if queryset is None else self._page([row async for row in queryset])
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.default_page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {"next": {"type": "string", "nullable": True, "format": "uri"}, "results": schema},
+        }
+
+    def _fields(self):
+        return [(name.lstrip("-"), name.startswith("-")) for name in self.ordering]
+
+    def _position(self, row) -> List[Any]:
+        return [self.model._meta.get_field(name).value_to_string(row) for name, _ in self._fields()]
+
+    def _after(self, position: List[Any]) -> Q:
+        """Lexicographic "comes after" for the ordering: (a > x) OR (a = x AND b > y) OR ..."""
+        condition, equal = Q(), Q()
+        for (name, descending), value in zip(self._fields(), position):
+            lookup = "lt" if descending else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, position: List[Any]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> List[Any]:
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            fields = self._fields()
+            if not isinstance(position, list) or len(position) != len(fields):
+                raise ValueError
+            return [self.model._meta.get_field(name).to_python(value) for (name, _), value in zip(fields, position)]
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
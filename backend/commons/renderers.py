@@ -0,0 +1,62 @@
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def _dumps(item) -> str:
+    return json.dumps(item, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON (?format=ndjson). Views stream large lists through `stream_ndjson`
+    instead; this renderer only handles the non-streamed responses, e.g. errors.
+    """
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        items = data if isinstance(data, list) else [data]
+        return "".join(_dumps(item) + "\n" for item in items).encode(self.charset)
+
+
+def stream_ndjson(queryset, serializer_class, context=None, chunk_size: int = 2000) -> StreamingHttpResponse:
+    """Serializes the queryset chunk by chunk as it is written, so memory stays flat on the full set."""
+    def lines():
+        chunk = []
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) == chunk_size:
+                yield "".join(_dumps(item) + "\n" for item in serializer_class(chunk, many=True, context=context).data)
+                chunk = []
+        if chunk:
+            yield "".join(_dumps(item) + "\n" for item in serializer_class(chunk, many=True, context=context).data)
+
+    return StreamingHttpResponse(lines(), content_type=NDJSONRenderer.media_type)
+
+
+def stream_values_ndjson(queryset, representation, chunk_size: int = 2000) -> StreamingHttpResponse:
+    """stream_ndjson from `.values_list()` rows, see commons.serialization.ValuesRepresentation."""
+    def lines():
+        for chunk in representation.iter_chunks(queryset, chunk_size):
+            yield "".join(_dumps(item) + "\n" for item in chunk)
+
+    return StreamingHttpResponse(lines(), content_type=NDJSONRenderer.media_type)
+
+
+def astream_ndjson(queryset, serializer_class, context=None, chunk_size: int = 2000) -> StreamingHttpResponse:
+    """stream_ndjson for async views: rows are fetched through the async ORM between writes."""
+    async def lines():
+        chunk = []
+        async for obj in queryset.aiterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) == chunk_size:
+                yield "".join(_dumps(item) + "\n" for item in serializer_class(chunk, many=True, context=context).data)
+                chunk = []
+        if chunk:
+            yield "".join(_dumps(item) + "\n" for item in serializer_class(chunk, many=True, context=context).data)
+
+    return StreamingHttpResponse(lines(), content_type=NDJSONRenderer.media_type)
@@ -0,0 +1,40 @@
+"""
+Routes the reads of read-only views to the 'replica' alias, when the database profile defines one.
+
+Views opt in with commons.views.ReadReplicaMixin, which runs the request inside `read_replica()`.
+Everything else, and every write, stays on 'default'.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+READ_ALIAS = "replica"
+
+_use_replica: ContextVar[bool] = ContextVar("use_read_replica", default=False)
+
+
+@contextmanager
+def read_replica():
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReadReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and READ_ALIAS in settings.DATABASES:
+            return READ_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # both aliases open the same database
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != READ_ALIAS
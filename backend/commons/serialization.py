@@ -0,0 +1,139 @@
+"""
+Fast path for rendering long lists of a flat ModelSerializer.
+
+`ValuesRepresentation` rebuilds `serializer_class(instances, many=True).data` from
+`.values_list()` rows: no model instances, and one plain conversion per column instead of
+DRF's per-field machinery. The dicts are then encoded chunk by chunk by the same renderer
+the view negotiated, so the bytes match the serializer path exactly (places.tests holds the
+parity test). Serializers with fields it cannot reproduce are rejected up front; views fall
+back to the serializer for those.
+"""
+import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework import fields, serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+VALUES_CHUNK_SIZE = 2000
+
+# column value -> representation, bound to the timezone active when rendering
+Converter = Callable[[Any], Any]
+BindConverter = Callable[[datetime.tzinfo], Converter]
+
+
+class UnsupportedSerializer(Exception):
+    pass
+
+
+def _constant(convert: Converter) -> BindConverter:
+    return lambda zone: convert
+
+
+def _identity(value):
+    return value
+
+
+def _datetime_converter(field: fields.DateTimeField) -> BindConverter:
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None:
+        return _constant(_identity)
+    if getattr(field, "timezone", None) is not None or output_format.lower() != fields.ISO_8601:
+        raise UnsupportedSerializer(f"DateTimeField {field.field_name!r} with a custom format or timezone")
+
+    def bind(zone: datetime.tzinfo) -> Converter:
+        def convert(value: datetime.datetime):
+            # DateTimeField.enforce_timezone + ISO 8601
+            if isinstance(value, str):
+                return value
+            value = value.astimezone(zone) if value.tzinfo is not None else timezone.make_aware(value, zone)
+            text = value.isoformat()
+            return text[:-6] + "Z" if text.endswith("+00:00") else text
+        return convert
+    return bind
+
+
+def _uuid_converter(field: fields.UUIDField) -> BindConverter:
+    if field.uuid_format != "hex_verbose":
+        return _constant(lambda value: getattr(value, field.uuid_format))
+    return _constant(str)
+
+
+def _json_converter(field: fields.JSONField) -> BindConverter:
+    if field.binary:
+        raise UnsupportedSerializer(f"binary JSONField {field.field_name!r}")
+    return _constant(_identity)
+
+
+def _bigint_converter(field) -> BindConverter:
+    if getattr(field, "coerce_to_string", api_settings.COERCE_BIGINT_TO_STRING):
+        raise UnsupportedSerializer(f"BigIntegerField {field.field_name!r} coerced to string")
+    return _constant(int)
+
+
+# exact field classes only: a subclass may override to_representation
+_CONVERTERS: Dict[type, Callable[[fields.Field], BindConverter]] = {
+    fields.IntegerField: lambda field: _constant(int),
+    fields.FloatField: lambda field: _constant(float),
+    fields.CharField: lambda field: _constant(str),
+    fields.EmailField: lambda field: _constant(str),
+    fields.URLField: lambda field: _constant(str),
+    fields.SlugField: lambda field: _constant(str),
+    fields.UUIDField: _uuid_converter,
+    fields.DateTimeField: _datetime_converter,
+    fields.JSONField: _json_converter,
+}
+if hasattr(fields, "BigIntegerField"):  # DRF >= 3.17 maps BigIntegerField/BigAutoField to it
+    _CONVERTERS[fields.BigIntegerField] = _bigint_converter
+
+
+class ValuesRepresentation:
+
+    def __init__(self, serializer_class: type[serializers.Serializer]):
+        self.names: List[str] = []
+        self.columns: List[str] = []
+        self._converters: List[BindConverter] = []
+        for name, field in serializer_class().fields.items():
+            converter = _CONVERTERS.get(type(field))
+            if converter is None or field.source == "*" or "." in field.source:
+                raise UnsupportedSerializer(f"{serializer_class.__name__}.{name} ({type(field).__name__})")
+            self.names.append(name)
+            self.columns.append(field.source)
+            self._converters.append(converter(field))
+
+    def converters(self) -> List[Tuple[str, Converter]]:
+        """(name, converter) per column, for the timezone active now."""
+        zone = timezone.get_current_timezone()
+        return [(name, bind(zone)) for name, bind in zip(self.names, self._converters)]
+
+    def iter_chunks(self, queryset: QuerySet, chunk_size: int = VALUES_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        converters = self.converters()
+        chunk = []
+        for row in queryset.values_list(*self.columns).iterator(chunk_size=chunk_size):
+            chunk.append({
+                name: None if value is None else convert(value)
+                for (name, convert), value in zip(converters, row)
+            })
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def render_json_list(chunks: Iterable[List[Dict[str, Any]]], renderer: JSONRenderer,
+                     accepted_media_type: str | None = None, renderer_context: Dict | None = None) -> bytes:
+    """
+    The JSON array of all chunks, each encoded by `renderer` into one growing buffer, so only a
+    chunk of dicts is alive at a time. Compact output only: indentation spans chunk boundaries.
+    """
+    buffer = bytearray(b"[")
+    for chunk in chunks:
+        encoded = renderer.render(chunk, accepted_media_type, renderer_context)
+        if len(buffer) > 1:
+            buffer += b","
+        buffer += memoryview(encoded)[1:-1]
+    buffer += b"]"
+    return bytes(buffer)
@@ -1,3 +1,159 @@
-from django.test import TestCase
+import gc
+import threading
+from datetime import timedelta
+from typing import Dict, List
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+
+from commons import jobs, metrics, routers
+from commons.models import Job
+from places.models import Spot
+
+
+FLAKY_JOB = "commons.tests.flaky"
+_failures_left: Dict[str, int] = {}
+
+
+@jobs.register(FLAKY_JOB)
+def _flaky(payload):
+    if _failures_left.get(payload["key"], 0) > 0:
+        _failures_left[payload["key"]] -= 1
+        raise RuntimeError("flaky")
+    return {"key": payload["key"]}
+
+
+class JobQueueTest(TestCase):
+    """Jobs are claimed by one worker, retried with exponential backoff and failed after max_attempts."""
+
+    def run_next(self) -> Job:
+        [job] = jobs.claim("worker", limit=10)
+        return jobs.run_job(job)
+
+    def test_retry_with_backoff(self):
+        _failures_left["retry"] = 2
+        job = jobs.enqueue(FLAKY_JOB, {"key": "retry"}, max_attempts=3)
+        delays = []
+        for _ in range(2):
+            started = timezone.now()
+            with self.assertLogs(jobs.logger, "WARNING"):
+                job = self.run_next()
+            self.assertEqual(job.status, Job.Status.QUEUED)
+            self.assertIn("RuntimeError: flaky", job.last_error)
+            delays.append(round((job.run_after - started).total_seconds()))
+            self.assertEqual(jobs.claim("worker", limit=10), [])  # not due yet
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.assertEqual(delays, [jobs.JOB_RETRY_BASE_SECONDS, 2 * jobs.JOB_RETRY_BASE_SECONDS])
+        job = self.run_next()
+        self.assertEqual((job.status, job.attempts, job.result), (Job.Status.SUCCEEDED, 3, {"key": "retry"}))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_fails_after_max_attempts(self):
+        _failures_left["fail"] = 10
+        job = jobs.enqueue(FLAKY_JOB, {"key": "fail"}, max_attempts=2)
+        with self.assertLogs(jobs.logger, "WARNING"):
+            self.run_next()
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs(jobs.logger, "ERROR"):
+            job = self.run_next()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+        self.assertEqual(jobs.claim("worker", limit=10), [])
+
+    def test_stale_locks(self):
+        retried = jobs.enqueue(FLAKY_JOB, {"key": "retried"}, max_attempts=2)
+        exhausted = jobs.enqueue(FLAKY_JOB, {"key": "exhausted"}, max_attempts=1)
+        jobs.claim("crashed", limit=10)
+        self.assertEqual(jobs.requeue_stale(), 0)  # still within the lock timeout
+        Job.objects.update(locked_at=timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT + 1))
+        self.assertEqual(jobs.requeue_stale(), 2)
+        retried.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual((retried.status, retried.locked_by, retried.finished_at), (Job.Status.QUEUED, "", None))
+        self.assertEqual((exhausted.status, exhausted.locked_by), (Job.Status.FAILED, ""))
+        self.assertIsNotNone(exhausted.finished_at)
+        self.assertEqual([job.pk for job in jobs.claim("worker", limit=10)], [retried.pk])
+
+    def test_claimed_once_and_idempotent_enqueue(self):
+        job = jobs.enqueue(FLAKY_JOB, {"key": "once"}, idempotency_key="once")
+        self.assertEqual(jobs.enqueue(FLAKY_JOB, {"key": "once"}, idempotency_key="once").pk, job.pk)
+        self.assertEqual([claimed.pk for claimed in jobs.claim("first", limit=10)], [job.pk])
+        self.assertEqual(jobs.claim("second", limit=10), [])
+        with self.assertRaises(ValueError):
+            jobs.enqueue("commons.tests.unknown")
+
+    def test_eager_mode(self):
+        with self.settings(JOB_QUEUE_EAGER=True), self.captureOnCommitCallbacks(execute=True):
+            job = jobs.enqueue(FLAKY_JOB, {"key": "eager"})
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.result), (Job.Status.SUCCEEDED, "", {"key": "eager"}))
+
+
+class ReadReplicaRoutingTest(TestCase):
+    """Read-only views send their reads to the 'replica' alias when the profile defines one; everything else stays on default."""
+
+    def test_router(self):
+        router = routers.ReadReplicaRouter()
+        with mock.patch.dict(settings.DATABASES, {routers.READ_ALIAS: settings.DATABASES["default"]}):
+            self.assertIsNone(router.db_for_read(Spot))
+            with routers.read_replica():
+                self.assertEqual(router.db_for_read(Spot), routers.READ_ALIAS)
+                self.assertIsNone(router.db_for_write(Spot))
+            self.assertFalse(router.allow_migrate(routers.READ_ALIAS, "places"))
+            self.assertTrue(router.allow_migrate("default", "places"))
+        with routers.read_replica():
+            self.assertIsNone(router.db_for_read(Spot))  # the development profile has no replica
+
+    def routed_reads(self, method: str, path: str, **kwargs) -> List[bool]:
+        """For each read the request made, whether it was routed inside read_replica()."""
+        reads = []
+
+        def db_for_read(router, model, **hints):
+            reads.append(routers._use_replica.get())
+
+        with mock.patch.object(routers.ReadReplicaRouter, "db_for_read", db_for_read):
+            response = getattr(self.client, method)(path, **kwargs)
+            if response.streaming:
+                b"".join(response.streaming_content)
+        return reads
+
+    def test_views(self):
+        Spot.objects.create(name="Amala Skoto", lat=6.5172, lng=3.3781, city="Lagos")
+        for path in ("/spots/?format=json&city=lagos", "/spots/?format=ndjson", "/verify/queue/?format=json"):
+            with self.subTest(path=path):
+                reads = self.routed_reads("get", path)
+                self.assertTrue(reads)
+                self.assertTrue(all(reads))
+        reads = self.routed_reads("post", "/submit-candidate/", data={"name": "Iya Basira", "city": "Ibadan"},
+                                  content_type="application/json")
+        self.assertTrue(reads)
+        self.assertFalse(any(reads))
+
+
+class MetricsThreadBucketsTest(SimpleTestCase):
+    """Threads that end are folded into the shared total instead of leaving their bucket behind."""
+
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.middleware = metrics.MetricsMiddleware(lambda request: HttpResponse(b"ok"))
+
+    def request_in_new_thread(self):
+        thread = threading.Thread(target=self.middleware, args=(RequestFactory().get("/spots/"),))
+        thread.start()
+        thread.join()
+
+    def test_ended_threads_are_retired(self):
+        self.request_in_new_thread()
+        gc.collect()
+        buckets = len(metrics._buckets)
+        for _ in range(20):
+            self.request_in_new_thread()
+        gc.collect()
+        self.assertEqual(len(metrics._buckets), buckets)
+        [series] = metrics._merged().values()
+        self.assertEqual(series.count, 21)
+        self.assertIn('http_request_duration_seconds_count{route="<unmatched>",method="GET",status="200"} 21',
+                      metrics.render_prometheus())
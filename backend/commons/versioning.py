@@ -0,0 +1,23 @@
+"""
+Per-dataset version counters, part of every response cache key (commons.views.VersionedCacheMixin).
+
+Model signals bump a dataset on each save and delete (places.signals for "spots"). Writes that
+skip the signals, such as bulk_create, queryset.update or raw SQL, must call bump_version once
+they are done, or cached responses and ETags keep serving the old rows.
+"""
+from django.db.models import F
+
+from commons.models import DatasetVersion
+
+
+def get_version(key: str) -> int:
+    return DatasetVersion.objects.filter(key=key).values_list("version", flat=True).first() or 0
+
+
+async def aget_version(key: str) -> int:
+    return await DatasetVersion.objects.filter(key=key).values_list("version", flat=True).afirst() or 0
+
+
+def bump_version(key: str):
+    if not DatasetVersion.objects.filter(key=key).update(version=F("version") + 1):
+        DatasetVersion.objects.get_or_create(key=key, defaults={"version": 1})
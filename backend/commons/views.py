@@ -1,3 +1,245 @@
-from django.shortcuts import render
+import hashlib
+from typing import Awaitable, Callable
 
-# Create your views here.
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from rest_framework import views
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from commons.cache import CachedResponse, VersionedResponseCache, all_cache_stats
+from commons.metrics import render_prometheus
+from commons.renderers import NDJSONRenderer, stream_ndjson, stream_values_ndjson
+from commons.serialization import UnsupportedSerializer, ValuesRepresentation, render_json_list
+from commons.routers import read_replica
+from commons.versioning import aget_version, get_version
+
+
+def _streamed_in_read_replica(content):
+    with read_replica():
+        yield from content
+
+
+async def _astreamed_in_read_replica(content):
+    with read_replica():
+        async for part in content:
+            yield part
+
+
+class ReadReplicaMixin:
+    """Runs the view's queries on the read-only database alias (commons.routers), streamed bodies included."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._adispatch(request, *args, **kwargs)
+        with read_replica():
+            response = super().dispatch(request, *args, **kwargs)
+        if response.streaming:
+            # the body's querysets are evaluated while it is streamed, after dispatch returned
+            response.streaming_content = _streamed_in_read_replica(response.streaming_content)
+        return response
+
+    async def _adispatch(self, request, *args, **kwargs):
+        # the async ORM runs queries in a worker thread, which inherits this context
+        with read_replica():
+            response = await super().dispatch(request, *args, **kwargs)
+        if response.streaming:
+            response.streaming_content = _astreamed_in_read_replica(response.streaming_content)
+        return response
+
+
+def _origin(request) -> tuple:
+    """Scheme and host: bodies can hold absolute URLs built from them, e.g. paginated `next` links."""
+    return request.scheme, request.get_host()
+
+
+def _query_key(params) -> tuple:
+    return tuple(sorted((name, tuple(sorted(params.getlist(name)))) for name in params))
+
+
+def _cache_entry(response) -> CachedResponse:
+    etag = '"%s"' % hashlib.blake2b(response.content, digest_size=16).hexdigest()
+    return CachedResponse(response.content, response["Content-Type"], etag)
+
+
+def _conditional_response(request, entry: CachedResponse, cache_status: str) -> HttpResponse:
+    if entry.etag in (value.strip() for value in request.headers.get("If-None-Match", "").split(",")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry.content, content_type=entry.content_type)
+    response["ETag"] = entry.etag
+    response["X-Cache"] = cache_status
+    patch_vary_headers(response, ("Accept",))
+    return response
+
+
+class NDJSONStreamingListMixin:
+    """Adds `?format=ndjson` to a list view: the whole filtered queryset, streamed one object per line."""
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            queryset = self.filter_queryset(self.get_queryset())
+            return stream_ndjson(queryset, self.get_serializer_class(), self.get_serializer_context())
+        return super().list(request, *args, **kwargs)
+
+
+class EncodedResponse(Response):
+    """A Response whose body was already encoded by its accepted renderer (see ValuesListMixin)."""
+
+    def __init__(self, content: bytes, **kwargs):
+        super().__init__(**kwargs)
+        self.encoded_content = content
+
+    @property
+    def rendered_content(self):
+        renderer = self.accepted_renderer
+        self["Content-Type"] = self.content_type or (
+            f"{renderer.media_type}; charset={renderer.charset}" if renderer.charset else renderer.media_type
+        )
+        return self.encoded_content
+
+
+class ValuesListMixin:
+    """
+    Renders unpaginated JSON lists and NDJSON streams from `.values_list()` rows
+    (commons.serialization) instead of model instances run through the serializer,
+    with byte-identical output. Paginated pages, indented or browsable output, and
+    serializers the fast path cannot reproduce take the regular route.
+    """
+
+    def list(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if renderer.format not in ("json", NDJSONRenderer.format):
+            return super().list(request, *args, **kwargs)
+        try:
+            representation = ValuesRepresentation(self.get_serializer_class())
+        except UnsupportedSerializer:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if renderer.format == NDJSONRenderer.format:
+            return stream_values_ndjson(queryset, representation)
+        context = self.get_renderer_context()
+        if not isinstance(renderer, JSONRenderer) or renderer.get_indent(request.accepted_media_type, context) is not None:
+            return super().list(request, *args, **kwargs)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return EncodedResponse(render_json_list(representation.iter_chunks(queryset), renderer, request.accepted_media_type, context))
+
+
+class VersionedCacheMixin:
+    """
+    Caches rendered list/retrieve responses keyed by (dataset version, origin, action, url kwargs,
+    media type, normalized query params) and answers If-None-Match with 304s.
+    The ETag is a hash of the body, so it is strong and stable across processes.
+    """
+    cache_dataset: str = None
+    response_cache: VersionedResponseCache = None
+    cached_actions = ("list", "retrieve")
+
+    def cache_query_params(self, params):
+        """The query params as they enter the cache key; override to resolve time-dependent ones."""
+        return params
+
+    def _response_cache_key(self, request):
+        return (
+            get_version(self.cache_dataset), _origin(request), self.action, tuple(sorted(self.kwargs.items())),
+            request.accepted_media_type, _query_key(self.cache_query_params(request.GET)),
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        self._cache_key = None
+        return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method == "GET" and self.action in self.cached_actions:
+            self._cache_key = self._response_cache_key(request)
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_or(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_or(super().retrieve, request, *args, **kwargs)
+
+    def _cached_or(self, handler, request, *args, **kwargs):
+        cached = self.response_cache.get(self._cache_key) if self._cache_key is not None else None
+        if cached is not None:
+            self._cache_key = None
+            return _conditional_response(request, cached, "HIT")
+        return handler(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._cache_key is None or not isinstance(response, Response) or response.status_code != 200:
+            return response
+        response.render()
+        entry = _cache_entry(response)
+        self.response_cache.set(self._cache_key, entry)
+        return _conditional_response(request, entry, "MISS")
+
+
+class AsyncJSONView(View):
+    """
+    Base of the async read endpoints, for the ASGI application (amala_atlas.asgi): handlers
+    await the async ORM, so a worker keeps many slow connections open at once instead of
+    parking a thread on each. Bodies are rendered with DRF's JSONRenderer, byte-identical
+    to the sync views. With `cache_dataset`/`response_cache` set, `cached` answers like
+    VersionedCacheMixin: per dataset version, with ETags and 304s. Handlers raise errors as in
+    APIView (DRF exceptions, Http404, PermissionDenied) and they are rendered by the same
+    exception handler, so error bodies match the sync views.
+    """
+    http_method_names = ["get", "head", "options"]
+    renderer = JSONRenderer()
+    cache_dataset: str = None
+    response_cache: VersionedResponseCache = None
+
+    def render(self, data, status: int = 200) -> HttpResponse:
+        return HttpResponse(self.renderer.render(data), content_type=self.renderer.media_type, status=status)
+
+    def cache_query_params(self, params):
+        """As VersionedCacheMixin.cache_query_params."""
+        return params
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except (APIException, Http404, PermissionDenied) as exc:
+            context = {"view": self, "request": request, "args": args, "kwargs": kwargs}
+            response = api_settings.EXCEPTION_HANDLER(exc, context)
+            return self.render(response.data, status=response.status_code)
+
+    async def cached(self, request, action: str, build: Callable[[], Awaitable[HttpResponse]]) -> HttpResponse:
+        key = (
+            await aget_version(self.cache_dataset), _origin(request), action, tuple(sorted(self.kwargs.items())),
+            self.renderer.media_type, _query_key(self.cache_query_params(request.GET)),
+        )
+        entry = self.response_cache.get(key)
+        if entry is not None:
+            return _conditional_response(request, entry, "HIT")
+        response = await build()
+        if response.status_code != 200 or response.streaming:
+            return response
+        entry = _cache_entry(response)
+        self.response_cache.set(key, entry)
+        return _conditional_response(request, entry, "MISS")
+
+
+class CacheStatsView(views.APIView):
+    """Hit/miss/eviction counters of every response cache in this process."""
+
+    def get(self, request):
+        return Response(all_cache_stats())
+
+
+class MetricsView(View):
+    """Request metrics (commons.metrics) and response cache stats in the Prometheus text format."""
+
+    def get(self, request):
+        return HttpResponse(render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
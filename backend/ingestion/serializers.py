@@ -0,0 +1,24 @@
+from rest_framework import serializers
+
+
+class IngestCandidateRecordSerializer(serializers.Serializer):
+    """One line of an /ingest/ NDJSON body, e.g. a row of a scraped directory."""
+    name = serializers.CharField(max_length=200)
+    address = serializers.CharField(allow_blank=True, required=False, default="")
+    city = serializers.CharField(max_length=120, allow_blank=True, required=False, default="")
+    state = serializers.CharField(max_length=120, allow_blank=True, required=False, default="")
+    country = serializers.CharField(max_length=120, allow_blank=True, required=False, default="Nigeria")
+    lat = serializers.FloatField(min_value=-90, max_value=90, allow_null=True, required=False, default=None)
+    lng = serializers.FloatField(min_value=-180, max_value=180, allow_null=True, required=False, default=None)
+    price_band = serializers.CharField(max_length=8, allow_blank=True, required=False, default="")
+    photo_url = serializers.URLField(allow_blank=True, required=False, default="")
+    tags = serializers.ListField(child=serializers.CharField(max_length=64), required=False, default=list)
+    open_hours = serializers.JSONField(allow_null=True, required=False, default=None)
+    source_url = serializers.URLField(max_length=500, allow_blank=True, required=False, default="")
+    source_kind = serializers.CharField(max_length=40, required=False, default="directory")
+    evidence = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+
+    def validate(self, attrs):
+        if (attrs['lat'] is not None) ^ (attrs['lng'] is not None):
+            raise serializers.ValidationError("Provide both lat and lng together, or leave both empty.")
+        return attrs
@@ -0,0 +1,182 @@
+"""
+Bulk candidate ingestion from NDJSON streams.
+
+Records are validated as they are read and written in batches: one dedupe lookup and one
+`bulk_create` per batch, each batch in its own transaction, so a bad line never rolls back
+the rows before it and memory stays flat however long the stream is. Only invalid lines are
+reported back one by one; created and duplicate rows are counted.
+"""
+import itertools
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from ingestion.serializers import IngestCandidateRecordSerializer
+from places import jobs as places_jobs
+from places import near_duplicates, scoring, selectors, services
+from places.models import Candidate, Submission
+
+INGEST_BATCH_SIZE = 500
+DEDUPE_LOOKUP_CHUNK = 900  # stays under SQLite's default bound-parameter limit
+
+
+class IngestLimitExceeded(Exception):
+    """The stream went past INGEST_MAX_BYTES or INGEST_MAX_LINES; `result` counts what was ingested before."""
+    result: Dict[str, Any] = None
+
+
+def iter_lines(stream, max_bytes: int | None = None, max_lines: int | None = None) -> Iterator[bytes]:
+    """
+    The stream's lines, counted and measured as they are read (after decompression), so a
+    small gzip body cannot expand into an unbounded load.
+    """
+    read = 0
+    for line_no in itertools.count(1):
+        # never reads more than one byte past the limit, even from a single endless line
+        line = stream.readline(-1 if max_bytes is None else max_bytes - read + 1)
+        if not line:
+            return
+        read += len(line)
+        if max_bytes is not None and read > max_bytes:
+            raise IngestLimitExceeded(f"Body larger than {max_bytes} bytes")
+        if max_lines is not None and line_no > max_lines:
+            raise IngestLimitExceeded(f"Body longer than {max_lines} lines")
+        yield line
+
+
+def parse_records(lines: Iterable[bytes]) -> Iterator[Tuple[int, Dict[str, Any] | None, Any]]:
+    """Yields (line number, validated record, None) or (line number, None, errors); blank lines are skipped."""
+    # one serializer validates every line, as ListSerializer does with its child:
+    # instantiating a serializer deep-copies its fields, which dominates a per-line instance
+    serializer = IngestCandidateRecordSerializer()
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield line_no, None, {"non_field_errors": [f"Invalid JSON: {exc}"]}
+            continue
+        if not isinstance(data, dict):
+            yield line_no, None, {"non_field_errors": ["Expected a JSON object."]}
+            continue
+        try:
+            yield line_no, serializer.run_validation(data), None
+        except ValidationError as exc:
+            yield line_no, None, exc.detail
+
+
+Located = Tuple[Submission, float | None, float | None, str]  # submission, lat, lng, geo_precision
+
+
+def _locate(record: Dict[str, Any]) -> Located:
+    """
+    Geocodes the record once: the dedupe lookup, the in-stream `seen` keys and the stored
+    dedupe_key must all be built from the same (possibly gazetteer centroid) coordinates.
+    """
+    # an unsaved Submission carries the record through the same geocoding/scoring as /submit-candidate/
+    sub = Submission(
+        name=record["name"], address=record["address"], city=record["city"], state=record["state"],
+        country=record["country"],
+        lat=record["lat"], lng=record["lng"], price_band=record["price_band"], photo_url=record["photo_url"],
+    )
+    return (sub, *services.geocode_if_needed(sub))
+
+
+def _build_candidate(record: Dict[str, Any], located: Located) -> Candidate:
+    sub, lat, lng, precision = located
+    signals = services.compute_signals(sub)
+    evidence = list(record["evidence"])
+    if record["source_url"]:
+        evidence.append({"kind": "ingest", "url": record["source_url"]})
+    return Candidate(
+        name=sub.name,
+        raw_address=sub.address,
+        city=sub.city,
+        country=sub.country or "Nigeria",
+        lat=lat,
+        lng=lng,
+        price_band=sub.price_band,
+        photo_url=sub.photo_url,
+        open_hours=record["open_hours"],
+        tags=services.normalize_tags(record["tags"]),
+        source_url=record["source_url"],
+        source_kind=record["source_kind"],
+        evidence=evidence,
+        signals=signals,
+        score=services.compute_score(signals),
+        scoring_version=scoring.SCORING_VERSION,
+        dedupe_key=services.make_dedupe_key(sub.name, lat, lng),
+        geo_precision=precision,
+        status="pending_verification",
+    )
+
+
+def _existing_dedupe_keys(keys: List[str]) -> Set[str]:
+    found: Set[str] = set()
+    for i in range(0, len(keys), DEDUPE_LOOKUP_CHUNK):
+        found.update(selectors.get_candidates_by_dedupe_keys(keys[i:i + DEDUPE_LOOKUP_CHUNK]).values_list("dedupe_key", flat=True))
+    return found
+
+
+def _write_batch(batch: List[Tuple[int, Dict[str, Any]]], seen: Set[str]) -> Tuple[int, int]:
+    """
+    Returns (created, duplicate). A record is a duplicate when any key in its 3x3 geohash block
+    is already stored, or was written earlier in the same stream (`seen`, shared across batches).
+    """
+    located = [_locate(record) for _, record in batch]
+    lookups = [services.make_dedupe_lookup_keys(sub.name, lat, lng) for sub, lat, lng, _ in located]
+    existing = _existing_dedupe_keys(sorted({key for keys in lookups for key in keys} - seen))
+
+    to_create: List[Candidate] = []
+    for (_, record), place, keys in zip(batch, located, lookups):
+        if any(key in seen or key in existing for key in keys):
+            continue
+        candidate = _build_candidate(record, place)
+        seen.add(candidate.dedupe_key)
+        to_create.append(candidate)
+
+    with transaction.atomic():
+        Candidate.objects.bulk_create(to_create, batch_size=INGEST_BATCH_SIZE)
+        near_duplicates.index(near_duplicates.CANDIDATE, to_create)
+        if to_create:
+            # one background job per batch: a match lookup per row would dominate the load time
+            places_jobs.enqueue_spot_suggestions([candidate.pk for candidate in to_create])
+    return len(to_create), len(batch) - len(to_create)
+
+
+def ingest_records(lines: Iterable[bytes], batch_size: int = INGEST_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Returns counts per status plus the invalid lines with their errors, in input order.
+    An IngestLimitExceeded raised by `lines` is re-raised once the records read before it are written.
+    """
+    counts = {"created": 0, "duplicate": 0, "invalid": 0}
+    errors: List[Dict[str, Any]] = []
+    seen: Set[str] = set()
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+
+    def write():
+        created, duplicate = _write_batch(batch, seen)
+        counts["created"] += created
+        counts["duplicate"] += duplicate
+        batch.clear()
+
+    try:
+        for line_no, record, line_errors in parse_records(lines):
+            if line_errors is not None:
+                counts["invalid"] += 1
+                errors.append({"line": line_no, "errors": line_errors})
+                continue
+            batch.append((line_no, record))
+            if len(batch) >= batch_size:
+                write()
+    except IngestLimitExceeded as exc:
+        if batch:
+            write()
+        exc.result = {**counts, "errors": errors}
+        raise
+    if batch:
+        write()
+    return {**counts, "errors": errors}
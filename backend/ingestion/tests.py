@@ -1,3 +1,96 @@
+import gzip
+import json
+
 from django.test import TestCase
 
-# Create your tests here.
+from ingestion import services
+from places.models import Candidate
+from users.models import User
+
+
+def ndjson(*records) -> bytes:
+    return b"".join(json.dumps(record).encode() + b"\n" for record in records)
+
+
+class IngestTestCase(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create(username="operator", is_staff=True))
+
+    def post(self, body: bytes, content_type="application/x-ndjson", status=200, **headers):
+        response = self.client.generic("POST", "/ingest/", body, content_type=content_type, **headers)
+        self.assertEqual(response.status_code, status)
+        return response.json()
+
+
+class IngestStreamTest(IngestTestCase):
+    """POST /ingest/ takes NDJSON, plain or gzipped, counts the records and reports the invalid lines."""
+
+    def test_invalid_and_blank_lines(self):
+        body = (
+            ndjson({"name": "Amala Skoto", "city": "Lagos", "lat": 6.5172, "lng": 3.3781, "tags": ["Amala", "amala"]})
+            + b"\n   \n{not json\n[1, 2]\n"
+            + ndjson({"name": "Half located", "lat": 6.5}, {"city": "Lagos"})
+        )
+        result = self.post(body)
+        self.assertEqual((result["created"], result["duplicate"], result["invalid"]), (1, 0, 4))
+        self.assertEqual([error["line"] for error in result["errors"]], [4, 5, 6, 7])
+        self.assertIn("Invalid JSON", result["errors"][0]["errors"]["non_field_errors"][0])
+        self.assertIn("name", result["errors"][3]["errors"])
+        candidate = Candidate.objects.get()
+        self.assertEqual((candidate.geo_precision, candidate.status, candidate.tags),
+                         ("address", "pending_verification", ["amala"]))
+
+    def test_gzip(self):
+        body = gzip.compress(ndjson({"name": "Iya Basira", "city": "Lagos"}, {"name": "Mama Put", "city": "Ibadan"}))
+        for headers in ({"content_type": "application/gzip"}, {"HTTP_CONTENT_ENCODING": "gzip"}):
+            with self.subTest(**headers):
+                Candidate.objects.all().delete()
+                result = self.post(body, **{"content_type": "application/x-ndjson", **headers})
+                self.assertEqual((result["created"], result["errors"]), (2, []))
+
+    def test_duplicates_across_batches(self):
+        rows = [{"name": "Amala Skoto", "lat": 6.5172, "lng": 3.3781}, {"name": "amala skoto", "lat": 6.51721, "lng": 3.37811},
+                {"name": "Iya Basira", "lat": 7.3775, "lng": 3.947}]
+        result = services.ingest_records(ndjson(*rows).splitlines(keepends=True), batch_size=1)
+        self.assertEqual((result["created"], result["duplicate"]), (2, 1))
+        self.assertEqual(Candidate.objects.count(), 2)
+
+    def test_staff_only(self):
+        body = ndjson({"name": "Iya Basira", "city": "Lagos"})
+        self.client.logout()
+        self.post(body, status=403)
+        self.client.force_login(User.objects.create(username="reviewer"))
+        self.post(body, status=403)
+        self.assertFalse(Candidate.objects.exists())
+
+    def test_limits(self):
+        # a gzip bomb: the limit applies to the decompressed stream
+        bomb = gzip.compress(b"{" + b" " * 10_000_000 + b"}\n")
+        with self.settings(INGEST_MAX_BYTES=1_000_000):
+            result = self.post(bomb, content_type="application/gzip", status=413)
+        self.assertIn("1000000 bytes", result["detail"])
+
+        rows = [{"name": f"Spot {i}", "city": "Lagos", "lat": 6.5 + i / 100, "lng": 3.3} for i in range(5)]
+        with self.settings(INGEST_MAX_LINES=3):
+            result = self.post(ndjson(*rows), status=413)
+        self.assertIn("3 lines", result["detail"])
+        self.assertEqual((result["created"], result["invalid"]), (3, 0))  # the lines read before the limit are kept
+        self.assertEqual(Candidate.objects.count(), 3)
+
+
+class IngestDedupeTest(IngestTestCase):
+    """Records are deduplicated on the coordinates they are stored with, gazetteer centroids included."""
+
+    def test_reingesting_rows_without_coordinates(self):
+        body = ndjson({"name": "Mama Put Amala", "city": "Ibadan"}, {"name": "Iya Basira", "city": "Lagos"})
+        first = self.post(body)
+        self.assertEqual((first["created"], first["duplicate"]), (2, 0))
+        second = self.post(body)
+        self.assertEqual((second["created"], second["duplicate"]), (0, 2))
+        self.assertEqual(Candidate.objects.filter(name="Mama Put Amala").count(), 1)
+
+    def test_duplicates_within_one_stream(self):
+        row = {"name": "Mama Put Amala", "city": "Ibadan"}
+        result = self.post(ndjson(row, {**row, "name": "MAMA PUT  amala!"}))
+        self.assertEqual((result["created"], result["duplicate"]), (1, 1))
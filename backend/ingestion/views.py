@@ -1,7 +1,30 @@
-from django.shortcuts import render
-from rest_framework import views
+import gzip
+
+from django.conf import settings
+from rest_framework import status, views
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from ingestion import services
 
 
-# Create your views here.
 class IngestCandidateView(views.APIView):
-    pass
\ No newline at end of file
+    """
+    Bulk candidate load, for staff: POST one JSON object per line (application/x-ndjson), optionally
+    gzip-compressed (Content-Encoding: gzip or Content-Type: application/gzip).
+    The body is read as a stream, never buffered whole, and cut off past INGEST_MAX_BYTES
+    (decompressed) or INGEST_MAX_LINES with a 413 counting what was ingested until then.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        stream = request.stream
+        if stream is None:
+            return Response({"created": 0, "duplicate": 0, "invalid": 0, "errors": []})
+        if request.headers.get("Content-Encoding") == "gzip" or request.content_type == "application/gzip":
+            stream = gzip.GzipFile(fileobj=stream)
+        lines = services.iter_lines(stream, settings.INGEST_MAX_BYTES, settings.INGEST_MAX_LINES)
+        try:
+            return Response(services.ingest_records(lines))
+        except services.IngestLimitExceeded as exc:
+            return Response({"detail": str(exc), **exc.result}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
@@ -1,3 +1,9 @@
 from django.contrib import admin
 
-# Register your models here.
+from media.models import Photo
+
+
+@admin.register(Photo)
+class PhotoAdmin(admin.ModelAdmin):
+    list_display = ('digest', 'content_type', 'width', 'height', 'size', 'thumbnails_ready', 'created_at')
+    search_fields = ('digest', 'source_url')
@@ -0,0 +1,34 @@
+from typing import Any, Dict, List
+
+from commons import jobs
+from commons.models import Job
+from media import services
+from places.models import Spot
+
+GENERATE_THUMBNAILS_JOB = "media.generate_thumbnails"
+IMPORT_SPOT_PHOTOS_JOB = "media.import_spot_photos"
+
+
+def enqueue_thumbnails(digests: List[str]) -> Job:
+    return jobs.enqueue(GENERATE_THUMBNAILS_JOB, {"digests": digests})
+
+
+@jobs.register(GENERATE_THUMBNAILS_JOB)
+def generate_thumbnails(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {"updated": services.generate_thumbnails(payload["digests"])}
+
+
+def has_remote_photos(spot: Spot) -> bool:
+    return any(isinstance(entry, dict) and entry.get("url") for entry in spot.photos)
+
+
+def enqueue_spot_photo_import(spot: Spot) -> Job | None:
+    """Queues the download of the spot's remote photos into the media store, if it has any."""
+    if not has_remote_photos(spot):
+        return None
+    return jobs.enqueue(IMPORT_SPOT_PHOTOS_JOB, {"spot_id": spot.pk})
+
+
+@jobs.register(IMPORT_SPOT_PHOTOS_JOB)
+def import_spot_photos(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return services.import_spot_photos(payload["spot_id"])
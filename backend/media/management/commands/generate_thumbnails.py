@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from media import services
+from media.models import Photo
+
+THUMBNAIL_BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = "Render the WebP thumbnails of every photo that does not have them yet, in a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Processes rendering thumbnails (default: one per CPU; 1 disables the pool).")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        digests = list(Photo.objects.filter(thumbnails_ready=False).order_by("id").values_list("digest", flat=True))
+        updated = 0
+        for i in range(0, len(digests), THUMBNAIL_BATCH_SIZE):
+            updated += services.generate_thumbnails(digests[i:i + THUMBNAIL_BATCH_SIZE], workers=options["workers"])
+        self.stdout.write(self.style.SUCCESS(f"Rendered thumbnails of {updated} photos in {time.perf_counter() - started:.1f}s"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from media import jobs as media_jobs
+from places.models import Spot
+
+
+class Command(BaseCommand):
+    help = "Queue the import of remote photo URLs in Spot.photos into the media store (run by `manage.py run_worker`)."
+
+    def handle(self, *args, **options):
+        queued = 0
+        for spot in Spot.objects.exclude(photos=[]).only("id", "photos").iterator(chunk_size=2000):
+            queued += media_jobs.enqueue_spot_photo_import(spot) is not None
+        self.stdout.write(self.style.SUCCESS(f"Queued photo imports for {queued} spots"))
@@ -1,3 +1,20 @@
 from django.db import models
 
-# Create your models here.
+from commons.models import BaseModel
+
+
+"""
+An uploaded image, stored once per content digest (see media.storage). The digest is the
+media id that Spot.photos entries reference; thumbnails are WebP renditions (media.thumbnails).
+"""
+class Photo(BaseModel):
+    digest        = models.CharField(max_length=64, unique=True)  # sha256 of the original bytes
+    content_type  = models.CharField(max_length=40)
+    width         = models.PositiveIntegerField()
+    height        = models.PositiveIntegerField()
+    size          = models.PositiveIntegerField()  # bytes
+    source_url    = models.URLField(max_length=500, blank=True)  # set when imported from a remote URL
+    thumbnails_ready = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.digest[:12]} {self.width}x{self.height}"
@@ -0,0 +1,29 @@
+from rest_framework import serializers
+
+from media.models import Photo
+from media.thumbnails import THUMBNAIL_SIZES
+
+
+class PhotoSerializer(serializers.ModelSerializer):
+    media_id = serializers.CharField(source="digest", read_only=True)
+    url = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Photo
+        fields = ('media_id', 'content_type', 'width', 'height', 'size', 'thumbnails_ready', 'url', 'thumbnails',
+                  'created_at')
+
+    def _absolute(self, path: str) -> str:
+        request = self.context.get("request")
+        return request.build_absolute_uri(path) if request is not None else path
+
+    def get_url(self, photo: Photo) -> str:
+        return self._absolute(f"/media/{photo.digest}")
+
+    def get_thumbnails(self, photo: Photo):
+        return {str(size): self._absolute(f"/media/{photo.digest}/{size}.webp") for size in THUMBNAIL_SIZES}
+
+
+class PhotoUploadSerializer(serializers.Serializer):
+    file = serializers.FileField()
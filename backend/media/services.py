@@ -0,0 +1,197 @@
+import http.client
+import io
+import ipaddress
+import socket
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, List, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from media import storage, thumbnails
+from media.models import Photo
+from places.models import Spot
+
+ALLOWED_FORMATS = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+
+class MediaError(Exception):
+    pass
+
+
+def _inspect(data: bytes) -> Tuple[str, int, int]:
+    """(content type, width, height) of an accepted image; MediaError otherwise."""
+    if len(data) > settings.MEDIA_MAX_UPLOAD_BYTES:
+        raise MediaError(f"Photo larger than {settings.MEDIA_MAX_UPLOAD_BYTES} bytes")
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+            image_format, (width, height) = image.format, image.size
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as exc:
+        raise MediaError(f"Not a readable image: {exc}")
+    if image_format not in ALLOWED_FORMATS:
+        raise MediaError(f"Unsupported image format {image_format}")
+    return ALLOWED_FORMATS[image_format], width, height
+
+
+def store_photo(data: bytes, source_url: str = "") -> Tuple[Photo, bool]:
+    """
+    Stores the bytes under their digest; (photo, created). Identical bytes map to the existing
+    Photo, so each image is stored once. Thumbnails are left to the caller (media.jobs).
+    """
+    digest = storage.digest_of(data)
+    existing = Photo.objects.filter(digest=digest).first()
+    if existing is not None:
+        return existing, False
+    content_type, width, height = _inspect(data)
+    storage.write_once(storage.original_path(digest), data)
+    try:
+        with transaction.atomic():
+            photo = Photo.objects.create(digest=digest, content_type=content_type, width=width, height=height,
+                                         size=len(data), source_url=source_url)
+    except IntegrityError:  # the same image uploaded concurrently
+        return Photo.objects.get(digest=digest), False
+    return photo, True
+
+
+def generate_thumbnails(digests: List[str], workers: int | None = None) -> int:
+    thumbnails.generate(digests, workers=workers)
+    return Photo.objects.filter(digest__in=digests).update(thumbnails_ready=True)
+
+
+def ensure_thumbnails(photo: Photo):
+    """Renders one photo's thumbnails inline, for a request that arrives before the job ran."""
+    thumbnails.generate([photo.digest], workers=1)
+    if not photo.thumbnails_ready:
+        Photo.objects.filter(pk=photo.pk).update(thumbnails_ready=True)
+
+
+def _check_scheme(url: str):
+    if urllib.parse.urlsplit(url).scheme not in ("http", "https"):
+        raise MediaError(f"Not an http(s) URL: {url}")
+
+
+def _public_address(host: str, port: int) -> Tuple[str, int]:
+    """
+    Resolves `host` to an address to connect to; MediaError when any of its addresses is loopback,
+    private, link-local, reserved or otherwise not public. Photo URLs come from public submissions,
+    so they must not reach into the deployment's own network (SSRF).
+    """
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as exc:
+        raise MediaError(f"Cannot resolve {host}: {exc}")
+    for *_, sockaddr in infos:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast or address.is_reserved:
+            raise MediaError(f"{host} resolves to non-public address {address}")
+    return infos[0][4][:2]
+
+
+def _create_public_connection(address, *args, **kwargs) -> socket.socket:
+    # connects to the address that was checked, so a second DNS answer cannot swap in another
+    return socket.create_connection(_public_address(*address), *args, **kwargs)
+
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_public_connection
+
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    """TLS still verifies the certificate against the URL's host name."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_public_connection
+
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+
+    def https_open(self, req):
+        return self.do_open(_PublicHTTPSConnection, req, context=self._context)
+
+
+class _PublicRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Redirect targets are opened through the same handlers, so their addresses are checked too."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        _check_scheme(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+# no ProxyHandler: through a proxy, the address checked would be the proxy's, not the photo host's
+_opener = urllib.request.build_opener(
+    urllib.request.ProxyHandler({}), _PublicHTTPHandler, _PublicHTTPSHandler, _PublicRedirectHandler,
+)
+
+
+def fetch_url(url: str) -> bytes:
+    """Downloads a remote photo from a public http(s) host, redirects included."""
+    _check_scheme(url)
+    request = urllib.request.Request(url, headers={"User-Agent": "amala-atlas/1.0"})
+    with _opener.open(request, timeout=settings.MEDIA_FETCH_TIMEOUT) as response:
+        data = response.read(settings.MEDIA_MAX_UPLOAD_BYTES + 1)
+    if len(data) > settings.MEDIA_MAX_UPLOAD_BYTES:
+        raise MediaError(f"Photo at {url} is larger than {settings.MEDIA_MAX_UPLOAD_BYTES} bytes")
+    return data
+
+
+def photo_entry(photo: Photo, **extra) -> Dict[str, Any]:
+    return {"media_id": photo.digest, "at": timezone.now().isoformat(), **extra}
+
+
+def import_spot_photos(spot_id: int) -> Dict[str, int]:
+    """
+    Replaces the spot's remote `{"url": ...}` photo entries with media references. Downloads happen
+    outside the transaction; the spot is re-read under lock before rewriting, so concurrent edits survive.
+    """
+    spot = Spot.objects.filter(pk=spot_id).only("photos").first()
+    if spot is None:
+        return {"imported": 0, "failed": 0}
+    imported: Dict[str, Photo] = {}
+    created: List[str] = []
+    failed = 0
+    for entry in spot.photos:
+        url = entry.get("url") if isinstance(entry, dict) else None
+        if not url or url in imported:
+            continue
+        try:
+            imported[url], is_new = store_photo(fetch_url(url), source_url=url)
+        except (MediaError, OSError, ValueError):
+            failed += 1
+            continue
+        if is_new:
+            created.append(imported[url].digest)
+    if created:
+        generate_thumbnails(created)
+
+    with transaction.atomic():
+        spot = Spot.objects.select_for_update().get(pk=spot_id)
+        photos, known = [], set()
+        for entry in spot.photos:
+            photo = imported.get(entry.get("url")) if isinstance(entry, dict) else None
+            if photo is not None:
+                extra = {key: value for key, value in entry.items() if key not in ("url", "media_id")}
+                entry = {"media_id": photo.digest, **extra, "source_url": entry["url"]}
+            media_id = entry.get("media_id") if isinstance(entry, dict) else None
+            if media_id is not None and media_id in known:
+                continue  # two urls of the same image
+            known.add(media_id)
+            photos.append(entry)
+        spot.photos = photos
+        spot.save(update_fields=["photos", "last_modified_at"])
+    return {"imported": len(imported), "failed": failed}
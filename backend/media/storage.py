@@ -0,0 +1,38 @@
+"""
+Content-addressed photo files under settings.MEDIA_STORE_DIR.
+
+Originals live at originals/<aa>/<digest> and thumbnails at thumbnails/<aa>/<digest>-<size>.webp,
+where <aa> is the first two hex digits of the digest. A path's content never changes, so files
+are written once (atomically) and served as immutable.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def digest_of(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def original_path(digest: str) -> Path:
+    return Path(settings.MEDIA_STORE_DIR) / "originals" / digest[:2] / digest
+
+
+def thumbnail_path(digest: str, size: int) -> Path:
+    return Path(settings.MEDIA_STORE_DIR) / "thumbnails" / digest[:2] / f"{digest}-{size}.webp"
+
+
+def write_once(path: Path, data: bytes):
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp, path)
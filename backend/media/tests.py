@@ -1,3 +1,123 @@
-from django.test import TestCase
+import hashlib
+import http.server
+import io
+import shutil
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+from PIL import Image
+
+from commons.models import Job
+from media import jobs as media_jobs
+from media import services, storage
+from media.models import Photo
+from media.thumbnails import THUMBNAIL_SIZES
+from media.views import IMMUTABLE_CACHE_CONTROL
+
+
+def image_bytes(image_format: str = "PNG", size=(1200, 800), color=(200, 120, 40)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+class PhotoStoreTest(TestCase):
+    """Uploads are stored once per content digest and served, with their WebP thumbnails, as immutable."""
+
+    def setUp(self):
+        store = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store)
+        override = self.settings(MEDIA_STORE_DIR=store)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def upload(self, data: bytes, name: str = "photo.png"):
+        return self.client.post("/media/photos/", {"file": SimpleUploadedFile(name, data)})
+
+    def test_same_bytes_are_stored_once(self):
+        data = image_bytes()
+        first = self.upload(data)
+        self.assertEqual(first.status_code, 201)
+        body = first.json()
+        self.assertEqual(body["media_id"], hashlib.sha256(data).hexdigest())
+        self.assertEqual((body["content_type"], body["width"], body["height"]), ("image/png", 1200, 800))
+        again = self.upload(data, name="renamed.png")
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json()["media_id"], body["media_id"])
+        self.assertEqual(Photo.objects.count(), 1)
+        self.assertEqual(Job.objects.filter(kind=media_jobs.GENERATE_THUMBNAILS_JOB).count(), 1)
+
+    def test_rejected_uploads(self):
+        for name, data in (("photo.gif", image_bytes("GIF")), ("photo.bmp", image_bytes("BMP")),
+                           ("notes.png", b"not an image"), ("cut.png", image_bytes()[:200])):
+            with self.subTest(name=name):
+                self.assertEqual(self.upload(data, name=name).status_code, 400)
+        with self.settings(MEDIA_MAX_UPLOAD_BYTES=1000):
+            response = self.upload(image_bytes("JPEG", size=(600, 600)))
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("larger than 1000 bytes", response.json()["error"])
+        self.assertEqual(Photo.objects.count(), 0)
+
+    def test_thumbnails(self):
+        photo, created = services.store_photo(image_bytes("JPEG"))
+        self.assertTrue(created)
+        self.assertEqual(services.generate_thumbnails([photo.digest]), 1)
+        for size in THUMBNAIL_SIZES:
+            with Image.open(storage.thumbnail_path(photo.digest, size)) as thumbnail:
+                self.assertEqual((thumbnail.format, max(thumbnail.size)), ("WEBP", min(size, 1200)))
+                self.assertAlmostEqual(thumbnail.size[0] / thumbnail.size[1], 1.5, places=1)  # aspect ratio kept
+        self.assertTrue(Photo.objects.get().thumbnails_ready)
+
+    def test_immutable_responses(self):
+        photo, _ = services.store_photo(image_bytes("WEBP", size=(300, 200)))
+        original = self.client.get(f"/media/{photo.digest}")
+        self.assertEqual((original["Content-Type"], original["Cache-Control"]), ("image/webp", IMMUTABLE_CACHE_CONTROL))
+        self.assertEqual(b"".join(original.streaming_content), storage.original_path(photo.digest).read_bytes())
+        # rendered inline on the first request, before the thumbnail job ran
+        thumbnail = self.client.get(f"/media/{photo.digest}/160.webp")
+        self.assertEqual(thumbnail.status_code, 200)
+        self.assertEqual((thumbnail["Content-Type"], thumbnail["Cache-Control"]), ("image/webp", IMMUTABLE_CACHE_CONTROL))
+        self.assertEqual(thumbnail["ETag"], f'"{photo.digest}-160"')
+        for path in (f"/media/{photo.digest}/100.webp", f"/media/{'0' * 64}", "/media/not-a-digest"):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path).status_code, 404)
+
+
+class FetchUrlTest(SimpleTestCase):
+    """Remote photo URLs come from public submissions: only public http(s) hosts are fetched."""
+
+    def test_rejects_non_public_addresses(self):
+        for url in ("http://127.0.0.1:8000/a.jpg", "http://localhost/a.jpg", "http://169.254.169.254/latest/meta-data/",
+                    "http://10.0.0.7/a.jpg", "http://[::1]/a.jpg", "http://[::ffff:127.0.0.1]/a.jpg",
+                    "https://192.168.1.1/a.jpg", "http://0.0.0.0/a.jpg"):
+            with self.subTest(url=url), self.assertRaises(services.MediaError):
+                services.fetch_url(url)
+
+    def test_rejects_other_schemes(self):
+        for url in ("file:///etc/passwd", "ftp://example.com/a.jpg", "gopher://example.com/"):
+            with self.subTest(url=url), self.assertRaises(services.MediaError):
+                services.fetch_url(url)
+
+    def test_redirects_are_checked(self):
+        class Redirect(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(302)
+                self.send_header("Location", "http://169.254.169.254/latest/meta-data/")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.HTTPServer(("127.0.0.1", 0), Redirect)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        public = services._public_address
+        # let the first hop reach the local server, as if it were a public host
+        with mock.patch.object(services, "_public_address",
+                               side_effect=lambda host, port: (host, port) if port == server.server_port else public(host, port)):
+            with self.assertRaisesRegex(services.MediaError, "169.254.169.254"):
+                services.fetch_url(f"http://127.0.0.1:{server.server_port}/a.jpg")
@@ -0,0 +1,57 @@
+"""
+WebP thumbnails, one per THUMBNAIL_SIZES entry (longest edge in pixels, never upscaled).
+
+`render` is a plain function of file paths, so batches run in a process pool: decoding and
+resizing are CPU bound and hold the GIL.
+"""
+import io
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from PIL import Image, ImageOps
+
+from media import storage
+
+THUMBNAIL_SIZES = (160, 480, 1024)
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_CHUNK_SIZE = 8  # photos per pool task
+
+
+def render(source: str, targets: Sequence[Tuple[int, str]]):
+    """Writes a WebP of `source` at each (size, path) of `targets` that does not exist yet."""
+    missing = [(size, path) for size, path in targets if not Path(path).exists()]
+    if not missing:
+        return
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        for size, path in sorted(missing, reverse=True):
+            # largest first, so each smaller size is resized from the previous one
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, "WEBP", quality=THUMBNAIL_QUALITY, method=4)
+            storage.write_once(Path(path), buffer.getvalue())
+
+
+def _jobs(digests: Sequence[str]) -> List[Tuple[str, List[Tuple[int, str]]]]:
+    return [
+        (str(storage.original_path(digest)), [(size, str(storage.thumbnail_path(digest, size))) for size in THUMBNAIL_SIZES])
+        for digest in digests
+    ]
+
+
+def _render_chunk(jobs: List[Tuple[str, List[Tuple[int, str]]]]):
+    for source, targets in jobs:
+        render(source, targets)
+
+
+def generate(digests: Sequence[str], workers: int | None = None):
+    jobs = _jobs(digests)
+    chunks = [jobs[i:i + THUMBNAIL_CHUNK_SIZE] for i in range(0, len(jobs), THUMBNAIL_CHUNK_SIZE)]
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            _render_chunk(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(_render_chunk, chunks))
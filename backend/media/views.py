@@ -1,3 +1,69 @@
-from django.shortcuts import render
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.views import View
+from rest_framework import generics, status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
 
-# Create your views here.
+from media import jobs as media_jobs
+from media import services, storage
+from media.models import Photo
+from media.serializers import PhotoSerializer, PhotoUploadSerializer
+from media.thumbnails import THUMBNAIL_SIZES
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+"""
+POST /media/photos/ (multipart, field `file`): stores a JPEG, PNG or WebP photo by content digest
+and queues its WebP thumbnails. 201 for a new image, 200 when the same bytes were uploaded before.
+The returned media_id is what Spot.photos entries and Submission.photo_id reference.
+"""
+class PhotoUploadView(generics.CreateAPIView):
+    serializer_class = PhotoUploadSerializer
+    parser_classes = [MultiPartParser]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            photo, created = services.store_photo(serializer.validated_data["file"].read())
+        except services.MediaError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if created:
+            media_jobs.enqueue_thumbnails([photo.digest])
+        return Response(PhotoSerializer(photo, context=self.get_serializer_context()).data,
+                        status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+def _immutable(response: FileResponse, etag: str) -> FileResponse:
+    response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    response["ETag"] = f'"{etag}"'
+    return response
+
+
+"""
+/media/{media_id} : the original bytes. The URL names the content, so it is cached forever.
+"""
+class PhotoOriginalView(View):
+
+    def get(self, request, digest):
+        if not storage.DIGEST_RE.match(digest):
+            raise Http404("Not a media id")
+        photo = get_object_or_404(Photo.objects.only("digest", "content_type"), digest=digest)
+        return _immutable(FileResponse(storage.original_path(digest).open("rb"), content_type=photo.content_type), digest)
+
+
+"""
+/media/{media_id}/{size}.webp : WebP thumbnail with the longest edge at most `size` pixels
+(one of media.thumbnails.THUMBNAIL_SIZES). Rendered inline if the thumbnail job has not run yet.
+"""
+class PhotoThumbnailView(View):
+
+    def get(self, request, digest, size):
+        if size not in THUMBNAIL_SIZES or not storage.DIGEST_RE.match(digest):
+            raise Http404("Unknown thumbnail")
+        path = storage.thumbnail_path(digest, size)
+        if not path.exists():
+            services.ensure_thumbnails(get_object_or_404(Photo, digest=digest))
+        return _immutable(FileResponse(path.open("rb"), content_type="image/webp"), f"{digest}-{size}")
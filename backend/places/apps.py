@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def _install_side_indexes(sender, using, **kwargs):
+    from django.db import connections
+
+    from places.indexes import install_side_indexes
+    install_side_indexes(connections[using])
 
 
 class PlacesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'places'
+
+    def ready(self):
+        from places import jobs, signals  # noqa: F401
+        post_migrate.connect(_install_side_indexes, sender=self)
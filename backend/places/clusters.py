@@ -0,0 +1,142 @@
+"""
+Grid clusters of spots per map zoom level.
+
+A zoom level is split into web-mercator cells of CLUSTER_CELL_PX pixels; each cell at zoom z
+is the union of four cells at z + 1, so the levels form a quadtree hierarchy. Cells are
+maintained incrementally as spots are saved/deleted (see places.signals), touching every level
+in a handful of statements, and can be rebuilt from scratch with `manage.py rebuild_spot_clusters`.
+"""
+import math
+from functools import reduce
+from operator import or_
+from typing import Iterable, List, Tuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F, Q, QuerySet
+
+from places import selectors
+from places.geo import MAX_MERCATOR_LAT, mercator_cell, mercator_cell_bounds
+from places.models import Spot, SpotCluster
+
+CLUSTER_MIN_ZOOM = 0
+CLUSTER_MAX_ZOOM = 16
+CLUSTER_CELL_PX = 64
+CLUSTER_MAX_CELLS = 4096  # per bbox query: wider viewports are answered from a coarser level
+_CELL_BITS = int(math.log2(256 // CLUSTER_CELL_PX))
+
+
+def _grid_size(zoom: int) -> int:
+    return 1 << (zoom + _CELL_BITS)
+
+
+def cell_for(lat: float, lng: float, zoom: int) -> Tuple[int, int]:
+    return mercator_cell(lat, lng, _grid_size(zoom))
+
+
+def cells_for(lats: np.ndarray, lngs: np.ndarray, zoom: int) -> Tuple[np.ndarray, np.ndarray]:
+    n = _grid_size(zoom)
+    lats = np.radians(np.clip(lats, -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+    x = np.floor((lngs + 180.0) / 360.0 * n)
+    y = np.floor((1.0 - np.log(np.tan(lats) + 1 / np.cos(lats)) / np.pi) / 2.0 * n)
+    return np.clip(x, 0, n - 1).astype(np.int64), np.clip(y, 0, n - 1).astype(np.int64)
+
+
+def cell_bounds(zoom: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(min_lng, min_lat, max_lng, max_lat) of a cell."""
+    return mercator_cell_bounds(_grid_size(zoom), x, y)
+
+
+def _zoom_levels() -> Iterable[int]:
+    return range(CLUSTER_MIN_ZOOM, CLUSTER_MAX_ZOOM + 1)
+
+
+def _bbox_cells(zoom: int, min_lng: float, min_lat: float, max_lng: float, max_lat: float) -> Tuple[int, int, int, int]:
+    min_x, min_y = cell_for(max_lat, min_lng, zoom)
+    max_x, max_y = cell_for(min_lat, max_lng, zoom)
+    return min_x, min_y, max_x, max_y
+
+
+def clusters_in_bbox(zoom: int, min_lng: float, min_lat: float, max_lng: float, max_lat: float) -> QuerySet[SpotCluster]:
+    """
+    Clusters whose cell intersects the bbox; zooms past CLUSTER_MAX_ZOOM get the finest level.
+    The zoom is lowered until the bbox spans at most CLUSTER_MAX_CELLS cells, which bounds the
+    rows returned whatever the bbox/zoom combination (each cluster carries its zoom).
+    """
+    zoom = max(CLUSTER_MIN_ZOOM, min(CLUSTER_MAX_ZOOM, zoom))
+    min_x, min_y, max_x, max_y = _bbox_cells(zoom, min_lng, min_lat, max_lng, max_lat)
+    while zoom > CLUSTER_MIN_ZOOM and (max_x - min_x + 1) * (max_y - min_y + 1) > CLUSTER_MAX_CELLS:
+        zoom -= 1
+        min_x, min_y, max_x, max_y = _bbox_cells(zoom, min_lng, min_lat, max_lng, max_lat)
+    return (
+        SpotCluster.objects
+        .filter(zoom=zoom, cell_x__range=(min_x, max_x), cell_y__range=(min_y, max_y))
+        .select_related("representative")
+        .order_by("cell_y", "cell_x")
+    )
+
+
+def _position_cells(lat: float, lng: float) -> List[Tuple[int, int, int]]:
+    """(zoom, cell_x, cell_y) of a position at every level."""
+    return [(zoom, *cell_for(lat, lng, zoom)) for zoom in _zoom_levels()]
+
+
+def _cells_filter(cells: Iterable[Tuple[int, int, int]]) -> Q:
+    return reduce(or_, (Q(zoom=zoom, cell_x=x, cell_y=y) for zoom, x, y in cells))
+
+
+@transaction.atomic
+def add_spot(spot: Spot):
+    """One UPDATE over the spot's cells at every level, then one INSERT for the levels that had none."""
+    cells = _position_cells(spot.lat, spot.lng)
+    existing = SpotCluster.objects.filter(_cells_filter(cells))
+    updated = existing.update(count=F("count") + 1, sum_lat=F("sum_lat") + spot.lat, sum_lng=F("sum_lng") + spot.lng)
+    if updated == len(cells):
+        return
+    found = set(existing.values_list("zoom", "cell_x", "cell_y"))
+    SpotCluster.objects.bulk_create([
+        SpotCluster(zoom=zoom, cell_x=x, cell_y=y, count=1, sum_lat=spot.lat, sum_lng=spot.lng, representative=spot)
+        for zoom, x, y in cells if (zoom, x, y) not in found
+    ])
+
+
+@transaction.atomic
+def remove_spot(spot_id: int, lat: float, lng: float):
+    cells = _position_cells(lat, lng)
+    existing = SpotCluster.objects.filter(_cells_filter(cells))
+    existing.update(count=F("count") - 1, sum_lat=F("sum_lat") - lat, sum_lng=F("sum_lng") - lng)
+    existing.filter(count__lte=0).delete()
+    orphaned = existing.filter(Q(representative__isnull=True) | Q(representative_id=spot_id))
+    for cluster in orphaned:
+        bounds = cell_bounds(cluster.zoom, cluster.cell_x, cluster.cell_y)
+        in_cell = selectors.filter_spots_in_bbox(Spot.objects.exclude(id=spot_id), *bounds)
+        cluster.representative = in_cell.order_by("id").first()
+        cluster.save(update_fields=["representative"])
+
+
+@transaction.atomic
+def rebuild(batch_size: int = 5000) -> int:
+    """Recomputes every level from the spots table; returns the number of clusters written."""
+    SpotCluster.objects.all().delete()
+    rows = np.array(list(Spot.objects.order_by("id").values_list("id", "lat", "lng")), dtype=np.float64).reshape(-1, 3)
+    if not len(rows):
+        return 0
+    ids, lats, lngs = rows[:, 0].astype(np.int64), rows[:, 1], rows[:, 2]
+    written = 0
+    for zoom in _zoom_levels():
+        xs, ys = cells_for(lats, lngs, zoom)
+        cells, first, inverse = np.unique(np.stack([xs, ys], axis=1), axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        counts = np.bincount(inverse)
+        sum_lat = np.bincount(inverse, weights=lats)
+        sum_lng = np.bincount(inverse, weights=lngs)
+        clusters: List[SpotCluster] = [
+            SpotCluster(
+                zoom=zoom, cell_x=int(cells[i, 0]), cell_y=int(cells[i, 1]), count=int(counts[i]),
+                sum_lat=float(sum_lat[i]), sum_lng=float(sum_lng[i]), representative_id=int(ids[first[i]]),
+            )
+            for i in range(len(cells))
+        ]
+        SpotCluster.objects.bulk_create(clusters, batch_size=batch_size)
+        written += len(clusters)
+    return written
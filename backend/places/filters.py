@@ -1,8 +1,43 @@
+import logging
+
 import django_filters
-from django.db.models import Q
+from django import forms
+from django.utils import timezone
 
+from places import hours, selectors, services
 from places.models import Spot
 
+logger = logging.getLogger(__name__)
+
+
+class MinuteOfWeekField(forms.CharField):
+    """`open_at`: an ISO datetime or "sat 19:30", cleaned to a minute of the week (places.hours)."""
+
+    def to_python(self, value):
+        value = super().to_python(value)
+        if value in self.empty_values:
+            return None
+        minute = hours.parse_moment(value)
+        if minute is None:
+            raise forms.ValidationError('Expected an ISO datetime or a weekday and time, e.g. "sat 19:30".')
+        return minute
+
+
+class MinuteOfWeekFilter(django_filters.Filter):
+    field_class = MinuteOfWeekField
+
+
+def resolve_open_now(params):
+    """
+    The query params with a true `open_now` pinned to the current minute of the week, for cache
+    keys: a cached "open now" page must not outlive the minute it was computed in.
+    """
+    if params.get("open_now", "").lower() not in ("true", "1"):
+        return params
+    params = params.copy()
+    params["open_now"] = f"@{hours.minute_of_week(timezone.now())}"
+    return params
+
 
 class GetSpotsFilter(django_filters.FilterSet):
     bbox = django_filters.CharFilter(method='filter_bbox')
@@ -10,23 +45,33 @@ class GetSpotsFilter(django_filters.FilterSet):
     price_band = django_filters.CharFilter(field_name='price_band', lookup_expr='iexact')
     tags = django_filters.CharFilter(method='filter_tags')
     query = django_filters.CharFilter(method='filter_query')
+    open_now = django_filters.BooleanFilter(method='filter_open_now')
+    open_at = MinuteOfWeekFilter(method='filter_open_at')
 
 
     def filter_bbox(self, queryset, name, value):
-        print(f"Filter by bbox: {self.bbox}")
+        logger.debug("Filter by bbox: %s", value)
         min_lng, min_lat, max_lng, max_lat = map(float, value.split(','))
-        return queryset.filter(lng__gte=min_lng, lng__lte=max_lng, lat__gte=min_lat, lat__lte=max_lat)
+        return selectors.filter_spots_in_bbox(queryset, min_lng, min_lat, max_lng, max_lat)
 
     def filter_tags(self, queryset, name, value):
-        print(f"Filter by tags: {self.tags}")
-        tags = [t.strip() for t in value.split(",") if t.strip()]
-        return queryset.filter(tags__contains=tags) if tags else queryset
+        logger.debug("Filter by tags: %s", value)
+        # tags=a,b : spots tagged a and b; tags=a|b : spots tagged a or b
+        match_all = "|" not in value
+        tags = services.normalize_tags(value.replace("|", ",").split(","))
+        return selectors.filter_spots_by_tags(queryset, tags, match_all=match_all) if tags else queryset
 
     def filter_query(self, queryset, name, value):
-        print(f"Filter by query: {self.query}")
+        logger.debug("Filter by query: %s", value)
         v = value.strip()
-        return queryset.filter(Q(name__icontains=v) | Q(city__icontains=v) | Q(address__icontains=v)) if v else queryset
+        return selectors.search_spots(queryset, v) if v else queryset
+
+    def filter_open_now(self, queryset, name, value):
+        return selectors.filter_spots_open_at(queryset, hours.minute_of_week(timezone.now())) if value else queryset
+
+    def filter_open_at(self, queryset, name, value):
+        return selectors.filter_spots_open_at(queryset, value)
 
     class Meta:
         model = Spot
-        fields = ['bbox', 'city', 'price_band', 'tags', 'query']
\ No newline at end of file
+        fields = ['bbox', 'city', 'price_band', 'tags', 'query', 'open_now', 'open_at']
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Offline gazetteer of Nigerian states, cities and LGAs (places/data/gazetteer_ng.json).
+
+Names and aliases are folded like lexicon terms (accents, case and punctuation ignored) and
+indexed in a character trie. Exact matches come first; otherwise a bounded edit-distance walk
+of the trie catches typos ("Ibadn", "Ogbomoso"). Lookups are memoized, so bulk ingestion
+resolves each distinct city string once. Nothing here touches the network.
+"""
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from places.lexicon import fold
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / "data" / "gazetteer_ng.json"
+
+# more specific kinds win when several places match
+PRECISION_RANK = {"state": 0, "city": 1, "lga": 2}
+
+
+class Place(NamedTuple):
+    name: str
+    kind: str  # state|city|lga, also the Candidate.geo_precision it yields
+    state: str
+    lat: float
+    lng: float
+
+
+def normalize_place_name(text: str | None) -> str:
+    return " ".join(re.sub(r"[\W_]+", " ", fold(text)).split())
+
+
+def _max_distance(key: str) -> int:
+    return 0 if len(key) <= 3 else 1 if len(key) <= 6 else 2
+
+
+class _Node:
+    __slots__ = ("children", "places")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.places: List[Place] = []
+
+
+class Gazetteer:
+
+    def __init__(self, entries: Iterable[dict]):
+        self._root = _Node()
+        self.size = 0
+        for entry in entries:
+            place = Place(entry["name"], entry["kind"], entry["state"], entry["lat"], entry["lng"])
+            for name in (entry["name"], *entry.get("aliases", ())):
+                self._insert(normalize_place_name(name), place)
+            self.size += 1
+
+    def _insert(self, key: str, place: Place):
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _Node())
+        if place not in node.places:
+            node.places.append(place)
+
+    def exact(self, key: str) -> List[Place]:
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return list(node.places)
+
+    def fuzzy(self, key: str, max_distance: int) -> List[Place]:
+        """Places whose key is within `max_distance` edits of `key`, keeping only the closest."""
+        best: Tuple[int, List[Place]] = (max_distance + 1, [])
+        first_row = list(range(len(key) + 1))
+
+        def walk(node: _Node, char: str, previous_row: List[int]):
+            nonlocal best
+            row = [previous_row[0] + 1]
+            for i in range(1, len(key) + 1):
+                row.append(min(row[i - 1] + 1, previous_row[i] + 1, previous_row[i - 1] + (key[i - 1] != char)))
+            if node.places and row[-1] < best[0]:
+                best = (row[-1], list(node.places))
+            elif node.places and row[-1] == best[0]:
+                best[1].extend(node.places)
+            if min(row) <= max_distance:
+                for next_char, child in node.children.items():
+                    walk(child, next_char, row)
+
+        for char, child in self._root.children.items():
+            walk(child, char, first_row)
+        return best[1]
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    with open(GAZETTEER_PATH, encoding="utf-8") as handle:
+        return Gazetteer(json.load(handle))
+
+
+def _most_precise(places: Iterable[Place]) -> Place | None:
+    return max(places, key=lambda place: PRECISION_RANK[place.kind], default=None)
+
+
+@lru_cache(maxsize=4096)
+def _matches(name: str | None, fuzzy: bool) -> Tuple[Place, ...]:
+    key = normalize_place_name(name)
+    if not key:
+        return ()
+    gazetteer = get_gazetteer()
+    places = gazetteer.exact(key)
+    if not places and fuzzy and _max_distance(key):
+        places = gazetteer.fuzzy(key, _max_distance(key))
+    return tuple(places)
+
+
+def lookup(name: str | None, state: str | None = None, fuzzy: bool = True) -> Place | None:
+    """The most specific place called `name`, optionally restricted to one state."""
+    return _most_precise(place for place in _matches(name, fuzzy) if state is None or place.state == state)
+
+
+def lookup_state(name: str | None) -> Place | None:
+    return next((place for place in _matches(name, True) if place.kind == "state"), None)
+
+
+def geocode(city: str | None, state: str | None = None, address: str | None = None) -> Place | None:
+    """
+    Centroid for a record without coordinates. `city` anchors the state; comma-separated
+    address parts (exact matches only, street names make fuzzy matching noisy) can refine it
+    to an LGA or neighbourhood of that state. Falls back to the state centroid.
+    """
+    state_place = lookup_state(state)
+    region = state_place.state if state_place is not None else None
+    best = lookup(city, region) if city else None
+    region = region or (best.state if best is not None else None)
+    for part in reversed((address or "").split(",")):
+        place = lookup(part, region, fuzzy=False)
+        if place is not None and (best is None or PRECISION_RANK[place.kind] > PRECISION_RANK[best.kind]):
+            best, region = place, place.state
+    return best or state_place
@@ -0,0 +1,124 @@
+import math
+from typing import List
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+MAX_MERCATOR_LAT = 85.05112878
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+
+
+def geohash_encode(lat: float, lng: float, precision: int = 6) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                bits = (bits << 1) | 1
+                lng_lo = mid
+            else:
+                bits <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_lo = mid
+            else:
+                bits <<= 1
+                lat_hi = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def geohash_bounds(geohash: str) -> tuple[float, float, float, float]:
+    """Returns (min_lat, min_lng, max_lat, max_lng) of a geohash cell."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    even = True
+    for c in geohash:
+        value = _DECODE[c]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lng_lo + lng_hi) / 2
+                if bit:
+                    lng_lo = mid
+                else:
+                    lng_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+    return lat_lo, lng_lo, lat_hi, lng_hi
+
+
+def geohash_neighbours(geohash: str) -> List[str]:
+    """
+    The cell itself plus its 8 surrounding cells (3x3 block) at the same precision.
+    Cells on the poles are clamped; longitude wraps around the antimeridian.
+    """
+    min_lat, min_lng, max_lat, max_lng = geohash_bounds(geohash)
+    d_lat, d_lng = max_lat - min_lat, max_lng - min_lng
+    c_lat, c_lng = (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+    cells = []
+    for dy in (-1, 0, 1):
+        lat = c_lat + dy * d_lat
+        if lat < -90 or lat > 90:
+            continue
+        for dx in (-1, 0, 1):
+            lng = c_lng + dx * d_lng
+            lng = (lng + 180) % 360 - 180
+            cell = geohash_encode(lat, lng, len(geohash))
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def haversine_km(lat: float | np.ndarray, lng: float | np.ndarray, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to many (or pairwise, given arrays), vectorized over the arrays."""
+    lat1, lng1 = np.radians(lat), np.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def bbox_around(lat: float, lng: float, radius_km: float) -> tuple[float, float, float, float]:
+    """(min_lng, min_lat, max_lng, max_lat) enclosing a circle, in the /spots/?bbox= order."""
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    d_lng = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    return lng - d_lng, max(lat - d_lat, -90.0), lng + d_lng, min(lat + d_lat, 90.0)
+
+
+def mercator_position(lat: float, lng: float, n: int) -> tuple[float, float]:
+    """Web-mercator position of a point on an n x n grid covering the world (n = 2**zoom for tiles)."""
+    lat = math.radians(max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, lat)))
+    x = (lng + 180.0) / 360.0 * n
+    y = (1.0 - math.log(math.tan(lat) + 1 / math.cos(lat)) / math.pi) / 2.0 * n
+    return x, y
+
+
+def mercator_cell(lat: float, lng: float, n: int) -> tuple[int, int]:
+    x, y = mercator_position(lat, lng, n)
+    return min(n - 1, max(0, int(x))), min(n - 1, max(0, int(y)))
+
+
+def mercator_cell_bounds(n: int, x: int, y: int) -> tuple[float, float, float, float]:
+    """(min_lng, min_lat, max_lng, max_lat) of cell (x, y) on an n x n web-mercator grid."""
+    def lat_of(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, lat_of(y + 1), (x + 1) / n * 360.0 - 180.0, lat_of(y)
@@ -0,0 +1,242 @@
+"""
+Opening hours as minute-of-week intervals.
+
+Spot/Candidate.open_hours JSON ({"mon": [["08:00", "20:00"]]}, "mon-fri": "8am-6pm", a list of
+{day, open, close} dicts, ...) and free text such as Submission.hours_text ("Mon-Sat 8am-9pm,
+Sun 12-6pm", "24/7") parse into sorted, merged [start, end) intervals, in minutes from Monday
+00:00 local time. A close at or before the open runs past midnight. Anything unparseable is
+skipped rather than guessed. Intervals are stored split at day boundaries in SpotOpenInterval,
+so "open at minute m" is a range scan over one day of the (start, end) index.
+"""
+import datetime
+import re
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+
+from places.lexicon import fold
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+Interval = Tuple[int, int]  # [start, end) minutes from Monday 00:00
+
+_DAY = r"\b(?:mon(?:day)?|tue(?:s(?:day)?)?|wed(?:nesday)?|thu(?:r(?:s(?:day)?)?)?|fri(?:day)?|sat(?:urday)?|sun(?:day)?)\b"
+_TIME = r"(?:\d{1,2}(?:[:.]\d{2})?\s*(?:[ap]\.?m\.?)?|noon|midnight)"
+_TO = r"\s*(?:-|–|—|to|till|until|through|thru)\s*"
+_TOKENS = re.compile(
+    rf"(?P<always>24\s*/\s*7|24\s*(?:hours|hrs|hr|h)\b|open\s+24\b)"
+    rf"|(?P<daily>\bdaily\b|\bevery\s*day\b|\ball\s+week\b)"
+    rf"|(?P<weekdays>\bweekdays?\b)"
+    rf"|(?P<weekends>\bweekends?\b)"
+    rf"|(?P<closed>\bclosed\b)"
+    rf"|(?P<range>(?<![\d:.]){_TIME}{_TO}{_TIME})"
+    rf"|(?P<days>{_DAY}(?:{_TO}{_DAY})?)"
+)
+_CLOCK = re.compile(r"^(\d{1,2})(?:[:.](\d{2}))?\s*(?:([ap])\.?m\.?)?$")
+
+
+def _day_index(name: str) -> int | None:
+    name = name.strip()[:3]
+    return DAYS.index(name) if name in DAYS else None
+
+
+def _days(spec: str) -> List[int]:
+    """"mon", "monday", "mon-fri", "fri to mon", "weekdays", "daily" -> day indexes (0 = Monday)."""
+    spec = fold(spec).strip()
+    if re.fullmatch(r"daily|every\s*day|everyday|all\s+week|all|\*", spec):
+        return list(range(7))
+    if re.fullmatch(r"weekdays?", spec):
+        return list(range(5))
+    if re.fullmatch(r"weekends?", spec):
+        return [5, 6]
+    bounds = [_day_index(part) for part in re.split(_TO, spec, maxsplit=1)]
+    if None in bounds:
+        return []
+    if len(bounds) == 1:
+        return bounds
+    first, last = bounds
+    return [(first + offset) % 7 for offset in range((last - first) % 7 + 1)]
+
+
+def _clock(text: str) -> Tuple[int, bool] | None:
+    """Minutes after midnight and whether am/pm was given; None when not a time of day."""
+    text = text.strip()
+    if text == "noon":
+        return 12 * 60, True
+    if text == "midnight":
+        return 0, True
+    match = _CLOCK.match(text)
+    if match is None:
+        return None
+    hours, minutes, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem:
+        if not 1 <= hours <= 12:
+            return None
+        hours = hours % 12 + (12 if meridiem == "p" else 0)
+    if minutes >= 60 or hours > 24 or (hours == 24 and minutes):
+        return None
+    return hours * 60 + minutes, bool(meridiem)
+
+
+def _range(text: str) -> Tuple[int, int] | None:
+    """"08:00-20:00", "8am to 9pm", "22:00-02:00" -> (open, close) minutes, close past open."""
+    parts = re.split(_TO, fold(text).strip(), maxsplit=1)
+    if len(parts) != 2:
+        return None
+    return _pair(*parts)
+
+
+def _pair(opens: Any, closes: Any) -> Tuple[int, int] | None:
+    parsed = [_clock(fold(str(value))) for value in (opens, closes)]
+    if None in parsed:
+        return None
+    (start, start_meridiem), (end, end_meridiem) = parsed
+    if not start_meridiem and not end_meridiem and end <= start < 12 * 60 and end + 12 * 60 > start:
+        end += 12 * 60  # "8-9" is 8am to 9pm
+    if end <= start:
+        end += MINUTES_PER_DAY  # past midnight
+    return start, end
+
+
+def _week_intervals(days: Iterable[int], opens: int, closes: int) -> List[Interval]:
+    intervals = []
+    for day in days:
+        start, end = day * MINUTES_PER_DAY + opens, day * MINUTES_PER_DAY + closes
+        if end > MINUTES_PER_WEEK:  # Sunday night into Monday
+            intervals += [(start, MINUTES_PER_WEEK), (0, end - MINUTES_PER_WEEK)]
+        else:
+            intervals.append((start, end))
+    return intervals
+
+
+def merge(intervals: Iterable[Interval]) -> List[Interval]:
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _value_ranges(value: Any) -> List[Tuple[int, int]]:
+    """The (open, close) pairs of one day's value: [[o, c], ...], ["o-c", ...], "o-c", {"open", "close"}."""
+    if value is None or value is False:
+        return []
+    if isinstance(value, str):
+        text = fold(value)
+        if re.search(r"24\s*(?:hours|hrs|h)|24\s*/\s*7|open\s+24", text):
+            return [(0, MINUTES_PER_DAY)]
+        return [pair for pair in map(_range, re.split(r"[,;/]|\band\b", text)) if pair]
+    if isinstance(value, dict):
+        pair = _pair(value.get("open", ""), value.get("close", ""))
+        return [pair] if pair else []
+    if isinstance(value, (list, tuple)):
+        if len(value) == 2 and all(isinstance(item, str) for item in value) and _pair(*value):
+            return [_pair(*value)]
+        return [pair for item in value for pair in _value_ranges(item)]
+    return []
+
+
+def parse_open_hours(value: Any) -> List[Interval]:
+    """Spot/Candidate.open_hours in any of the shapes it is stored in."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return parse_hours_text(value)
+    intervals: List[Interval] = []
+    if isinstance(value, dict):
+        for spec, hours in value.items():
+            for opens, closes in _value_ranges(hours):
+                intervals += _week_intervals(_days(str(spec)), opens, closes)
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, dict) and ("day" in item or "days" in item):
+                days = _days(str(item.get("day") or item.get("days")))
+                for opens, closes in _value_ranges(item.get("hours", item)):
+                    intervals += _week_intervals(days, opens, closes)
+            elif isinstance(item, str):
+                intervals += parse_hours_text(item)
+    return merge(intervals)
+
+
+def parse_hours_text(text: str | None) -> List[Interval]:
+    """
+    Free text: day specs followed by the time ranges that apply to them. Ranges before any
+    day, or with none given at all, apply to every day; "closed" ends a day group.
+    """
+    if not text:
+        return []
+    intervals: List[Interval] = []
+    days: Set[int] = set()
+    ranges_seen = False
+    for token in _TOKENS.finditer(fold(text)):
+        kind, value = token.lastgroup, token.group()
+        if kind in ("days", "daily", "weekdays", "weekends"):
+            if ranges_seen:
+                days, ranges_seen = set(), False
+            days.update(_days(value))
+        elif kind == "closed":
+            days, ranges_seen = set(), False
+        else:
+            pair = (0, MINUTES_PER_DAY) if kind == "always" else _range(value)
+            if pair is not None:
+                intervals += _week_intervals(sorted(days) or range(7), *pair)
+                ranges_seen = True
+    return merge(intervals)
+
+
+def split_by_day(intervals: Iterable[Interval]) -> List[Interval]:
+    """Cuts intervals at midnight, so every piece lies within one day (see SpotOpenInterval)."""
+    pieces = []
+    for start, end in intervals:
+        while start < end:
+            cut = min(end, (start // MINUTES_PER_DAY + 1) * MINUTES_PER_DAY)
+            pieces.append((start, cut))
+            start = cut
+    return pieces
+
+
+def _hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def format_open_hours(intervals: Iterable[Interval]) -> Dict[str, List[List[str]]]:
+    """Canonical JSON for open_hours: {"mon": [["08:00", "21:00"]], ...}, closes at midnight as "24:00"."""
+    hours: Dict[str, List[List[str]]] = {}
+    for start, end in split_by_day(merge(intervals)):
+        day, opens = divmod(start, MINUTES_PER_DAY)
+        hours.setdefault(DAYS[day], []).append([_hhmm(opens), _hhmm(end - day * MINUTES_PER_DAY)])
+    return hours
+
+
+def local_time_zone() -> ZoneInfo:
+    return ZoneInfo(settings.OPEN_HOURS_TIME_ZONE)
+
+
+def minute_of_week(moment: datetime.datetime) -> int:
+    """Minutes since Monday 00:00 in the atlas' local time (settings.OPEN_HOURS_TIME_ZONE)."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(local_time_zone())
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def parse_moment(text: str) -> int | None:
+    """
+    An `open_at` value as a minute of the week: an ISO datetime (naive means local time) or a
+    weekday and time ("sat 19:30", "friday 8pm"). None when unparseable.
+    """
+    text = fold(text).strip()
+    match = re.fullmatch(rf"({_DAY})\s*,?\s*({_TIME})", text)
+    if match is not None:
+        day, clock = _day_index(match.group(1)), _clock(match.group(2))
+        if day is None or clock is None or clock[0] >= MINUTES_PER_DAY:
+            return None
+        return day * MINUTES_PER_DAY + clock[0]
+    try:
+        return minute_of_week(datetime.datetime.fromisoformat(text.upper()))
+    except ValueError:
+        return None
@@ -0,0 +1,136 @@
+"""
+SQLite side indexes over places tables.
+
+They live outside the ORM (virtual tables + triggers), so the triggers are re-installed
+after every `migrate`: Django rebuilds a SQLite table when altering it, which drops its triggers.
+"""
+SPOT_RTREE_TABLE = "places_spot_rtree"
+
+SPOT_RTREE_CREATE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SPOT_RTREE_TABLE} USING rtree(id, min_lat, max_lat, min_lng, max_lng)
+"""
+
+SPOT_RTREE_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SPOT_RTREE_TABLE}_ai AFTER INSERT ON places_spot BEGIN
+        INSERT INTO {SPOT_RTREE_TABLE} (id, min_lat, max_lat, min_lng, max_lng)
+        VALUES (new.id, new.lat, new.lat, new.lng, new.lng);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SPOT_RTREE_TABLE}_au AFTER UPDATE OF lat, lng ON places_spot BEGIN
+        UPDATE {SPOT_RTREE_TABLE} SET min_lat = new.lat, max_lat = new.lat, min_lng = new.lng, max_lng = new.lng
+        WHERE id = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SPOT_RTREE_TABLE}_ad AFTER DELETE ON places_spot BEGIN
+        DELETE FROM {SPOT_RTREE_TABLE} WHERE id = old.id;
+    END
+    """,
+)
+
+SPOT_RTREE_REBUILD = (
+    f"DELETE FROM {SPOT_RTREE_TABLE}",
+    f"""
+    INSERT INTO {SPOT_RTREE_TABLE} (id, min_lat, max_lat, min_lng, max_lng)
+    SELECT id, lat, lat, lng, lng FROM places_spot
+    """,
+)
+
+SPOT_RTREE_DROP = (
+    f"DROP TRIGGER IF EXISTS {SPOT_RTREE_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {SPOT_RTREE_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {SPOT_RTREE_TABLE}_ad",
+    f"DROP TABLE IF EXISTS {SPOT_RTREE_TABLE}",
+)
+
+SPOT_FTS_TABLE = "places_spot_fts"
+
+# remove_diacritics 2 folds Yoruba tone marks and underdots: "Gbẹ̀gìrì" is indexed as "gbegiri"
+SPOT_FTS_CREATE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SPOT_FTS_TABLE} USING fts5(
+    name, city, address, content='places_spot', content_rowid='id', tokenize="unicode61 remove_diacritics 2"
+)
+"""
+
+# bm25 column weights: name, city, address
+SPOT_FTS_RANK = f"INSERT INTO {SPOT_FTS_TABLE} ({SPOT_FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 4.0, 1.0)')"
+
+SPOT_FTS_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SPOT_FTS_TABLE}_ai AFTER INSERT ON places_spot BEGIN
+        INSERT INTO {SPOT_FTS_TABLE} (rowid, name, city, address) VALUES (new.id, new.name, new.city, new.address);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SPOT_FTS_TABLE}_au AFTER UPDATE OF name, city, address ON places_spot BEGIN
+        INSERT INTO {SPOT_FTS_TABLE} ({SPOT_FTS_TABLE}, rowid, name, city, address)
+        VALUES ('delete', old.id, old.name, old.city, old.address);
+        INSERT INTO {SPOT_FTS_TABLE} (rowid, name, city, address) VALUES (new.id, new.name, new.city, new.address);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SPOT_FTS_TABLE}_ad AFTER DELETE ON places_spot BEGIN
+        INSERT INTO {SPOT_FTS_TABLE} ({SPOT_FTS_TABLE}, rowid, name, city, address)
+        VALUES ('delete', old.id, old.name, old.city, old.address);
+    END
+    """,
+)
+
+SPOT_FTS_REBUILD = (f"INSERT INTO {SPOT_FTS_TABLE} ({SPOT_FTS_TABLE}) VALUES ('rebuild')",)
+
+SPOT_FTS_DROP = (
+    f"DROP TRIGGER IF EXISTS {SPOT_FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {SPOT_FTS_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {SPOT_FTS_TABLE}_ad",
+    f"DROP TABLE IF EXISTS {SPOT_FTS_TABLE}",
+)
+
+
+def supports_side_indexes(connection) -> bool:
+    return connection.vendor == "sqlite"
+
+
+def _execute(connection, statements):
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def install_spot_rtree(connection, rebuild: bool = False):
+    if not supports_side_indexes(connection):
+        return
+    _execute(connection, (SPOT_RTREE_CREATE, *SPOT_RTREE_TRIGGERS))
+    if rebuild:
+        _execute(connection, SPOT_RTREE_REBUILD)
+
+
+def drop_spot_rtree(connection):
+    if supports_side_indexes(connection):
+        _execute(connection, SPOT_RTREE_DROP)
+
+
+def install_spot_fts(connection, rebuild: bool = False):
+    if not supports_side_indexes(connection):
+        return
+    _execute(connection, (SPOT_FTS_CREATE, *SPOT_FTS_TRIGGERS))
+    if rebuild:
+        _execute(connection, (SPOT_FTS_RANK, *SPOT_FTS_REBUILD))
+
+
+def drop_spot_fts(connection):
+    if supports_side_indexes(connection):
+        _execute(connection, SPOT_FTS_DROP)
+
+
+def install_side_indexes(connection):
+    """Idempotent; called from the post_migrate hook."""
+    if not supports_side_indexes(connection):
+        return
+    with connection.cursor() as cursor:
+        tables = set(connection.introspection.table_names(cursor))
+    if SPOT_RTREE_TABLE in tables:
+        install_spot_rtree(connection)
+    if SPOT_FTS_TABLE in tables:
+        install_spot_fts(connection)
@@ -0,0 +1,45 @@
+from typing import Any, Dict, List
+
+from django.db import transaction
+
+from commons import jobs
+from commons.models import Job
+from places import matching, services
+from places.models import Candidate, Submission
+
+CREATE_CANDIDATE_JOB = "places.create_candidate"
+SUGGEST_SPOTS_JOB = "places.suggest_spots"
+
+
+def _idempotency_key(submission: Submission) -> str:
+    return f"{CREATE_CANDIDATE_JOB}:{submission.public_id}"
+
+
+def enqueue_candidate_creation(submission: Submission) -> Job:
+    return jobs.enqueue(CREATE_CANDIDATE_JOB, {"submission_id": submission.pk}, idempotency_key=_idempotency_key(submission))
+
+
+def get_candidate_creation_job(submission: Submission) -> Job | None:
+    return Job.objects.filter(idempotency_key=_idempotency_key(submission)).first()
+
+
+@jobs.register(CREATE_CANDIDATE_JOB)
+def create_candidate(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Idempotent: a retried job finds the candidate linked by the run that got through."""
+    with transaction.atomic():
+        submission = Submission.objects.select_for_update().select_related("candidate").get(pk=payload["submission_id"])
+        if submission.candidate is None:
+            submission.candidate = services.create_candidate_from_submission(submission)
+            submission.save(update_fields=["candidate", "last_modified_at"])
+    return {"candidate_id": str(submission.candidate.public_id)}
+
+
+def enqueue_spot_suggestions(candidate_ids: List[int]) -> Job:
+    return jobs.enqueue(SUGGEST_SPOTS_JOB, {"candidate_ids": candidate_ids})
+
+
+@jobs.register(SUGGEST_SPOTS_JOB)
+def suggest_spots(payload: Dict[str, Any]) -> Dict[str, Any]:
+    candidates = Candidate.objects.filter(id__in=payload["candidate_ids"], status="pending_verification") \
+        .only("id", "name", "lat", "lng", "city", "geo_precision", "suggested_spot", "suggested_spot_score")
+    return {"updated": matching.refresh_suggestions(candidates)}
@@ -0,0 +1,78 @@
+"""
+Keyword lexicon for candidate signals.
+
+Each term maps to the spellings it is written as; matching runs on folded text (NFKD, combining
+marks dropped, casefolded), so tone-marked and plain spellings ("àmàlà", "gbẹ̀gìrì") hit
+the same term and only spelling variants need listing. All variants compile into one regex
+alternation, built once per process. Override the terms with settings.PLACES_LEXICON.
+"""
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, Sequence
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+DEFAULT_LEXICON: Dict[str, Sequence[str]] = {
+    "amala": ("amala", "amaala", "amalla"),
+    "abula": ("abula",),
+    "gbegiri": ("gbegiri", "gbegri", "gbegili"),
+    "ewedu": ("ewedu", "ewedo"),
+    "buka": ("buka", "bukka", "bukateria"),
+    "lafun": ("lafun", "elubo"),
+}
+
+_COMBINING = re.compile(r"[\u0300-\u036f]+")
+
+
+def fold(text: str | None) -> str:
+    """Accent and case insensitive form used for matching: "Gbẹ̀gìrì" -> "gbegiri"."""
+    return _COMBINING.sub("", unicodedata.normalize("NFKD", text or "")).casefold()
+
+
+class LexiconMatcher:
+
+    def __init__(self, lexicon: Dict[str, Sequence[str]]):
+        self.terms = tuple(lexicon)
+        self._term_of = {fold(variant): term for term, variants in lexicon.items() for variant in variants}
+        # longest first, so "bukateria" is not cut short as "buka"
+        variants = sorted(self._term_of, key=len, reverse=True)
+        self._pattern = re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, variants)) + ")")
+
+    def count(self, *texts: str | None) -> Dict[str, int]:
+        """Hits per term across the texts; terms without hits are left out."""
+        counts = Counter()
+        for text in texts:
+            if text:
+                counts.update(self._term_of[match] for match in self._pattern.findall(fold(text)))
+        return dict(counts)
+
+
+@lru_cache(maxsize=1)
+def get_matcher() -> LexiconMatcher:
+    return LexiconMatcher(getattr(settings, "PLACES_LEXICON", DEFAULT_LEXICON))
+
+
+@receiver(setting_changed)
+def _reset_matcher(setting, **kwargs):
+    if setting == "PLACES_LEXICON":
+        get_matcher.cache_clear()
+
+
+def iter_payload_text(value) -> Iterator[str]:
+    """Every string inside a JSON value (e.g. Submission.raw_payload), keys excluded."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from iter_payload_text(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from iter_payload_text(item)
+
+
+def count_terms(texts: Iterable[str | None]) -> Dict[str, int]:
+    return get_matcher().count(*texts)
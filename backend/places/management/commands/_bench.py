@@ -0,0 +1,20 @@
+from commons.versioning import bump_version
+from places import tiles
+from places.models import Spot
+
+# Roughly the Nigerian bounding box
+MIN_LAT, MAX_LAT = 4.3, 13.9
+MIN_LNG, MAX_LNG = 2.7, 14.6
+
+
+def populate_random_spots(rng, count: int, batch_size: int = 5000):
+    """bulk_create skips the Spot signals: the spots version is bumped and the tile cache dropped afterwards."""
+    batch = []
+    for i in range(count):
+        batch.append(Spot(name=f"Spot {i}", lat=rng.uniform(MIN_LAT, MAX_LAT), lng=rng.uniform(MIN_LNG, MAX_LNG)))
+        if len(batch) == batch_size:
+            Spot.objects.bulk_create(batch)
+            batch = []
+    Spot.objects.bulk_create(batch)
+    bump_version("spots")
+    tiles.clear()
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from places.models import Candidate
+from places.services import make_dedupe_key
+
+
+class Command(BaseCommand):
+    help = "Recompute geohash-bucketed dedupe keys for existing Candidate rows, in primary-key batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id, scanned, updated = 0, 0, 0
+        while True:
+            rows = list(
+                Candidate.objects.filter(id__gt=last_id).order_by("id")
+                .only("id", "name", "lat", "lng", "dedupe_key")[:batch_size]
+            )
+            if not rows:
+                break
+            changed = []
+            for candidate in rows:
+                key = make_dedupe_key(candidate.name, candidate.lat, candidate.lng)
+                if key != candidate.dedupe_key:
+                    candidate.dedupe_key = key
+                    changed.append(candidate)
+            with transaction.atomic():
+                Candidate.objects.bulk_update(changed, ["dedupe_key"])
+            scanned += len(rows)
+            updated += len(changed)
+            last_id = rows[-1].id
+            self.stdout.write(f"Scanned {scanned} candidates, updated {updated}")
+        self.stdout.write(self.style.SUCCESS(f"Done: {updated} of {scanned} dedupe keys updated"))
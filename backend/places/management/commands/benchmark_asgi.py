@@ -0,0 +1,149 @@
+import asyncio
+import io
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand
+
+from commons.benchmark import scratch_database, summarize
+from places.management.commands._bench import MAX_LAT, MAX_LNG, MIN_LAT, MIN_LNG, populate_random_spots
+from places.models import Candidate
+
+SYNC_PATHS = ("/spots/", "/verify/queue/")
+ASYNC_PATHS = ("/async/spots/", "/async/verify/queue/")
+
+
+def _wsgi_environ(path: str, query: str) -> dict:
+    return {
+        "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": query, "SCRIPT_NAME": "",
+        "SERVER_NAME": "testserver", "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1", "HTTP_HOST": "testserver",
+        "wsgi.url_scheme": "http", "wsgi.input": io.BytesIO(), "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True, "wsgi.multiprocess": False, "wsgi.run_once": False,
+    }
+
+
+def _asgi_scope(path: str, query: str) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"testserver")], "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+
+
+class Command(BaseCommand):
+    help = ("Requests/s and latency of the spot list and review queue through the WSGI application (a pool of "
+            "worker threads) and the async views through the ASGI application (one event loop), with many "
+            "concurrent slow clients, on a scratch database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--spots", type=int, default=20_000)
+        parser.add_argument("--candidates", type=int, default=5_000)
+        parser.add_argument("--requests", type=int, default=2_000)
+        parser.add_argument("--connections", type=int, default=200, help="Concurrent clients.")
+        parser.add_argument("--threads", type=int, default=8, help="WSGI worker threads.")
+        parser.add_argument("--client-delay-ms", type=float, default=300.0,
+                            help="Time each client takes to read its response (a slow mobile link).")
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        from amala_atlas.asgi import application as asgi_application
+        from amala_atlas.wsgi import application as wsgi_application
+
+        rng = random.Random(options["seed"])
+        with scratch_database():
+            populate_random_spots(rng, options["spots"])
+            Candidate.objects.bulk_create([
+                Candidate(name=f"Candidate {i}", lat=rng.uniform(MIN_LAT, MAX_LAT), lng=rng.uniform(MIN_LNG, MAX_LNG),
+                          score=round(rng.random(), 3))
+                for i in range(options["candidates"])
+            ], batch_size=2000)
+            # a distinct `n` per request keeps the response caches out of the measurement
+            queries = [
+                (i % len(SYNC_PATHS), urlencode({"page_size": options["page_size"], "format": "json", "n": i}))
+                for i in range(options["requests"])
+            ]
+            delay = options["client_delay_ms"] / 1000
+
+            wsgi = self._run_wsgi(wsgi_application, queries, options["connections"], options["threads"], delay)
+            asgi = asyncio.run(self._run_asgi(asgi_application, queries, options["connections"], delay))
+
+        self.stdout.write(
+            f"{options['requests']} requests, {options['connections']} concurrent clients reading for "
+            f"{options['client_delay_ms']:.0f}ms each, page_size={options['page_size']}"
+        )
+        for name, (elapsed, samples, errors) in (
+            (f"WSGI ({options['threads']} threads)", wsgi), ("ASGI (async views)", asgi),
+        ):
+            self.stdout.write(f"  {name}: {len(samples) / elapsed:.1f} req/s {summarize(samples)}"
+                              + (f" errors={errors}" if errors else ""))
+
+    def _run_wsgi(self, application, queries: List[Tuple[int, str]], connections: int, threads: int, delay: float):
+        samples: List[float] = []
+        errors = [0]
+        outstanding = threading.Semaphore(connections)
+
+        def request(path: str, query: str, started: float):
+            try:
+                statuses = []
+                result = application(_wsgi_environ(path, query), lambda status, headers, exc_info=None: statuses.append(status))
+                try:
+                    for _ in result:
+                        pass
+                    time.sleep(delay)  # the worker thread stays busy while the client reads
+                finally:
+                    result.close()
+                if not statuses[0].startswith("200"):
+                    errors[0] += 1
+                samples.append((time.perf_counter() - started) * 1000)
+            finally:
+                outstanding.release()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for path_index, query in queries:
+                outstanding.acquire()
+                pool.submit(request, SYNC_PATHS[path_index], query, time.perf_counter())
+        return time.perf_counter() - started, samples, errors[0]
+
+    async def _run_asgi(self, application, queries: List[Tuple[int, str]], connections: int, delay: float):
+        samples: List[float] = []
+        errors = 0
+        pending = iter(queries)
+
+        async def request(path: str, query: str):
+            nonlocal errors
+            disconnected = asyncio.Event()
+            messages = [{"type": "http.request", "body": b"", "more_body": False}]
+            status = []
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status.append(message["status"])
+                elif not message.get("more_body"):
+                    await asyncio.sleep(delay)  # the client reads; the loop serves the others meanwhile
+
+            started = time.perf_counter()
+            await application(_asgi_scope(path, query), receive, send)
+            disconnected.set()
+            errors += status[0] != 200
+            samples.append((time.perf_counter() - started) * 1000)
+
+        async def client():
+            for path_index, query in pending:
+                await request(ASYNC_PATHS[path_index], query)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(connections)))
+        return time.perf_counter() - started, samples, errors
@@ -0,0 +1,45 @@
+import random
+
+from django.core.management.base import BaseCommand
+
+from commons.benchmark import measure, scratch_database
+from places import selectors
+from places.management.commands._bench import MAX_LAT, MAX_LNG, MIN_LAT, MIN_LNG, populate_random_spots
+from places.models import Spot
+
+
+class Command(BaseCommand):
+    help = "Compare the plain (lat, lng) range filter against the R*Tree bbox filter on a scratch database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--spots", type=int, default=100_000)
+        parser.add_argument("--viewports", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with scratch_database():
+            populate_random_spots(rng, options["spots"])
+            viewports = [self._viewport(rng) for _ in range(options["viewports"])]
+            queryset = Spot.objects.all()
+
+            def run(path):
+                for min_lng, min_lat, max_lng, max_lat in viewports:
+                    if path == "range":
+                        qs = queryset.filter(lng__gte=min_lng, lng__lte=max_lng, lat__gte=min_lat, lat__lte=max_lat)
+                    else:
+                        qs = selectors.filter_spots_in_bbox(queryset, min_lng, min_lat, max_lng, max_lat)
+                    list(qs.values_list("id", "name", "lat", "lng"))
+
+            for path in ("range", "rtree"):
+                stats = measure(lambda: run(path), repeat=10, warmup=1)
+                per_query = {k: round(v / len(viewports), 3) if k.endswith("_ms") else v for k, v in stats.items()}
+                self.stdout.write(f"{path:>6}: {per_query}  (per viewport, {len(viewports)} viewports/run)")
+
+    def _viewport(self, rng):
+        # Portrait phone viewports: tall in latitude, narrow in longitude
+        lat_span = rng.uniform(0.1, 4.0)
+        lng_span = lat_span * rng.uniform(0.05, 0.3)
+        min_lat = rng.uniform(MIN_LAT, MAX_LAT - lat_span)
+        min_lng = rng.uniform(MIN_LNG, MAX_LNG - lng_span)
+        return min_lng, min_lat, min_lng + lng_span, min_lat + lat_span
@@ -0,0 +1,36 @@
+import random
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIClient
+
+from commons.benchmark import measure, scratch_database
+from places.management.commands._bench import MAX_LAT, MAX_LNG, MIN_LAT, MIN_LNG, populate_random_spots
+
+
+class Command(BaseCommand):
+    help = "Time /spots/nearby/ end to end on a scratch database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--spots", type=int, default=500_000)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--k", type=int, default=10)
+        parser.add_argument("--radius-km", type=float, default=10)
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with scratch_database():
+            populate_random_spots(rng, options["spots"])
+            client = APIClient()
+            points = [(rng.uniform(MIN_LAT, MAX_LAT), rng.uniform(MIN_LNG, MAX_LNG)) for _ in range(options["requests"])]
+            queue = iter(points * 2)
+
+            def request():
+                lat, lng = next(queue)
+                response = client.get("/spots/nearby/", {
+                    "lat": lat, "lng": lng, "k": options["k"], "radius_km": options["radius_km"], "format": "json",
+                })
+                assert response.status_code == 200, response.content
+
+            stats = measure(request, repeat=options["requests"], warmup=min(10, options["requests"]))
+            self.stdout.write(f"/spots/nearby/ over {options['spots']} spots: {stats}")
@@ -0,0 +1,46 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from commons.benchmark import scratch_database
+from commons.serialization import ValuesRepresentation, render_json_list
+from places.management.commands._bench import populate_random_spots
+from places.models import Spot
+from places.serializers import GetSpotSerializer
+from places.views import SpotViewSet
+
+
+class Command(BaseCommand):
+    help = ("Render the unpaginated spot list through GetSpotSerializer and through the .values_list() fast path "
+            "at growing table sizes, checking the bodies are byte-identical.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+        parser.add_argument("--serializer-max-rows", type=int, default=1_000_000,
+                            help="Skip the (slow, memory hungry) serializer path above this many rows.")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        renderer = JSONRenderer()
+        with scratch_database():
+            for size in sorted(options["sizes"]):
+                populate_random_spots(rng, size - Spot.objects.count())
+                queryset = SpotViewSet.queryset.all()
+
+                started = time.perf_counter()
+                fast = render_json_list(ValuesRepresentation(GetSpotSerializer).iter_chunks(queryset), renderer)
+                fast_s = time.perf_counter() - started
+                line = f"{size:>9} spots  values: {fast_s:7.2f}s ({size / fast_s:>9.0f} rows/s, {len(fast) / 2**20:.0f} MiB)"
+
+                if size <= options["serializer_max_rows"]:
+                    started = time.perf_counter()
+                    slow = renderer.render(GetSpotSerializer(queryset, many=True).data)
+                    slow_s = time.perf_counter() - started
+                    assert slow == fast, "fast path output differs from the serializer"
+                    del slow
+                    line += f"  serializer: {slow_s:7.2f}s ({size / slow_s:>8.0f} rows/s)  speedup x{slow_s / fast_s:.1f}"
+                del fast
+                self.stdout.write(line)
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from places import near_duplicates
+
+
+class Command(BaseCommand):
+    help = "Rebuild the MinHash name index of every Candidate and Spot and group near-duplicate candidates into clusters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Processes computing signatures (default: one per CPU; 1 disables the pool).")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = near_duplicates.cluster_candidates(workers=options["workers"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {result['indexed']} names; {result['clustered']} candidates in {result['clusters']} clusters, "
+            f"{result['updated']} rows updated in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from places.synthetic import generate_atlas
+
+
+class Command(BaseCommand):
+    help = ("Write synthetic spots, candidates, submissions and verifications into the configured database "
+            "(see places.synthetic). Deterministic for a given seed and scale.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--spots", type=int, default=10_000)
+        parser.add_argument("--candidates", type=int, default=None, help="Defaults to half the spots.")
+        parser.add_argument("--submissions", type=int, default=None, help="Defaults to the candidates.")
+        parser.add_argument("--verifications", type=int, default=None, help="Defaults to the candidates.")
+        parser.add_argument("--reviewers", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        candidates = options["candidates"] if options["candidates"] is not None else options["spots"] // 2
+        started = time.perf_counter()
+        written = generate_atlas(
+            spots=options["spots"], candidates=candidates,
+            submissions=options["submissions"] if options["submissions"] is not None else candidates,
+            verifications=options["verifications"] if options["verifications"] is not None else candidates,
+            reviewers=options["reviewers"], seed=options["seed"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            ", ".join(f"{count} {name}" for name, count in written.items()) + f" in {time.perf_counter() - started:.1f}s"
+        ))
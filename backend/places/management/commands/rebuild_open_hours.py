@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from commons.versioning import bump_version
+from places import services, tiles
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the SpotOpenInterval index from Spot.open_hours, bump the spots version and drop the tile cache "
+            "(e.g. after bulk imports that bypass model signals).")
+
+    def handle(self, *args, **options):
+        written = services.rebuild_open_intervals()
+        bump_version("spots")
+        tiles.clear()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} open intervals"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from commons.versioning import bump_version
+from places import clusters, tiles
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the per-zoom spot clusters from scratch, bump the spots version and drop the tile cache "
+            "(e.g. after bulk imports that bypass model signals).")
+
+    def handle(self, *args, **options):
+        written = clusters.rebuild()
+        bump_version("spots")
+        tiles.clear()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} clusters across zoom levels "
+                                             f"{clusters.CLUSTER_MIN_ZOOM}-{clusters.CLUSTER_MAX_ZOOM}"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from places import matching
+from places.models import Candidate
+
+
+class Command(BaseCommand):
+    help = "Recompute the suggested merge target of pending candidates (e.g. after spots were added in bulk)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Include candidates that are no longer pending.")
+
+    def handle(self, *args, **options):
+        candidates = Candidate.objects.only("id", "name", "lat", "lng", "city", "geo_precision", "suggested_spot", "suggested_spot_score").order_by("id")
+        if not options["all"]:
+            candidates = candidates.filter(status="pending_verification")
+        updated = matching.refresh_suggestions(candidates.iterator(chunk_size=2000))
+        self.stdout.write(self.style.SUCCESS(f"Changed the suggestion of {updated} candidates"))
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from places import scoring
+
+
+class Command(BaseCommand):
+    help = "Re-score every Candidate under the current places.scoring rules, writing only rows that change."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=scoring.RESCORE_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = scoring.rescore_candidates(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {result['scanned']} candidates, updated {result['updated']} "
+            f"to scoring version {scoring.SCORING_VERSION} in {time.perf_counter() - started:.1f}s"
+        ))
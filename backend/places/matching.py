@@ -0,0 +1,94 @@
+"""
+Suggests the existing Spot a candidate most likely duplicates, for the MERGE review action.
+
+Candidates with real coordinates are compared with the spots inside MATCH_RADIUS_KM, fetched
+through the R*Tree; the rest (no coordinates, or a gazetteer centroid) with the FTS name
+matches in the same city. Each comparison blends name similarity with proximity; the best
+one above MATCH_MIN_SCORE is stored on the candidate when it is created
+(Candidate.suggested_spot), so the review queue never searches.
+"""
+import re
+from difflib import SequenceMatcher
+from typing import Iterable, List, NamedTuple, Tuple
+
+from places import selectors
+from places.geo import bbox_around, haversine_km
+from places.lexicon import fold
+from places.models import Candidate, Spot
+
+MATCH_RADIUS_KM = 0.5
+MATCH_MIN_SCORE = 0.6
+MATCH_NAME_WEIGHT = 0.7
+MATCH_TEXT_CANDIDATES = 20
+POSITIONED_PRECISIONS = ("address", "poi")
+
+
+class SpotMatch(NamedTuple):
+    spot_id: int
+    score: float
+
+
+def _name_tokens(name: str | None) -> str:
+    return " ".join(re.findall(r"\w+", fold(name)))
+
+
+def name_similarity(a: str | None, b: str | None) -> float:
+    a, b = _name_tokens(a), _name_tokens(b)
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def _best(scored: Iterable[Tuple[int, float]]) -> SpotMatch | None:
+    best = max(scored, key=lambda pair: pair[1], default=None)
+    if best is None or best[1] < MATCH_MIN_SCORE:
+        return None
+    return SpotMatch(best[0], round(best[1], 3))
+
+
+def suggest_spot(name: str | None, lat: float | None, lng: float | None, city: str | None = None,
+                 geo_precision: str = "address") -> SpotMatch | None:
+    if lat is not None and lng is not None and geo_precision in POSITIONED_PRECISIONS:
+        rows: List[tuple] = list(
+            selectors.filter_spots_in_bbox(Spot.objects.order_by(), *bbox_around(lat, lng, MATCH_RADIUS_KM))
+            .values_list("id", "name", "lat", "lng")
+        )
+        if not rows:
+            return None
+        ids, names, lats, lngs = zip(*rows)
+        distances = haversine_km(lat, lng, lats, lngs)
+        return _best(
+            (spot_id, MATCH_NAME_WEIGHT * name_similarity(name, spot_name)
+             + (1 - MATCH_NAME_WEIGHT) * max(0.0, 1 - float(distance) / MATCH_RADIUS_KM))
+            for spot_id, spot_name, distance in zip(ids, names, distances)
+        )
+
+    spots = selectors.search_spots(Spot.objects.all(), _name_tokens(name))
+    if city:
+        spots = spots.filter(city__iexact=city)
+    # no proximity evidence: the name alone has to clear the bar
+    return _best(
+        (spot_id, name_similarity(name, spot_name))
+        for spot_id, spot_name in spots.values_list("id", "name")[:MATCH_TEXT_CANDIDATES]
+    )
+
+
+def apply_suggestion(candidate: Candidate) -> Candidate:
+    match = suggest_spot(candidate.name, candidate.lat, candidate.lng, candidate.city, candidate.geo_precision)
+    candidate.suggested_spot_id = match.spot_id if match else None
+    candidate.suggested_spot_score = match.score if match else None
+    return candidate
+
+
+def refresh_suggestions(queryset: Iterable[Candidate], batch_size: int = 1000) -> int:
+    """Recomputes the stored suggestion of each candidate, e.g. after spots were added in bulk; returns rows changed."""
+    updated, batch = 0, []
+    for candidate in queryset:
+        before = (candidate.suggested_spot_id, candidate.suggested_spot_score)
+        apply_suggestion(candidate)
+        if (candidate.suggested_spot_id, candidate.suggested_spot_score) != before:
+            batch.append(candidate)
+        if len(batch) >= batch_size:
+            updated += Candidate.objects.bulk_update(batch, ["suggested_spot", "suggested_spot_score"])
+            batch = []
+    return updated + Candidate.objects.bulk_update(batch, ["suggested_spot", "suggested_spot_score"])
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:00
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0005_candidate_photo_url_candidate_price_band_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='open_hours',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='last_modified_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='candidate',
+            name='price_band',
+            field=models.CharField(blank=True, max_length=8),
+        ),
+        migrations.AlterField(
+            model_name='spot',
+            name='last_modified_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='Submission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_modified_at', models.DateTimeField(auto_now=True, null=True)),
+                ('public_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('kind', models.CharField(choices=[('manual', 'Manual'), ('agentic', 'Agentic')], default='manual', max_length=16)),
+                ('address', models.TextField(blank=True)),
+                ('city', models.CharField(blank=True, max_length=120)),
+                ('state', models.CharField(blank=True, max_length=120)),
+                ('country', models.CharField(default='Nigeria', max_length=120)),
+                ('lat', models.FloatField(blank=True, null=True)),
+                ('lng', models.FloatField(blank=True, null=True)),
+                ('price_band', models.CharField(blank=True, max_length=8)),
+                ('tags', models.JSONField(blank=True, default=list)),
+                ('hours_text', models.CharField(blank=True, max_length=200)),
+                ('email', models.EmailField(blank=True, max_length=254)),
+                ('photo_url', models.URLField(blank=True, max_length=500)),
+                ('transcript', models.TextField(blank=True)),
+                ('raw_payload', models.JSONField(blank=True, default=dict)),
+                ('submitted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='submissions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        # Verification moved to the verification app: keep the rows, hand over the table.
+        migrations.AlterField(
+            model_name='verification',
+            name='last_modified_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.AlterModelTable(
+            name='verification',
+            table='verification_verification',
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.DeleteModel(
+                    name='Verification',
+                ),
+            ],
+        ),
+    ]
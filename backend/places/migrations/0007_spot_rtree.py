@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from places.indexes import drop_spot_rtree, install_spot_rtree
+
+
+def forwards(apps, schema_editor):
+    install_spot_rtree(schema_editor.connection, rebuild=True)
+
+
+def backwards(apps, schema_editor):
+    drop_spot_rtree(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0006_candidate_open_hours_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0007_spot_rtree'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpotCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zoom', models.PositiveSmallIntegerField()),
+                ('cell_x', models.IntegerField()),
+                ('cell_y', models.IntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('sum_lat', models.FloatField(default=0)),
+                ('sum_lng', models.FloatField(default=0)),
+                ('representative', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='places.spot')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('zoom', 'cell_x', 'cell_y'), name='uniq_spot_cluster_cell')],
+            },
+        ),
+    ]
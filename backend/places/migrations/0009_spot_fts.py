@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:09
+
+import django.db.models.deletion
+import places.fields
+from django.db import migrations, models
+
+from places.indexes import drop_spot_fts, install_spot_fts
+
+
+def forwards(apps, schema_editor):
+    install_spot_fts(schema_editor.connection, rebuild=True)
+
+
+def backwards(apps, schema_editor):
+    drop_spot_fts(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0008_spot_cluster'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpotSearchIndex',
+            fields=[
+                ('spot', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='places.spot')),
+                ('document', places.fields.FullTextField(db_column='places_spot_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'places_spot_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_spot_tags(apps, schema_editor):
+    Spot = apps.get_model('places', 'Spot')
+    SpotTag = apps.get_model('places', 'SpotTag')
+    rows = []
+    for spot_id, tags in Spot.objects.values_list('id', 'tags').iterator(chunk_size=2000):
+        normalized = {str(tag).strip().casefold()[:64] for tag in tags or []} - {''}
+        rows.extend(SpotTag(spot_id=spot_id, tag=tag) for tag in normalized)
+        if len(rows) >= 5000:
+            SpotTag.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    SpotTag.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0009_spot_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpotTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(max_length=64)),
+                ('spot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_index', to='places.spot')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tag', 'spot'), name='uniq_spot_tag')],
+            },
+        ),
+        migrations.RunPython(backfill_spot_tags, migrations.RunPython.noop),
+    ]
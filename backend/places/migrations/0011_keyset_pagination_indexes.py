@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0010_spot_tag'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='candidate',
+            name='places_cand_status_6523dc_idx',
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['status', '-score', '-created_at', '-id'], name='places_cand_status_275140_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spot',
+            index=models.Index(fields=['-created_at', '-id'], name='places_spot_created_ddf1f2_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0012_submission_candidate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='scoring_version',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
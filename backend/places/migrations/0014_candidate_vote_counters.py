@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0013_candidate_scoring_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='approvals_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='rejections_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0014_candidate_vote_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='suggested_spot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='places.spot'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='suggested_spot_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='tags',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='spot',
+            name='evidence',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
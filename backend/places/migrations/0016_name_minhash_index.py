@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0015_spot_merge_and_suggestions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='near_duplicate_cluster',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='NameBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('key', models.BigIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key'], name='places_name_key_22d940_idx'), models.Index(fields=['kind', 'object_id'], name='places_name_kind_6c0312_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='NameSignature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('signature', models.BinaryField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='uniq_name_signature_object')],
+            },
+        ),
+    ]
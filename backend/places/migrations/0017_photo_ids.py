@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0016_name_minhash_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='photo_id',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='photo_id',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from places import hours
+
+
+def backfill_open_intervals(apps, schema_editor):
+    Spot = apps.get_model('places', 'Spot')
+    SpotOpenInterval = apps.get_model('places', 'SpotOpenInterval')
+    rows = []
+    for spot_id, open_hours in Spot.objects.values_list('id', 'open_hours').iterator(chunk_size=2000):
+        intervals = hours.split_by_day(hours.parse_open_hours(open_hours))
+        rows.extend(SpotOpenInterval(spot_id=spot_id, start=start, end=end) for start, end in intervals)
+        if len(rows) >= 5000:
+            SpotOpenInterval.objects.bulk_create(rows)
+            rows = []
+    SpotOpenInterval.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0017_photo_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpotOpenInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.PositiveSmallIntegerField()),
+                ('end', models.PositiveSmallIntegerField()),
+                ('spot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='open_intervals', to='places.spot')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['start', 'end', 'spot'], name='spot_open_interval_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_open_intervals, migrations.RunPython.noop),
+    ]
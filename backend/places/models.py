@@ -1,6 +1,7 @@
 from django.db import models
 
 from commons.models import BaseModel
+from places.fields import FullTextField
 from users.models import User
 
 """
@@ -17,8 +18,9 @@ class Spot(BaseModel):
     zipcode     = models.CharField(max_length=8, blank=True)
     price_band  = models.CharField(max_length=8, blank=True)  # ₦ / ₦₦ / ₦₦₦
     tags        = models.JSONField(default=list, blank=True)
-    photos      = models.JSONField(default=list, blank=True)  # [{url, by?, at}]
+    photos      = models.JSONField(default=list, blank=True)  # [{media_id, by?, at, source_url?}]; {url, at} until media.jobs imports it
     open_hours  = models.JSONField(null=True, blank=True)
+    evidence    = models.JSONField(default=list, blank=True)  # folded in from merged candidates
     source      = models.CharField(max_length=20, default="verified")
 
     def __str__(self):
@@ -38,6 +40,105 @@ class Spot(BaseModel):
         indexes = [
             models.Index(fields=["city"]),
             models.Index(fields=["lat","lng"]),
+            models.Index(fields=["-created_at", "-id"]),
+        ]
+
+
+"""
+Normalized copy of Spot.tags (one row per spot and tag), kept in sync by places.signals
+"""
+class SpotTag(models.Model):
+    spot = models.ForeignKey(Spot, on_delete=models.CASCADE, related_name="tag_index")
+    tag  = models.CharField(max_length=64)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tag", "spot"], name="uniq_spot_tag"),
+        ]
+
+
+"""
+Opening hours of a spot as minute-of-week intervals (places.hours), split at midnight so a piece
+never spans days; kept in sync with Spot.open_hours by places.signals
+"""
+class SpotOpenInterval(models.Model):
+    spot  = models.ForeignKey(Spot, on_delete=models.CASCADE, related_name="open_intervals")
+    start = models.PositiveSmallIntegerField()  # minutes from Monday 00:00, Africa/Lagos
+    end   = models.PositiveSmallIntegerField()  # exclusive, at most the next midnight
+
+    class Meta:
+        indexes = [
+            # covering: "open at m" scans start in [midnight before m, m] and reads end/spot from the index
+            models.Index(fields=["start", "end", "spot"], name="spot_open_interval_idx"),
+        ]
+
+
+"""
+Read-only view of the FTS5 index over Spot name/city/address (places.indexes), maintained by SQL triggers
+"""
+class SpotSearchIndex(models.Model):
+    spot     = models.OneToOneField(Spot, primary_key=True, db_column="rowid", on_delete=models.DO_NOTHING,
+                                    db_constraint=False, related_name="search_index")
+    document = FullTextField(db_column="places_spot_fts")
+    rank     = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "places_spot_fts"
+
+
+"""
+Precomputed map cluster: the spots falling in one grid cell at one zoom level (see places.clusters)
+"""
+class SpotCluster(models.Model):
+    zoom           = models.PositiveSmallIntegerField()
+    cell_x         = models.IntegerField()
+    cell_y         = models.IntegerField()
+    count          = models.PositiveIntegerField(default=0)
+    sum_lat        = models.FloatField(default=0)
+    sum_lng        = models.FloatField(default=0)
+    representative = models.ForeignKey(Spot, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+
+    @property
+    def lat(self):
+        return self.sum_lat / self.count
+
+    @property
+    def lng(self):
+        return self.sum_lng / self.count
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["zoom", "cell_x", "cell_y"], name="uniq_spot_cluster_cell"),
+        ]
+
+
+"""
+MinHash signature of a Spot or Candidate name (see places.minhash, places.near_duplicates)
+"""
+class NameSignature(models.Model):
+    kind      = models.CharField(max_length=10)  # candidate|spot
+    object_id = models.BigIntegerField()
+    signature = models.BinaryField()  # MINHASH_PERMUTATIONS little-endian uint32
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="uniq_name_signature_object"),
+        ]
+
+
+"""
+LSH band bucket of a NameSignature: names sharing any key are near-duplicate candidates
+"""
+class NameBucket(models.Model):
+    kind      = models.CharField(max_length=10)
+    object_id = models.BigIntegerField()
+    key       = models.BigIntegerField()  # band index and band rows hashed together
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["key"]),
+            models.Index(fields=["kind", "object_id"]),
         ]
 
 
@@ -55,14 +156,28 @@ class Candidate(BaseModel):
     source_kind  = models.CharField(max_length=40, blank=True)  # blog|directory|social|user|agent
     price_band = models.CharField(max_length=8, blank=True)
     photo_url    = models.URLField(blank=True)
+    photo_id     = models.CharField(max_length=64, blank=True)  # media id of an uploaded photo (media.Photo.digest)
     open_hours  = models.JSONField(null=True, blank=True)
+    tags         = models.JSONField(default=list, blank=True)
     submitted_by_email = models.EmailField(blank=True)
     evidence     = models.JSONField(default=list, blank=True)
     signals      = models.JSONField(default=dict, blank=True)
     score        = models.DecimalField(max_digits=4, decimal_places=3, default=0)  # 0.000..1.000
+    scoring_version = models.PositiveSmallIntegerField(default=0)  # places.scoring.SCORING_VERSION the score was computed with
     dedupe_key   = models.CharField(max_length=128, blank=True)
-    geo_precision= models.CharField(max_length=20, blank=True)  # address|poi|city
+    geo_precision= models.CharField(max_length=20, blank=True)  # address|poi|lga|city|state
     status       = models.CharField(max_length=30, default="pending_verification")
+    approvals_count  = models.PositiveIntegerField(default=0)  # denormalized from verifications, see verification.services
+    rejections_count = models.PositiveIntegerField(default=0)
+    # likely existing Spot this candidate duplicates, precomputed by places.matching at creation
+    suggested_spot       = models.ForeignKey(Spot, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    suggested_spot_score = models.FloatField(null=True, blank=True)
+    # smallest candidate id among its near-duplicates (places.near_duplicates), for grouping the review queue
+    near_duplicate_cluster = models.BigIntegerField(null=True, blank=True)
+    # review lease (verification.services.claim_candidates): free again once lease_expires_at has passed
+    leased_by        = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="+",
+                                         db_index=False)  # candidate_lease_idx leads with it
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"""
@@ -76,8 +191,9 @@ class Candidate(BaseModel):
         """
     class Meta:
         indexes = [
-            models.Index(fields=["status","-score"]),
+            models.Index(fields=["status", "-score", "-created_at", "-id"]),
             models.Index(fields=["dedupe_key"]),
+            models.Index(fields=["leased_by", "lease_expires_at"], name="candidate_lease_idx"),
         ]
         ordering = ["-score"]
 
@@ -104,9 +220,11 @@ class Submission(BaseModel):
     hours_text = models.CharField(max_length=200, blank=True)
     email = models.EmailField(blank=True)
     photo_url = models.URLField(max_length=500, blank=True)
+    photo_id = models.CharField(max_length=64, blank=True)  # media id from /media/photos/
     submitted_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="submissions")
     transcript = models.TextField(blank=True)
     raw_payload = models.JSONField(default=dict, blank=True)
+    candidate = models.OneToOneField(Candidate, null=True, blank=True, on_delete=models.SET_NULL, related_name="submission")
 
     def __str__(self):
         return f"""
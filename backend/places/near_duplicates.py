@@ -0,0 +1,245 @@
+"""
+Near-duplicate detection over the MinHash/LSH index (places.minhash).
+
+Every Candidate and Spot name has a NameSignature row and MINHASH_BANDS NameBucket rows. A
+new submission probes the NameBucket key index with its band keys, a fixed number of index
+lookups however large the tables grow, then checks the few colliding names against their
+signatures and positions. `cluster_candidates` rebuilds the whole index with the signatures
+computed in a process pool, links every verified colliding pair, and writes the resulting
+cluster ids back to Candidate.near_duplicate_cluster for the reviewer queue.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+from django.db import connection, transaction
+
+from places import minhash
+from places.geo import haversine_km
+from places.models import Candidate, NameBucket, NameSignature, Spot
+
+CANDIDATE, SPOT = "candidate", "spot"
+
+NEAR_DUPLICATE_THRESHOLD = 0.5  # estimated Jaccard similarity of the name shingles
+NEAR_DUPLICATE_MAX_KM = 2.0  # when both places have real coordinates
+NEAR_DUPLICATE_CITY_KM = 25.0  # when either is only a gazetteer centroid
+POSITIONED_PRECISIONS = ("address", "poi")
+NEAR_DUPLICATE_LIMIT = 10
+CLUSTER_CHUNK_SIZE = 5000
+LOOKUP_CHUNK = 900  # stays under SQLite's default bound-parameter limit
+
+
+class NearDuplicate(NamedTuple):
+    kind: str
+    object_id: int
+    similarity: float
+
+
+def _insert_sql(model, *fields: str) -> str:
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(model._meta.get_field(name).column) for name in fields)
+    return f"INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({', '.join(['%s'] * len(fields))})"
+
+
+def _write_index(kind: str, ids: Sequence[int], signatures: np.ndarray, replace: bool = True):
+    """Stores the signature and band keys of each object; names without shingles are left out of the index."""
+    if replace:
+        unindex(kind, ids)
+    keep = [i for i, signature in enumerate(signatures) if not minhash.is_empty(signature)]
+    if not keep:
+        return
+    keys = minhash.band_keys(signatures[keep])
+    # executemany over prepared INSERTs: bulk_create's model instances cost more than the rows
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            _insert_sql(NameSignature, "kind", "object_id", "signature"),
+            [(kind, ids[i], minhash.to_bytes(signatures[i])) for i in keep],
+        )
+        cursor.executemany(
+            _insert_sql(NameBucket, "kind", "object_id", "key"),
+            [(kind, ids[i], int(key)) for i, row in zip(keep, keys) for key in row],
+        )
+
+
+def index(kind: str, objects: Iterable) -> None:
+    """(Re)indexes the names of saved Candidates or Spots."""
+    objects = list(objects)
+    if objects:
+        _write_index(kind, [obj.pk for obj in objects], minhash.signatures(obj.name for obj in objects))
+
+
+def unindex(kind: str, ids: Sequence[int]) -> None:
+    for i in range(0, len(ids), LOOKUP_CHUNK):
+        chunk = ids[i:i + LOOKUP_CHUNK]
+        NameBucket.objects.filter(kind=kind, object_id__in=chunk).delete()
+        NameSignature.objects.filter(kind=kind, object_id__in=chunk).delete()
+
+
+def _positions(kind: str, ids: List[int]) -> Dict[int, Tuple[float | None, float | None, bool]]:
+    if kind == SPOT:
+        rows = Spot.objects.filter(id__in=ids).values_list("id", "lat", "lng")
+        return {spot_id: (lat, lng, True) for spot_id, lat, lng in rows}
+    rows = Candidate.objects.filter(id__in=ids).values_list("id", "lat", "lng", "geo_precision")
+    return {row[0]: (row[1], row[2], row[3] in POSITIONED_PRECISIONS) for row in rows}
+
+
+def _near_enough(a: Tuple[float | None, float | None, bool], b: Tuple[float | None, float | None, bool]) -> bool:
+    if None in (a[0], a[1], b[0], b[1]):
+        return True  # a name match without any position to contradict it
+    max_km = NEAR_DUPLICATE_MAX_KM if a[2] and b[2] else NEAR_DUPLICATE_CITY_KM
+    return float(haversine_km(a[0], a[1], np.array([b[0]]), np.array([b[1]]))[0]) <= max_km
+
+
+def find_near_duplicates(name: str | None, lat: float | None, lng: float | None, geo_precision: str = "address",
+                         exclude: Tuple[str, int] | None = None, limit: int = NEAR_DUPLICATE_LIMIT) -> List[NearDuplicate]:
+    """Indexed candidates and spots whose name is estimated at least NEAR_DUPLICATE_THRESHOLD similar, nearby."""
+    signature = minhash.signatures([name])[0]
+    if minhash.is_empty(signature):
+        return []
+    keys = [int(key) for key in minhash.band_keys(signature)[0]]
+    colliding = set(NameBucket.objects.filter(key__in=keys).values_list("kind", "object_id"))
+    colliding.discard(exclude)
+
+    matches: List[NearDuplicate] = []
+    position = (lat, lng, geo_precision in POSITIONED_PRECISIONS)
+    for kind in (CANDIDATE, SPOT):
+        ids = [object_id for object_kind, object_id in colliding if object_kind == kind]
+        if not ids:
+            continue
+        rows = NameSignature.objects.filter(kind=kind, object_id__in=ids).values_list("object_id", "signature")
+        scored = [(object_id, float(minhash.similarity(signature, minhash.from_bytes(data))[0])) for object_id, data in rows]
+        scored = [(object_id, score) for object_id, score in scored if score >= NEAR_DUPLICATE_THRESHOLD]
+        positions = _positions(kind, [object_id for object_id, _ in scored])
+        # objects deleted since they were indexed have no position and drop out here
+        matches += [
+            NearDuplicate(kind, object_id, round(score, 3)) for object_id, score in scored
+            if object_id in positions and _near_enough(position, positions[object_id])
+        ]
+    matches.sort(key=lambda match: (-match.similarity, match.kind, match.object_id))
+    return matches[:limit]
+
+
+def join_cluster(matches: Iterable[NearDuplicate]) -> int | None:
+    """
+    Cluster id for a new candidate near-duplicating `matches`: the smallest id or existing
+    cluster among the matched candidates, which also get it when they had none yet.
+    """
+    ids = [match.object_id for match in matches if match.kind == CANDIDATE]
+    if not ids:
+        return None
+    clusters = Candidate.objects.filter(id__in=ids).values_list("near_duplicate_cluster", flat=True)
+    cluster = min([*ids, *(cluster for cluster in clusters if cluster is not None)])
+    Candidate.objects.filter(id__in=ids, near_duplicate_cluster__isnull=True).update(near_duplicate_cluster=cluster)
+    return cluster
+
+
+def _signatures_parallel(names: List[str], workers: int | None) -> np.ndarray:
+    chunks = [names[i:i + CLUSTER_CHUNK_SIZE] for i in range(0, len(names), CLUSTER_CHUNK_SIZE)]
+    if not chunks:
+        return np.empty((0, minhash.MINHASH_PERMUTATIONS), dtype=np.uint32)
+    if workers == 1 or len(chunks) == 1:
+        return np.concatenate([minhash.signatures(chunk) for chunk in chunks])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return np.concatenate(list(pool.map(minhash.signatures, chunks)))
+
+
+def _linked_pairs(signatures: np.ndarray, lats: np.ndarray, lngs: np.ndarray, positioned: np.ndarray) -> np.ndarray:
+    """
+    Verified pairs among rows sharing a band key. Within a bucket each row is compared with
+    the first row and with its neighbour in key order, so a bucket costs O(size), not O(size^2).
+    """
+    indexed = np.flatnonzero(signatures[:, 0] != np.iinfo(np.uint32).max)
+    keys = minhash.band_keys(signatures[indexed])
+    pairs = []
+    for band in range(minhash.MINHASH_BANDS):
+        order = np.argsort(keys[:, band], kind="stable")
+        band_keys = keys[order, band]
+        same_as_previous = np.concatenate([[False], band_keys[1:] == band_keys[:-1]])
+        starts = np.where(~same_as_previous, np.arange(len(order)), 0)
+        first = np.maximum.accumulate(starts)
+        rows = np.flatnonzero(same_as_previous)
+        for other in (first[rows], rows - 1):
+            pairs.append(np.stack([indexed[order[other]], indexed[order[rows]]], axis=1))
+    pairs = np.unique(np.concatenate(pairs), axis=0) if pairs else np.empty((0, 2), dtype=np.int64)
+    if not len(pairs):
+        return pairs
+    a, b = pairs[:, 0], pairs[:, 1]
+    similar = np.mean(signatures[a] == signatures[b], axis=1) >= NEAR_DUPLICATE_THRESHOLD
+
+    known = ~(np.isnan(lats[a]) | np.isnan(lats[b]))
+    distance = np.zeros(len(pairs))  # a name match without any position to contradict it
+    distance[known] = haversine_km(lats[a][known], lngs[a][known], lats[b][known], lngs[b][known])
+    max_km = np.where(positioned[a] & positioned[b], NEAR_DUPLICATE_MAX_KM, NEAR_DUPLICATE_CITY_KM)
+    return pairs[similar & (distance <= max_km)]
+
+
+def _components(size: int, pairs: np.ndarray) -> np.ndarray:
+    """Connected-component label (smallest member row) of each row, by min-label propagation."""
+    labels = np.arange(size)
+    if not len(pairs):
+        return labels
+    a, b = pairs[:, 0], pairs[:, 1]
+    while True:
+        low = np.minimum(labels[a], labels[b])
+        updated = labels.copy()
+        np.minimum.at(updated, a, low)
+        np.minimum.at(updated, b, low)
+        updated = updated[updated]  # pointer jumping halves the remaining chain lengths
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def _update_clusters(changes: List[Tuple[int | None, int]]):
+    quote = connection.ops.quote_name
+    sql = (f"UPDATE {quote(Candidate._meta.db_table)} SET {quote('near_duplicate_cluster')} = %s "
+           f"WHERE {quote('id')} = %s")
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, changes)
+
+
+def cluster_candidates(workers: int | None = None) -> Dict[str, int]:
+    """
+    Rebuilds the MinHash index of every Candidate and Spot, then groups candidates connected
+    through near-duplicate pairs (directly or via a Spot). A group of two or more candidates
+    gets its smallest candidate id as cluster id; only rows whose cluster changed are written.
+    """
+    candidates = list(Candidate.objects.order_by("id").values_list("id", "name", "lat", "lng", "geo_precision", "near_duplicate_cluster"))
+    spots = list(Spot.objects.order_by("id").values_list("id", "name", "lat", "lng"))
+    names = [row[1] for row in candidates] + [row[1] for row in spots]
+    signatures = _signatures_parallel(names, workers)
+    candidate_ids = [row[0] for row in candidates]
+    spot_ids = [row[0] for row in spots]
+
+    with transaction.atomic():
+        NameBucket.objects.all().delete()
+        NameSignature.objects.all().delete()
+        _write_index(CANDIDATE, candidate_ids, signatures[:len(candidates)], replace=False)
+        _write_index(SPOT, spot_ids, signatures[len(candidates):], replace=False)
+
+        coordinate = lambda value: np.nan if value is None else value
+        lats = np.array([coordinate(row[2]) for row in candidates] + [coordinate(row[2]) for row in spots], dtype=float)
+        lngs = np.array([coordinate(row[3]) for row in candidates] + [coordinate(row[3]) for row in spots], dtype=float)
+        positioned = np.array([row[4] in POSITIONED_PRECISIONS for row in candidates] + [True] * len(spots))
+        labels = _components(len(names), _linked_pairs(signatures, lats, lngs, positioned))
+
+        # cluster id per component: its smallest candidate id, kept when it holds two or more candidates
+        candidate_labels = labels[:len(candidates)]
+        sizes = np.bincount(candidate_labels, minlength=len(names))
+        smallest = np.full(len(names), np.iinfo(np.int64).max)
+        np.minimum.at(smallest, candidate_labels, np.array(candidate_ids, dtype=np.int64))
+        changes = []
+        clustered = 0
+        for row, label in zip(candidates, candidate_labels):
+            cluster = int(smallest[label]) if sizes[label] >= 2 else None
+            clustered += cluster is not None
+            if cluster != row[5]:
+                changes.append((cluster, row[0]))
+        _update_clusters(changes)
+
+    return {
+        "indexed": len(names),
+        "clustered": clustered,
+        "clusters": int(np.count_nonzero(sizes >= 2)),
+        "updated": len(changes),
+    }
@@ -0,0 +1,117 @@
+"""
+Candidate scoring: the signal weights, and a batch engine that re-scores the stored backlog.
+
+`services.compute_signals`/`compute_score` score one record at insert; `rescore_candidates`
+applies the same rules to whole chunks of Candidates as numpy array operations.
+Bump SCORING_VERSION whenever the lexicon, the signals or SCORING_WEIGHTS change, so
+the next `manage.py rescore_candidates` pass rewrites every row scored under older rules.
+"""
+from decimal import Decimal
+from typing import Any, Dict, List
+
+import numpy as np
+from django.db import connection, transaction
+
+from places import lexicon
+from places.models import Candidate
+
+SCORING_VERSION = 3
+
+SCORING_WEIGHTS = {
+    "keyword": 0.35,  # at least one keyword hit
+    "photo": 0.10,
+    "coords": 0.10,
+}
+
+# Candidate.geo_precision of a gazetteer centroid filled in by geocoding (places.gazetteer.Place.kind)
+CENTROID_PRECISIONS = ("lga", "city", "state")
+
+RESCORE_CHUNK_SIZE = 5000
+RESCORE_FIELDS = (
+    "id", "name", "raw_address", "submission__transcript", "submission__raw_payload", "photo_url", "photo_id",
+    "lat", "lng", "geo_precision", "signals", "score", "scoring_version",
+)
+
+
+def has_coords(lat: float | None, lng: float | None, geo_precision: str = "address") -> bool:
+    """Whether the place came with its own coordinates; a geocoded centroid does not count."""
+    return lat is not None and lng is not None and geo_precision not in CENTROID_PRECISIONS
+
+
+def score(keyword_hits: np.ndarray, has_photo: np.ndarray, has_coords: np.ndarray) -> np.ndarray:
+    total = (
+        np.where(keyword_hits >= 1, SCORING_WEIGHTS["keyword"], 0.0)
+        + np.where(has_photo, SCORING_WEIGHTS["photo"], 0.0)
+        + np.where(has_coords, SCORING_WEIGHTS["coords"], 0.0)
+    )
+    return np.clip(total, 0.0, 1.0)
+
+
+def keyword_signals(*texts: str | None) -> Dict[str, Any]:
+    counts = lexicon.count_terms(texts)
+    return {"keyword_hits": len(counts), "keyword_counts": counts}
+
+
+_SIGNALS = Candidate._meta.get_field("signals")
+_SCORE = Candidate._meta.get_field("score")
+
+
+def _update_sql(*fields: str) -> str:
+    # one prepared UPDATE run with executemany: bulk_update's CASE WHEN per row costs ~2ms/row to build
+    quote = connection.ops.quote_name
+    assignments = ", ".join(f"{quote(Candidate._meta.get_field(name).column)} = %s" for name in fields)
+    return f"UPDATE {quote(Candidate._meta.db_table)} SET {assignments} WHERE {quote('id')} = %s"
+
+
+def _rescore_chunk(rows: List[tuple]) -> int:
+    (ids, names, addresses, transcripts, payloads, photo_urls, photo_ids, lats, lngs, precisions, signals, scores,
+     versions) = zip(*rows)
+    keywords = [
+        keyword_signals(name, address, transcript, *lexicon.iter_payload_text(payload))
+        for name, address, transcript, payload in zip(names, addresses, transcripts, payloads)
+    ]
+    hits = np.array([k["keyword_hits"] for k in keywords], dtype=np.int64)
+    has_photo = np.array([bool(url or media_id) for url, media_id in zip(photo_urls, photo_ids)])
+    positioned = np.array([has_coords(*position) for position in zip(lats, lngs, precisions)])
+    new_scores = np.round(score(hits, has_photo, positioned), 3)
+
+    changed: List[tuple] = []
+    unchanged: List[tuple] = []
+    for i, candidate_id in enumerate(ids):
+        new_signals = {
+            **(signals[i] or {}),
+            **keywords[i], "has_photo": bool(has_photo[i]), "has_coords": bool(positioned[i]),
+        }
+        new_score = Decimal(f"{new_scores[i]:.3f}")
+        if new_signals == signals[i] and new_score == scores[i]:
+            if versions[i] != SCORING_VERSION:
+                unchanged.append((SCORING_VERSION, candidate_id))
+            continue
+        changed.append((
+            _SIGNALS.get_db_prep_save(new_signals, connection), _SCORE.get_db_prep_save(new_score, connection),
+            SCORING_VERSION, candidate_id,
+        ))
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(_update_sql("signals", "score", "scoring_version"), changed)
+        cursor.executemany(_update_sql("scoring_version"), unchanged)
+    return len(changed) + len(unchanged)
+
+
+def rescore_candidates(chunk_size: int = RESCORE_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Streams every Candidate in id order, `chunk_size` rows at a time, and writes only the rows
+    whose signals, score or scoring version differ from what the current rules produce.
+    """
+    scanned = updated = 0
+    last_id = 0
+    while True:
+        rows = list(
+            Candidate.objects.filter(id__gt=last_id).order_by("id").values_list(*RESCORE_FIELDS)[:chunk_size]
+        )
+        if not rows:
+            break
+        updated += _rescore_chunk(rows)
+        scanned += len(rows)
+        last_id = rows[-1][0]
+    return {"scanned": scanned, "updated": updated}
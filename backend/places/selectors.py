@@ -1 +1,104 @@
-# selectors here
\ No newline at end of file
+import re
+from typing import Iterable, List
+
+import numpy as np
+
+from django.db import connections
+from django.db.models import Count, F, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from places.geo import bbox_around, haversine_km
+from places.hours import MINUTES_PER_DAY
+from places.indexes import SPOT_RTREE_TABLE, supports_side_indexes
+from places.lexicon import fold
+from places.models import Candidate, Spot, SpotOpenInterval, SpotTag
+
+
+def get_candidates_by_dedupe_keys(keys: Iterable[str]) -> QuerySet[Candidate]:
+    return Candidate.objects.filter(dedupe_key__in=list(keys)).order_by("-created_at")
+
+
+def filter_spots_in_bbox(queryset: QuerySet[Spot], min_lng: float, min_lat: float, max_lng: float, max_lat: float) -> QuerySet[Spot]:
+    """
+    Narrows through the R*Tree on SQLite. The R*Tree stores 32-bit boxes rounded outwards,
+    so the exact range predicates are kept to drop the few edge false positives.
+    """
+    queryset = queryset.filter(lng__gte=min_lng, lng__lte=max_lng, lat__gte=min_lat, lat__lte=max_lat)
+    if not supports_side_indexes(connections[queryset.db]):
+        return queryset
+    return queryset.filter(id__in=RawSQL(
+        f"SELECT id FROM {SPOT_RTREE_TABLE} WHERE max_lat >= %s AND min_lat <= %s AND max_lng >= %s AND min_lng <= %s",
+        (min_lat, max_lat, min_lng, max_lng),
+    ))
+
+
+def get_nearby_spots(queryset: QuerySet[Spot], lat: float, lng: float, k: int, radius_km: float) -> List[Spot]:
+    """
+    The k spots closest to (lat, lng) within radius_km, nearest first, each with a `distance_km` attribute.
+    The bbox around the circle is the coarse prefilter; only (id, lat, lng) columns are pulled for ranking.
+    """
+    rows = filter_spots_in_bbox(queryset, *bbox_around(lat, lng, radius_km)).order_by().values_list("id", "lat", "lng")
+    coords = np.array(list(rows), dtype=np.float64).reshape(-1, 3)
+    if not len(coords):
+        return []
+    distances = haversine_km(lat, lng, coords[:, 1], coords[:, 2])
+    inside = np.flatnonzero(distances <= radius_km)
+    if len(inside) > k:
+        inside = inside[np.argpartition(distances[inside], k - 1)[:k]]
+    inside = inside[np.argsort(distances[inside], kind="stable")]
+
+    spots = Spot.objects.in_bulk(coords[inside, 0].astype(np.int64).tolist())
+    nearest = []
+    for i in inside:
+        spot = spots[int(coords[i, 0])]
+        spot.distance_km = round(float(distances[i]), 3)
+        nearest.append(spot)
+    return nearest
+
+
+def build_fts_query(text: str) -> str:
+    """
+    Every word of the input as a prefix term, ANDed: `iya oyo` -> `"iya"* "oyo"*`. Folded first, as
+    the index is (remove_diacritics 2): split raw, "gbẹ̀gìrì" would break at its combining marks.
+    """
+    return " ".join(f'"{token}"*' for token in re.findall(r"\w+", fold(text)))
+
+
+def search_spots(queryset: QuerySet[Spot], text: str) -> QuerySet[Spot]:
+    """
+    Prefix, diacritic-insensitive match over name/city/address, best bm25 rank first.
+    Backends without the FTS5 index fall back to icontains.
+    """
+    match = build_fts_query(text)
+    if not match:
+        return queryset.none()
+    if not supports_side_indexes(connections[queryset.db]):
+        return queryset.filter(Q(name__icontains=text) | Q(city__icontains=text) | Q(address__icontains=text))
+    return (
+        queryset.filter(search_index__document__match=match)
+        .annotate(search_rank=F("search_index__rank"))
+        .order_by("search_rank", "-created_at")
+    )
+
+
+def filter_spots_by_tags(queryset: QuerySet[Spot], tags: List[str], match_all: bool = True) -> QuerySet[Spot]:
+    """Spots carrying all (or any) of the normalized tags, through the (tag, spot) index."""
+    spot_ids = SpotTag.objects.filter(tag__in=tags).values("spot_id")
+    if match_all:
+        spot_ids = spot_ids.annotate(matched=Count("tag")).filter(matched=len(set(tags)))
+    return queryset.filter(id__in=spot_ids.values("spot_id"))
+
+
+def filter_spots_open_at(queryset: QuerySet[Spot], minute: int) -> QuerySet[Spot]:
+    """Spots open at `minute` of the week (places.hours), through the (start, end, spot) index."""
+    midnight = minute - minute % MINUTES_PER_DAY
+    spot_ids = SpotOpenInterval.objects.filter(start__gte=midnight, start__lte=minute, end__gt=minute)
+    return queryset.filter(id__in=spot_ids.values("spot_id"))
+
+
+def get_tag_facets(spot_queryset: QuerySet[Spot] | None = None) -> QuerySet:
+    """[{"tag", "count"}] over all spots, or only over `spot_queryset` when given."""
+    tags = SpotTag.objects.all()
+    if spot_queryset is not None:
+        tags = tags.filter(spot_id__in=spot_queryset.order_by().values("id"))
+    return tags.values("tag").annotate(count=Count("spot_id")).order_by("-count", "tag")
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from media.models import Photo
 from . import models
 from .models import Submission
 
@@ -17,18 +18,70 @@ class GetSpotSerializer(serializers.ModelSerializer):
             'zipcode', 'price_band', 'tags', 'photos', 'open_hours', 'source'
         )
 
-class CandidateSubmissionSerializer(serializers.Serializer):
+class NearbySpotSerializer(GetSpotSerializer):
+    distance_km = serializers.FloatField(read_only=True)
+
+    class Meta(GetSpotSerializer.Meta):
+        fields = GetSpotSerializer.Meta.fields + ('distance_km',)
+
+
+class NearbySpotsQuerySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    k = serializers.IntegerField(min_value=1, max_value=100, default=10)
+    radius_km = serializers.FloatField(min_value=0.1, max_value=100, default=10)
+
+
+class ClusterRepresentativeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.Spot
+        fields = ('id', 'public_id', 'name', 'price_band')
+
+
+class SpotClusterSerializer(serializers.ModelSerializer):
+    lat = serializers.FloatField(read_only=True)
+    lng = serializers.FloatField(read_only=True)
+    representative = ClusterRepresentativeSerializer(read_only=True)
+
+    class Meta:
+        model = models.SpotCluster
+        fields = ('zoom', 'lat', 'lng', 'count', 'representative')
+
+
+class SpotClustersQuerySerializer(serializers.Serializer):
+    bbox = serializers.CharField()
+    zoom = serializers.IntegerField(min_value=0, max_value=22)
+
+    def validate_bbox(self, value):
+        try:
+            min_lng, min_lat, max_lng, max_lat = map(float, value.split(','))
+        except ValueError:
+            raise serializers.ValidationError("Expected bbox=min_lng,min_lat,max_lng,max_lat")
+        return min_lng, min_lat, max_lng, max_lat
+
+
+class TagFacetSerializer(serializers.Serializer):
+    tag = serializers.CharField()
+    count = serializers.IntegerField()
+
+
+class CandidateSubmissionSerializer(serializers.ModelSerializer):
     kind = serializers.ChoiceField(choices=Submission.Kind.choices, default=Submission.Kind.MANUAL)
 
     class Meta:
         model = Submission
         fields = (
             'id', 'public_id', 'created_at', 'last_modified_at', "kind", "name", "address", "city", "country", "lat", "lng", "price_band",
-            "tags", "hours_text", "email", "photo_url", "transcript", "raw_payload"
+            "tags", "hours_text", "email", "photo_url", "photo_id", "transcript", "raw_payload"
         )
 
+    def validate_photo_id(self, value):
+        if value and not Photo.objects.filter(digest=value).exists():
+            raise serializers.ValidationError("Unknown media id; upload the photo to /media/photos/ first.")
+        return value
+
     def validate(self, attrs):
-        lat, lng = attrs['lat'], attrs['lng']
+        lat, lng = attrs.get('lat'), attrs.get('lng')
         if (lat is not None) ^ (lng is not None):
             raise serializers.ValidationError("Provide both lat and lng together, or leave both empty.")
         return attrs
\ No newline at end of file
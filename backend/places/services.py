@@ -1,45 +1,143 @@
-# TODO: To inject a city-centroid geocoder later
-from typing import Dict, Any, Tuple
+import re
+import unicodedata
+from typing import Dict, Any, List, Tuple
 
-from places.models import Submission, Candidate
+from django.db import transaction
+
+from places import gazetteer, hours, lexicon, matching, near_duplicates, scoring, selectors
+from places.geo import geohash_encode, geohash_neighbours
+from places.models import Submission, Candidate, Spot, SpotOpenInterval, SpotTag
+
+DEDUPE_GEOHASH_PRECISION = 6  # ~1.2km x 0.6km cells
+DEDUPE_KEY_MAX_LENGTH = 128
 
 
 def geocode_if_needed(sub: Submission) -> Tuple[float | None, float | None, str]:
+    """Falls back to the offline gazetteer's lga/city/state centroid when coordinates are missing."""
     if sub.lat is not None and sub.lng is not None:
         return sub.lat, sub.lng, "address"
+    place = gazetteer.geocode(sub.city, sub.state, sub.address)
+    if place is not None:
+        return place.lat, place.lng, place.kind
     return None, None, "city"
 
 
 def compute_signals(sub: Submission) -> Dict[str, Any]:
-    hits = 0
-    for kw in ("amala","abula","gbegiri","ewedu","buka"):
-        if kw in (sub.name or "").lower() or kw in (sub.address or "").lower():
-            hits += 1
     return {
-        "keyword_hits": hits,
-        "has_photo": bool(sub.photo_url),
-        "has_coords": sub.lat is not None and sub.lng is not None,
+        **scoring.keyword_signals(sub.name, sub.address, sub.transcript, *lexicon.iter_payload_text(sub.raw_payload)),
+        "has_photo": bool(sub.photo_url or sub.photo_id),
+        "has_coords": scoring.has_coords(sub.lat, sub.lng),  # the submission's own, not the geocoded ones
     }
 
 
 def compute_score(signals: Dict[str, Any]) -> float:
     score = 0.0
-    score += 0.35 if signals.get("keyword_hits", 0) >= 1 else 0.0
-    score += 0.10 if signals.get("has_photo") else 0.0
-    score += 0.10 if signals.get("has_coords") else 0.0
+    score += scoring.SCORING_WEIGHTS["keyword"] if signals.get("keyword_hits", 0) >= 1 else 0.0
+    score += scoring.SCORING_WEIGHTS["photo"] if signals.get("has_photo") else 0.0
+    score += scoring.SCORING_WEIGHTS["coords"] if signals.get("has_coords") else 0.0
     return max(0.0, min(1.0, score))
 
 
-# TODO: To add geohash bucket if lat/lng present
+def normalize_name(name: str | None) -> str:
+    """Case, accent and punctuation insensitive form of a spot name: "Àmàlà  Skoto!" -> "amala skoto"."""
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[\W_]+", " ", stripped.casefold()).split())
+
+
+def _compose_dedupe_key(norm: str, cell: str | None) -> str:
+    if cell is None:
+        return f"name:{norm}"[:DEDUPE_KEY_MAX_LENGTH]
+    suffix = f"@{cell}"
+    return norm[:DEDUPE_KEY_MAX_LENGTH - len(suffix)] + suffix
+
+
 def make_dedupe_key(name: str | None, lat: float | None, lng: float | None) -> str:
-    norm = (name or "").strip().lower()
-    return f"name:{norm}"
+    """
+    `<normalized name>@<geohash>` when coordinates are known, `name:<normalized name>` otherwise.
+    """
+    norm = normalize_name(name)
+    if lat is None or lng is None:
+        return _compose_dedupe_key(norm, None)
+    return _compose_dedupe_key(norm, geohash_encode(lat, lng, DEDUPE_GEOHASH_PRECISION))
+
+
+def make_dedupe_lookup_keys(name: str | None, lat: float | None, lng: float | None) -> List[str]:
+    """
+    All keys a duplicate of this place could have been stored under: the 3x3 block of
+    geohash cells around it, so places straddling a cell border still collide.
+    """
+    norm = normalize_name(name)
+    if lat is None or lng is None:
+        return [_compose_dedupe_key(norm, None)]
+    cell = geohash_encode(lat, lng, DEDUPE_GEOHASH_PRECISION)
+    return [_compose_dedupe_key(norm, c) for c in geohash_neighbours(cell)]
+
+
+def find_duplicate_candidate_ids(name: str | None, lat: float | None, lng: float | None, limit: int = 10) -> List[int]:
+    keys = make_dedupe_lookup_keys(name, lat, lng)
+    return list(selectors.get_candidates_by_dedupe_keys(keys).values_list("id", flat=True)[:limit])
+
+
+def normalize_tags(tags) -> List[str]:
+    normalized = []
+    for tag in tags or []:
+        tag = str(tag).strip().casefold()[:64]
+        if tag and tag not in normalized:
+            normalized.append(tag)
+    return normalized
+
+
+def sync_spot_tags(spot: Spot):
+    """Rewrites the SpotTag rows of one spot from its `tags` JSON list."""
+    wanted = set(normalize_tags(spot.tags))
+    current = set(SpotTag.objects.filter(spot=spot).values_list("tag", flat=True))
+    if wanted == current:
+        return
+    SpotTag.objects.filter(spot=spot, tag__in=current - wanted).delete()
+    SpotTag.objects.bulk_create([SpotTag(spot=spot, tag=tag) for tag in wanted - current], ignore_conflicts=True)
+
+
+def open_interval_rows(spot: Spot) -> List[SpotOpenInterval]:
+    return [
+        SpotOpenInterval(spot=spot, start=start, end=end)
+        for start, end in hours.split_by_day(hours.parse_open_hours(spot.open_hours))
+    ]
+
+
+def sync_spot_open_hours(spot: Spot):
+    """Rewrites the SpotOpenInterval rows of one spot from its `open_hours`."""
+    SpotOpenInterval.objects.filter(spot=spot).delete()
+    SpotOpenInterval.objects.bulk_create(open_interval_rows(spot))
+
+
+def rebuild_open_intervals(batch_size: int = 2000) -> int:
+    """Rewrites every SpotOpenInterval row (after bulk writes that bypass model signals)."""
+    written, rows = 0, []
+    with transaction.atomic():
+        SpotOpenInterval.objects.all().delete()
+        for spot in Spot.objects.only("id", "open_hours").iterator(chunk_size=batch_size):
+            rows += open_interval_rows(spot)
+            if len(rows) >= batch_size:
+                SpotOpenInterval.objects.bulk_create(rows)
+                written, rows = written + len(rows), []
+        SpotOpenInterval.objects.bulk_create(rows)
+    return written + len(rows)
+
+
+def open_hours_from_text(text: str | None) -> Dict[str, List[List[str]]] | None:
+    intervals = hours.parse_hours_text(text)
+    return hours.format_open_hours(intervals) if intervals else None
 
 
 def create_candidate_from_submission(sub: Submission) -> Candidate:
     lat, lng, precision = geocode_if_needed(sub)
     signals = compute_signals(sub)
     score   = compute_score(signals)
+    signals["possible_duplicates"] = find_duplicate_candidate_ids(sub.name, lat, lng)
+    match = matching.suggest_spot(sub.name, lat, lng, sub.city, precision)
+    similar = near_duplicates.find_near_duplicates(sub.name, lat, lng, precision)
+    signals["near_duplicates"] = [duplicate._asdict() for duplicate in similar]
 
     candidate = Candidate.objects.create(
         name=sub.name,
@@ -49,13 +147,22 @@ def create_candidate_from_submission(sub: Submission) -> Candidate:
         lat=lat,
         lng=lng,
         price_band=sub.price_band or "",
+        photo_url=sub.photo_url or "",
+        photo_id=sub.photo_id or "",
+        open_hours=open_hours_from_text(sub.hours_text),
+        tags=normalize_tags(sub.tags),
         source_url="",
         source_kind="user",
         evidence=[{"kind": "user_submit", "photo_url": sub.photo_url}] if sub.photo_url else [],
         signals=signals,
         score=score,
+        scoring_version=scoring.SCORING_VERSION,
         dedupe_key=make_dedupe_key(sub.name, lat, lng),
         geo_precision=precision,
         status="pending_verification",
+        suggested_spot_id=match.spot_id if match else None,
+        suggested_spot_score=match.score if match else None,
+        near_duplicate_cluster=near_duplicates.join_cluster(similar),
     )
+    near_duplicates.index(near_duplicates.CANDIDATE, [candidate])
     return candidate
\ No newline at end of file
@@ -0,0 +1,94 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from commons.versioning import bump_version
+from places import clusters, near_duplicates, services, tiles
+from places.models import Candidate, Spot
+
+
+# the fields the post_save receivers below compare with their stored value
+_TRACKED_FIELDS = ("lat", "lng", "tags", "name", "open_hours")
+
+
+@receiver(pre_save, sender=Spot)
+def remember_previous_state(sender, instance: Spot, raw=False, update_fields=None, **kwargs):
+    """
+    Fields outside `update_fields` are not written by this save, so their previous value is the
+    instance's own; the stored row is only read for the tracked fields being written, if any.
+    """
+    instance._previous_position, instance._previous_tags, instance._previous_name = None, None, None
+    instance._previous_open_hours = None
+    if instance.pk and not raw:
+        written = [name for name in _TRACKED_FIELDS if update_fields is None or name in update_fields]
+        previous = [getattr(instance, name) for name in _TRACKED_FIELDS]
+        if written:
+            stored = Spot.objects.filter(pk=instance.pk).values(*written).first()
+            previous = None if stored is None else [stored.get(name, value) for name, value in zip(_TRACKED_FIELDS, previous)]
+        if previous is not None:
+            instance._previous_position, instance._previous_tags, instance._previous_name = tuple(previous[:2]), previous[2], previous[3]
+            instance._previous_open_hours = previous[4]
+
+
+@receiver(post_save, sender=Spot)
+def update_clusters_on_save(sender, instance: Spot, created, raw=False, **kwargs):
+    previous = getattr(instance, "_previous_position", None)
+    if created:
+        clusters.add_spot(instance)
+    elif previous is not None and previous != (instance.lat, instance.lng):
+        clusters.remove_spot(instance.pk, *previous)
+        clusters.add_spot(instance)
+
+
+@receiver(post_save, sender=Spot)
+def sync_tags_on_save(sender, instance: Spot, created, raw=False, **kwargs):
+    if created or raw or getattr(instance, "_previous_tags", None) != instance.tags:
+        services.sync_spot_tags(instance)
+
+
+@receiver(post_save, sender=Spot)
+def sync_open_hours_on_save(sender, instance: Spot, created, raw=False, **kwargs):
+    if created or raw or getattr(instance, "_previous_open_hours", None) != instance.open_hours:
+        services.sync_spot_open_hours(instance)
+
+
+@receiver(post_save, sender=Spot)
+def index_name_on_save(sender, instance: Spot, created, raw=False, **kwargs):
+    if created or raw or getattr(instance, "_previous_name", None) != instance.name:
+        near_duplicates.index(near_duplicates.SPOT, [instance])
+
+
+@receiver(post_save, sender=Spot)
+def invalidate_tiles_on_save(sender, instance: Spot, **kwargs):
+    positions = {(instance.lat, instance.lng)}
+    previous = getattr(instance, "_previous_position", None)
+    if previous is not None:
+        positions.add(previous)
+    transaction.on_commit(lambda: [tiles.invalidate_position(*position) for position in positions])
+
+
+@receiver(post_delete, sender=Spot)
+def update_clusters_on_delete(sender, instance: Spot, **kwargs):
+    clusters.remove_spot(instance.pk, instance.lat, instance.lng)
+
+
+@receiver(post_delete, sender=Spot)
+def unindex_name_on_delete(sender, instance: Spot, **kwargs):
+    near_duplicates.unindex(near_duplicates.SPOT, [instance.pk])
+
+
+@receiver(post_delete, sender=Candidate)
+def unindex_candidate_name_on_delete(sender, instance: Candidate, **kwargs):
+    near_duplicates.unindex(near_duplicates.CANDIDATE, [instance.pk])
+
+
+@receiver(post_delete, sender=Spot)
+def invalidate_tiles_on_delete(sender, instance: Spot, **kwargs):
+    lat, lng = instance.lat, instance.lng
+    transaction.on_commit(lambda: tiles.invalidate_position(lat, lng))
+
+
+@receiver(post_save, sender=Spot)
+@receiver(post_delete, sender=Spot)
+def bump_spots_version(sender, **kwargs):
+    bump_version("spots")
@@ -0,0 +1,229 @@
+"""
+Synthetic atlas data for benchmarks and local load testing.
+
+Spots and candidates are scattered around the gazetteer's city centroids (places/data/gazetteer_ng.json),
+weighted towards the south-west where amala is eaten, with a tag and price_band mix close to the real
+submissions. Everything is drawn from one seeded `random.Random`, so a seed and a scale always produce
+the same rows. Rows are bulk-created in batches; the side indexes that model signals normally maintain
+(SpotTag, SpotOpenInterval, name MinHash buckets, clusters) are written explicitly.
+"""
+import json
+import random
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from django.db import transaction
+
+from commons.versioning import bump_version
+from places import clusters, near_duplicates, scoring, services, tiles
+from places.gazetteer import GAZETTEER_PATH
+from places.models import Candidate, Spot, SpotOpenInterval, SpotTag, Submission
+from users.models import User
+from verification.models import Verification
+from verification.services import APPROVE_THRESHOLD, REJECT_THRESHOLD
+
+SYNTHETIC_BATCH_SIZE = 5000
+SYNTHETIC_SPREAD_KM = 6.0  # standard deviation of the scatter around a city centroid
+_KM_PER_DEGREE = 111.0
+
+# relative weight per city; every other gazetteer city gets DEFAULT_CITY_WEIGHT
+CITY_WEIGHTS = {
+    "Lagos": 30, "Ibadan": 20, "Abeokuta": 6, "Abuja": 6, "Ogbomosho": 5, "Osogbo": 5, "Ilorin": 5,
+    "Akure": 4, "Ile-Ife": 3, "Oyo": 3, "Ado-Ekiti": 3, "Ijebu-Ode": 2, "Sagamu": 2, "Ota": 2, "Ilesa": 2,
+}
+DEFAULT_CITY_WEIGHT = 0.5
+
+TAG_WEIGHTS = {"amala": 60, "ewedu": 45, "gbegiri": 40, "buka": 25, "abula": 15, "lafun": 10, "assorted": 12,
+               "ogunfe": 6, "takeaway": 8, "late-night": 4}
+PRICE_BAND_WEIGHTS = {"₦": 50, "₦₦": 35, "₦₦₦": 10, "": 5}
+SOURCE_KIND_WEIGHTS = {"user": 40, "agent": 25, "blog": 15, "directory": 12, "social": 8}
+
+_PREFIXES = ("Mama", "Iya", "Baba", "Alhaja", "Buka", "Amala", "Oga", "Madam")
+_GIVEN = ("Sikiru", "Risi", "Tope", "Bose", "Kemi", "Ade", "Funmi", "Shitta", "Ajoke", "Basira", "Ronke", "Wale",
+          "Yemisi", "Kunle", "Titi", "Gbenga", "Abike", "Lateef", "Sola", "Bisi")
+_SUFFIXES = ("Amala Spot", "Buka", "Kitchen", "Canteen", "Eatery", "Joint", "Amala & Ewedu", "Food Centre", "Place")
+_STREETS = ("Allen Avenue", "Bode Thomas", "Ring Road", "Adeniran Ogunsanya", "Oke-Ado", "Challenge", "Dugbe",
+            "Mokola", "Agege Motor Road", "Herbert Macaulay Way", "Awolowo Road", "Ojuelegba Road")
+
+
+def load_cities() -> Tuple[List[dict], List[float]]:
+    cities = [entry for entry in json.loads(GAZETTEER_PATH.read_text()) if entry["kind"] == "city"]
+    return cities, [CITY_WEIGHTS.get(city["name"], DEFAULT_CITY_WEIGHT) for city in cities]
+
+
+def _choices(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(tuple(weights), weights=tuple(weights.values()))[0]
+
+
+class AtlasGenerator:
+
+    def __init__(self, seed: int = 7, batch_size: int = SYNTHETIC_BATCH_SIZE):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.cities, self.city_weights = load_cities()
+
+    def _city(self) -> dict:
+        return self.rng.choices(self.cities, weights=self.city_weights)[0]
+
+    def _position(self, city: dict) -> Tuple[float, float]:
+        spread = SYNTHETIC_SPREAD_KM / _KM_PER_DEGREE
+        return round(self.rng.gauss(city["lat"], spread), 6), round(self.rng.gauss(city["lng"], spread), 6)
+
+    def _name(self) -> str:
+        rng = self.rng
+        name = f"{rng.choice(_PREFIXES)} {rng.choice(_GIVEN)} {rng.choice(_SUFFIXES)}"
+        return f"{name} {rng.randint(2, 9)}" if rng.random() < 0.2 else name
+
+    def _tags(self) -> List[str]:
+        count = min(len(TAG_WEIGHTS), max(0, round(self.rng.gauss(2.5, 1.2))))
+        tags: List[str] = []
+        while len(tags) < count:
+            tag = _choices(self.rng, TAG_WEIGHTS)
+            if tag not in tags:
+                tags.append(tag)
+        return tags
+
+    def _address(self) -> str:
+        return f"{self.rng.randint(1, 250)} {self.rng.choice(_STREETS)}"
+
+    def _open_hours(self) -> Dict[str, List[List[str]]] | None:
+        if self.rng.random() < 0.3:
+            return None
+        opens, closes = f"{self.rng.randint(6, 10):02d}:00", f"{self.rng.randint(17, 22):02d}:00"
+        days = ("mon", "tue", "wed", "thu", "fri", "sat") + (("sun",) if self.rng.random() < 0.4 else ())
+        return {day: [[opens, closes]] for day in days}
+
+    def _batches(self, count: int) -> Iterator[int]:
+        for start in range(0, count, self.batch_size):
+            yield min(self.batch_size, count - start)
+
+    def spots(self, count: int) -> int:
+        for size in self._batches(count):
+            batch = []
+            for _ in range(size):
+                city = self._city()
+                lat, lng = self._position(city)
+                batch.append(Spot(
+                    name=self._name(), lat=lat, lng=lng, address=self._address(), city=city["name"],
+                    state=city["state"], price_band=_choices(self.rng, PRICE_BAND_WEIGHTS), tags=self._tags(),
+                    open_hours=self._open_hours(), source="synthetic",
+                ))
+            with transaction.atomic():
+                Spot.objects.bulk_create(batch)
+                SpotTag.objects.bulk_create([SpotTag(spot=spot, tag=tag) for spot in batch for tag in spot.tags],
+                                            ignore_conflicts=True)
+                SpotOpenInterval.objects.bulk_create([row for spot in batch for row in services.open_interval_rows(spot)])
+                near_duplicates.index(near_duplicates.SPOT, batch)
+        return count
+
+    def _candidate(self) -> Candidate:
+        rng = self.rng
+        city = self._city()
+        positioned = rng.random() < 0.7
+        sub = Submission(name=self._name(), address=self._address() if rng.random() < 0.6 else "",
+                         city=city["name"], state=city["state"], price_band=_choices(rng, PRICE_BAND_WEIGHTS),
+                         photo_url=f"https://example.com/photos/{rng.getrandbits(40):x}.jpg" if rng.random() < 0.4 else "")
+        if positioned:
+            sub.lat, sub.lng = self._position(city)
+        lat, lng, precision = services.geocode_if_needed(sub)
+        signals = services.compute_signals(sub)
+        return Candidate(
+            name=sub.name, raw_address=sub.address, city=sub.city, lat=lat, lng=lng, price_band=sub.price_band,
+            photo_url=sub.photo_url, open_hours=self._open_hours(), tags=self._tags(),
+            source_kind=_choices(rng, SOURCE_KIND_WEIGHTS), signals=signals, score=services.compute_score(signals),
+            scoring_version=scoring.SCORING_VERSION, dedupe_key=services.make_dedupe_key(sub.name, lat, lng),
+            geo_precision=precision, status="pending_verification",
+        )
+
+    def candidates(self, count: int) -> int:
+        for size in self._batches(count):
+            batch = [self._candidate() for _ in range(size)]
+            with transaction.atomic():
+                Candidate.objects.bulk_create(batch)
+                near_duplicates.index(near_duplicates.CANDIDATE, batch)
+        return count
+
+    def submissions(self, count: int) -> int:
+        """Submissions, each linked to a distinct candidate while unlinked candidates remain."""
+        free = Candidate.objects.filter(submission__isnull=True).order_by("id").values_list(
+            "id", "name", "city", "lat", "lng", "price_band", "photo_url")
+        linked = iter(free.iterator(chunk_size=self.batch_size))
+        for size in self._batches(count):
+            batch = []
+            for _ in range(size):
+                row = next(linked, None)
+                kind = Submission.Kind.AGENTIC if self.rng.random() < 0.3 else Submission.Kind.MANUAL
+                if row is None:
+                    city = self._city()
+                    batch.append(Submission(name=self._name(), kind=kind, city=city["name"], state=city["state"]))
+                    continue
+                candidate_id, name, city, lat, lng, price_band, photo_url = row
+                batch.append(Submission(
+                    name=name, kind=kind, city=city, lat=lat, lng=lng, price_band=price_band, photo_url=photo_url,
+                    tags=self._tags(), email=f"user{self.rng.randint(1, 50_000)}@example.com",
+                    candidate_id=candidate_id,
+                ))
+            Submission.objects.bulk_create(batch)
+        return count
+
+    def reviewers(self, count: int) -> List[User]:
+        existing = User.objects.filter(username__startswith="synthetic-reviewer-").count()
+        User.objects.bulk_create([User(username=f"synthetic-reviewer-{i}") for i in range(existing, count)])
+        return list(User.objects.filter(username__startswith="synthetic-reviewer-").order_by("id")[:count])
+
+    def verifications(self, count: int, reviewers: Sequence[User]) -> int:
+        """
+        Approve/reject votes from distinct reviewers on random pending candidates, kept below the
+        promotion thresholds so the queue stays pending; the denormalized counters are updated to match.
+        """
+        candidate_ids = list(Candidate.objects.filter(status="pending_verification").values_list("id", flat=True))
+        if not candidate_ids or not reviewers:
+            return 0
+        votes: Dict[int, Dict[str, List[User]]] = {}
+        written = 0
+        for _ in range(count * 3):
+            if written == count:
+                break
+            candidate_id = self.rng.choice(candidate_ids)
+            cast = votes.setdefault(candidate_id, {"approve": [], "reject": []})
+            action = "approve" if self.rng.random() < 0.55 else "reject"
+            limit = APPROVE_THRESHOLD if action == "approve" else REJECT_THRESHOLD
+            reviewer = self.rng.choice(reviewers)
+            if len(cast[action]) + 1 >= limit or any(reviewer in users for users in cast.values()):
+                continue
+            cast[action].append(reviewer)
+            written += 1
+
+        rows = [
+            Verification(candidate_id=candidate_id, action=action, by_user=reviewer)
+            for candidate_id, cast in votes.items() for action, users in cast.items() for reviewer in users
+        ]
+        with transaction.atomic():
+            Verification.objects.bulk_create(rows, batch_size=self.batch_size)
+            counts = [(candidate_id, len(cast["approve"]), len(cast["reject"])) for candidate_id, cast in votes.items()]
+            for start in range(0, len(counts), self.batch_size):
+                chunk = {candidate_id: (approvals, rejections) for candidate_id, approvals, rejections in
+                         counts[start:start + self.batch_size]}
+                updated = list(Candidate.objects.filter(id__in=chunk).only("id"))
+                for candidate in updated:
+                    candidate.approvals_count, candidate.rejections_count = chunk[candidate.id]
+                Candidate.objects.bulk_update(updated, ["approvals_count", "rejections_count"])
+        return len(rows)
+
+    def finish(self):
+        """Rebuilds what bulk writes bypass: the spot clusters, the spots dataset version (response caches) and the tile cache."""
+        clusters.rebuild()
+        bump_version("spots")
+        tiles.clear()
+
+
+def generate_atlas(spots: int, candidates: int, submissions: int, verifications: int, reviewers: int = 200,
+                   seed: int = 7) -> Dict[str, int]:
+    generator = AtlasGenerator(seed)
+    written = {
+        "spots": generator.spots(spots),
+        "candidates": generator.candidates(candidates),
+        "submissions": generator.submissions(submissions),
+        "verifications": generator.verifications(verifications, generator.reviewers(reviewers) if verifications else []),
+    }
+    generator.finish()
+    return written
@@ -1,3 +1,668 @@
-from django.test import TestCase
+import io
+import json
+import random
+import shutil
+import tempfile
+import uuid
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from commons import jobs
+from commons.models import Job
+from commons.renderers import _dumps
+from commons.serialization import UnsupportedSerializer, ValuesRepresentation, render_json_list
+from commons.versioning import bump_version
+from places import clusters, gazetteer, hours, minhash, near_duplicates, scoring, selectors, services, synthetic, tiles
+from places.filters import GetSpotsFilter
+from places.geo import geohash_encode, geohash_neighbours
+from places.management.commands._bench import populate_random_spots
+from places.models import Candidate, Spot, SpotCluster, Submission
+from places.serializers import GetSpotSerializer
+from places.views import AsyncSpotView, SpotViewSet
+
+
+class DedupeKeyTest(TestCase):
+
+    def test_geohash(self):
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(sorted(geohash_neighbours("ezs42")),
+                         ["ezefp", "ezefr", "ezefx", "ezs40", "ezs41", "ezs42", "ezs43", "ezs48", "ezs49"])
+
+    def test_keys(self):
+        self.assertEqual(services.make_dedupe_key("Àmàlà  Skoto!", 6.5172, 3.3781), "amala skoto@s14mhf")
+        self.assertEqual(services.make_dedupe_key("Amala Skoto", None, 3.3781), "name:amala skoto")
+        self.assertEqual(services.make_dedupe_lookup_keys("Amala Skoto", None, None), ["name:amala skoto"])
+        self.assertEqual(len(services.make_dedupe_lookup_keys("Amala Skoto", 6.5172, 3.3781)), 9)
+
+    def test_duplicate_across_a_cell_border(self):
+        # s14mhf's eastern edge is at lng 3.3837890625; these two points are ~2m apart on either side
+        west = Candidate.objects.create(name="Amala Skoto", lat=6.5172, lng=3.38378,
+                                        dedupe_key=services.make_dedupe_key("Amala Skoto", 6.5172, 3.38378))
+        self.assertNotEqual(west.dedupe_key, services.make_dedupe_key("Amala Skoto", 6.5172, 3.3838))
+        self.assertEqual(services.find_duplicate_candidate_ids("AMALA skoto", 6.5172, 3.3838), [west.pk])
+        self.assertEqual(services.find_duplicate_candidate_ids("Amala Skoto", 6.6, 3.3838), [])
+        self.assertEqual(services.find_duplicate_candidate_ids("Iya Risi", 6.5172, 3.3838), [])
+
+
+class SpotBboxTest(TestCase):
+    """The R*Tree bbox filter returns exactly the rows of the plain range predicates."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(-3, 4):
+            for j in range(-3, 4):
+                Spot.objects.create(name=f"Spot {i} {j}", lat=6.5 + i / 100, lng=3.35 + j / 100)
+
+    def in_bbox(self, *bbox):
+        return set(selectors.filter_spots_in_bbox(Spot.objects.all(), *bbox).values_list("name", flat=True))
+
+    def in_range(self, min_lng, min_lat, max_lng, max_lat):
+        return set(Spot.objects.filter(lng__gte=min_lng, lng__lte=max_lng, lat__gte=min_lat, lat__lte=max_lat)
+                   .values_list("name", flat=True))
+
+    def test_matches_range_filter(self):
+        # the last two sit a float32 rounding step inside the edge points, which the R*Tree alone would keep
+        for bbox in ((3.33, 6.48, 3.37, 6.52), (3.35, 6.5, 3.35, 6.5), (0.0, 0.0, 1.0, 1.0),
+                     (3.32, 6.47, 3.3499999, 6.4999999), (3.3500001, 6.5000001, 3.38, 6.53)):
+            with self.subTest(bbox=bbox):
+                self.assertEqual(self.in_bbox(*bbox), self.in_range(*bbox))
+        self.assertEqual(len(self.in_bbox(3.33, 6.48, 3.37, 6.52)), 25)
+        self.assertEqual(self.in_bbox(3.32, 6.47, 3.3499999, 6.4999999), {f"Spot {i} {j}" for i in (-3, -2, -1) for j in (-3, -2, -1)})
+
+    def test_follows_moves_and_deletes(self):
+        spot = Spot.objects.get(name="Spot 0 0")
+        spot.lat, spot.lng = 9.0, 7.4
+        spot.save()
+        self.assertEqual(self.in_bbox(7.3, 8.9, 7.5, 9.1), {"Spot 0 0"})
+        self.assertNotIn("Spot 0 0", self.in_bbox(3.33, 6.48, 3.37, 6.52))
+        spot.delete()
+        self.assertEqual(self.in_bbox(7.3, 8.9, 7.5, 9.1), set())
+
+    def test_bbox_query_param(self):
+        filtered = GetSpotsFilter({"bbox": "3.345,6.495,3.355,6.505"}, queryset=Spot.objects.all()).qs
+        self.assertEqual(set(filtered.values_list("name", flat=True)), {"Spot 0 0"})
+
+
+class NearbySpotsTest(TestCase):
+    """/spots/nearby/: the k closest spots inside the radius, nearest first."""
+
+    @classmethod
+    def setUpTestData(cls):
+        # along the equator 0.01 degrees of longitude is ~1.11 km
+        for i, city in ((1, "Lagos"), (3, "Ibadan"), (2, "Lagos"), (5, "Lagos"), (20, "Lagos")):
+            Spot.objects.create(name=f"Spot {i}", lat=0.0, lng=i / 100, city=city)
+
+    def nearby(self, **params):
+        response = self.client.get("/spots/nearby/", {"format": "json", "lat": 0, "lng": 0, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_nearest_first(self):
+        spots = self.nearby(k=10, radius_km=10)
+        self.assertEqual([spot["name"] for spot in spots], ["Spot 1", "Spot 2", "Spot 3", "Spot 5"])
+        self.assertEqual([spot["distance_km"] for spot in spots], [1.112, 2.224, 3.336, 5.56])
+
+    def test_k_and_radius(self):
+        self.assertEqual([spot["name"] for spot in self.nearby(k=2, radius_km=10)], ["Spot 1", "Spot 2"])
+        self.assertEqual([spot["name"] for spot in self.nearby(k=10, radius_km=3)], ["Spot 1", "Spot 2"])
+        self.assertEqual([spot["name"] for spot in self.nearby(k=1, radius_km=50)], ["Spot 1"])
+        self.assertEqual(self.nearby(lat=10, lng=10), [])
+
+    def test_filters_apply(self):
+        self.assertEqual([spot["name"] for spot in self.nearby(city="lagos", radius_km=100)],
+                         ["Spot 1", "Spot 2", "Spot 5", "Spot 20"])
+
+    def test_invalid_params(self):
+        for params in ({"lat": 91}, {"k": 0}, {"radius_km": 500}, {"lng": "east"}):
+            with self.subTest(**params):
+                response = self.client.get("/spots/nearby/", {"format": "json", "lat": 0, "lng": 0, **params})
+                self.assertEqual(response.status_code, 400)
+
+
+class SpotClusterTest(TestCase):
+    """Clusters kept up to date by the Spot signals match a rebuild; bbox queries are bounded."""
+
+    def snapshot(self):
+        return sorted(SpotCluster.objects.values_list("zoom", "cell_x", "cell_y", "count", "representative"))
+
+    def test_incremental_matches_rebuild(self):
+        rng = random.Random(3)
+        spots = [Spot.objects.create(name=f"Spot {i}", lat=rng.uniform(6.4, 6.7), lng=rng.uniform(3.2, 3.5)) for i in range(20)]
+        spots[0].lat, spots[0].lng = 7.3775, 3.947
+        spots[0].save()
+        spots[1].delete()
+        incremental = self.snapshot()
+        clusters.rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_save_costs(self):
+        spot = Spot.objects.create(name="Amala Skoto", lat=6.5172, lng=3.3781)
+        spot.price_band = "₦"
+        with self.assertNumQueries(2):  # the UPDATE and bump_version: no read-back, no cluster statements
+            spot.save(update_fields=["price_band", "last_modified_at"])
+        spot.lat = 6.6
+        with self.assertNumQueries(13):  # read-back of lat, then every cluster level moved in a few statements
+            spot.save(update_fields=["lat", "last_modified_at"])
+
+    def test_bbox_rows_are_bounded(self):
+        Spot.objects.create(name="Amala Skoto", lat=6.5172, lng=3.3781)
+        with mock.patch.object(clusters, "CLUSTER_MAX_CELLS", 16):
+            [cluster] = clusters.clusters_in_bbox(16, -180, -85, 180, 85)
+        self.assertEqual(cluster.zoom, 0)
+        [cluster] = clusters.clusters_in_bbox(16, 3.37, 6.51, 3.38, 6.52)
+        self.assertEqual(cluster.zoom, 16)
+
+
+class SpotTileTest(TestCase):
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        override = self.settings(SPOT_TILE_CACHE_DIR=cache_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_encode_known_point(self):
+        row = (7, "0b3b4c9e-0000-4000-8000-000000000001", "Amala Skoto", "₦", ["amala", "ewedu"], 6.5172, 3.3781)
+        self.assertEqual(tiles._tile_pixel(6.5172, 3.3781, 10, 521, 493), (2494, 1729))
+        feature = (
+            b"\x08\x07"  # id 7
+            b"\x12\x08\x00\x00\x01\x01\x02\x02\x03\x03"  # tags: key/value index pairs
+            b"\x18\x01"  # POINT
+            b"\x22\x05\x09\xfc\x26\x82\x1b"  # MoveTo(1), zigzag(2494), zigzag(1729)
+        )
+        layer = (
+            b"\x78\x02" + b"\x0a\x05spots" + b"\x12\x15" + feature
+            + b"\x1a\x09public_id\x1a\x04name\x1a\x0aprice_band\x1a\x04tags"
+            + b"\x22\x26\x0a\x24" + row[1].encode() + b"\x22\x0d\x0a\x0bAmala Skoto"
+            + b"\x22\x05\x0a\x03" + "₦".encode() + b"\x22\x0d\x0a\x0bamala,ewedu"
+            + b"\x28\x80\x20"  # extent 4096
+        )
+        self.assertEqual(tiles.encode_tile(10, 521, 493, [row]), b"\x1a\x93\x01" + layer)
+
+    def test_tile_endpoint_follows_spot_moves(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            spot = Spot.objects.create(name="Amala Skoto", lat=6.5172, lng=3.3781, city="Lagos")
+        response = self.client.get("/spots/tiles/10/521/493.pbf")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], tiles.TILE_CONTENT_TYPE)
+        self.assertIn(b"Amala Skoto", response.content)
+        self.assertTrue(tiles._cache_path(10, 521, 493).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            spot.lat, spot.lng = 7.3775, 3.947
+            spot.save()
+        self.assertNotIn(b"Amala Skoto", self.client.get("/spots/tiles/10/521/493.pbf").content)
+        self.assertEqual(self.client.get("/spots/tiles/1/2/0.pbf").status_code, 404)
+
+    def test_edge_point_invalidates_every_tile_containing_it(self):
+        self.assertEqual(sorted(tiles.tiles_containing(0.0, 0.0, 1)), [(0, 0), (0, 1), (1, 0), (1, 1)])
+        self.assertEqual(tiles.tiles_containing(6.5172, 3.3781, 10), [(521, 493)])
+        for x, y in tiles.tiles_containing(0.0, 0.0, 1):
+            tiles.get_tile(1, x, y)
+        tiles.invalidate_position(0.0, 0.0)
+        self.assertFalse(any(tiles._cache_path(1, x, y).exists() for x in (0, 1) for y in (0, 1)))
+
+    def test_tile_encoded_across_a_spot_write_is_not_kept(self):
+        encode = tiles.encode_tile
+
+        def encode_during_write(*args):
+            data = encode(*args)
+            bump_version("spots")  # a spot save committing while the tile was being encoded
+            return data
+
+        with mock.patch.object(tiles, "encode_tile", side_effect=encode_during_write):
+            tiles.get_tile(10, 521, 493)
+        self.assertFalse(tiles._cache_path(10, 521, 493).exists())
+        tiles.get_tile(10, 521, 493)
+        self.assertTrue(tiles._cache_path(10, 521, 493).exists())
+
+    def test_bulk_writers_clear_the_cache(self):
+        tiles.get_tile(10, 521, 493)
+        Spot.objects.bulk_create([Spot(name="Amala Skoto", lat=6.5172, lng=3.3781)])  # no signals
+        self.assertNotIn(b"Amala Skoto", tiles.get_tile(10, 521, 493))
+        call_command("rebuild_spot_clusters", stdout=io.StringIO())
+        self.assertIn(b"Amala Skoto", tiles.get_tile(10, 521, 493))
+
+        world = tiles.get_tile(0, 0, 0)
+        synthetic.generate_atlas(spots=20, candidates=0, submissions=0, verifications=0)
+        self.assertGreater(len(tiles.get_tile(0, 0, 0)), len(world))
+        tiles.clear()
+        tiles.clear()
+        self.assertEqual([path.name for path in Path(settings.SPOT_TILE_CACHE_DIR).iterdir()], [])
+
+
+class SpotTagFilterTest(TestCase):
+    """`?tags=a,b` matches every tag, `?tags=a|b` any of them, through the SpotTag index; /spots/tags/ counts them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Spot.objects.create(name="Amala Skoto", lat=6.5172, lng=3.3781, city="Lagos", tags=["Ewedu", "gbegiri ", "buka"])
+        Spot.objects.create(name="Iya Basira", lat=7.3775, lng=3.947, city="Ibadan", tags=["ewedu", "EWEDU"])
+        Spot.objects.create(name="Mama Put", lat=6.6, lng=3.35, city="Lagos", tags=["buka"])
+        Spot.objects.create(name="Untagged", lat=6.6, lng=3.35, city="Lagos")
+
+    def names(self, tags: str):
+        response = self.client.get("/spots/", {"format": "json", "tags": tags})
+        self.assertEqual(response.status_code, 200)
+        return sorted(spot["name"] for spot in response.json())
+
+    def test_all_and_any(self):
+        self.assertEqual(self.names("ewedu"), ["Amala Skoto", "Iya Basira"])
+        self.assertEqual(self.names("EWEDU,Gbegiri"), ["Amala Skoto"])
+        self.assertEqual(self.names("ewedu,ewedu"), ["Amala Skoto", "Iya Basira"])
+        self.assertEqual(self.names("gbegiri|buka"), ["Amala Skoto", "Mama Put"])
+        self.assertEqual(self.names("ewedu,ofada"), [])
+        self.assertEqual(self.names(" , "), ["Amala Skoto", "Iya Basira", "Mama Put", "Untagged"])
+
+    def test_tag_edits_are_indexed(self):
+        spot = Spot.objects.get(name="Mama Put")
+        spot.tags = ["Ofada"]
+        spot.save()
+        self.assertEqual(self.names("ofada"), ["Mama Put"])
+        self.assertEqual(self.names("buka"), ["Amala Skoto"])
+        spot.delete()
+        self.assertEqual(self.names("ofada"), [])
+
+    def test_facets(self):
+        response = self.client.get("/spots/tags/", {"format": "json"})
+        self.assertEqual(response.json(), [{"tag": "buka", "count": 2}, {"tag": "ewedu", "count": 2}, {"tag": "gbegiri", "count": 1}])
+        response = self.client.get("/spots/tags/", {"format": "json", "city": "lagos"})
+        self.assertEqual(response.json(), [{"tag": "buka", "count": 2}, {"tag": "ewedu", "count": 1}, {"tag": "gbegiri", "count": 1}])
+
+
+class SpotPaginationTest(TestCase):
+    """Keyset pages of /spots/ cover the list exactly once, and `?format=ndjson` streams the same objects."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(7):
+            Spot.objects.create(name=f"Spot {i}", lat=6.5, lng=3.3)
+        # ties on created_at are broken by id
+        Spot.objects.filter(name__in=["Spot 2", "Spot 3", "Spot 4"]).update(created_at=Spot.objects.get(name="Spot 2").created_at)
+
+    def setUp(self):
+        SpotViewSet.response_cache.clear()
+
+    def full_list(self):
+        return self.client.get("/spots/", {"format": "json"}).json()
+
+    def test_pages_cover_the_list_once(self):
+        expected = [spot["id"] for spot in self.full_list()]
+        self.assertEqual(expected, list(Spot.objects.order_by("-created_at", "-id").values_list("id", flat=True)))
+        for page_size in (1, 3, 7, 50):
+            with self.subTest(page_size=page_size):
+                ids, url, params, pages = [], "/spots/", {"format": "json", "page_size": page_size}, 0
+                while url:
+                    page = self.client.get(url, params).json()
+                    ids += [spot["id"] for spot in page["results"]]
+                    url, params, pages = page["next"], None, pages + 1
+                self.assertEqual(ids, expected)
+                self.assertEqual(pages, -(-len(expected) // page_size))
+
+    def test_page_after_a_new_spot(self):
+        first = self.client.get("/spots/", {"format": "json", "page_size": 3}).json()
+        Spot.objects.create(name="Newest", lat=6.5, lng=3.3)
+        second = self.client.get(first["next"]).json()
+        self.assertEqual([spot["name"] for spot in second["results"]], [spot["name"] for spot in self.full_list()[4:7]])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get("/spots/", {"format": "json", "cursor": "zzz"}).status_code, 404)
+
+    def test_ndjson(self):
+        response = self.client.get("/spots/", {"format": "ndjson", "city": ""})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.full_list())
+
+
+class SpotResponseCacheTest(TestCase):
+    """Cached spot responses are kept apart per origin and go stale with writes that skip the Spot signals."""
+
+    def setUp(self):
+        SpotViewSet.response_cache.clear()
+        AsyncSpotView.response_cache.clear()
+
+    @override_settings(ALLOWED_HOSTS=["a.example", "b.example"])
+    def test_next_links_follow_the_origin(self):
+        for i in range(2):
+            Spot.objects.create(name=f"Spot {i}", lat=6.5, lng=3.3)
+        for path in ("/spots/", "/async/spots/"):
+            for host, secure in (("a.example", False), ("b.example", False), ("a.example", True)):
+                with self.subTest(path=path, host=host, secure=secure):
+                    response = self.client.get(path, {"format": "json", "page_size": 1}, HTTP_HOST=host, secure=secure)
+                    self.assertTrue(response.json()["next"].startswith(f"{'https' if secure else 'http'}://{host}{path}?"))
+
+    def test_bulk_writes_bump_the_version(self):
+        first = self.client.get("/spots/", {"format": "json"})
+        self.assertEqual(first.json(), [])
+        populate_random_spots(random.Random(7), 3)
+        second = self.client.get("/spots/", {"format": "json"})
+        self.assertEqual((len(second.json()), second["X-Cache"]), (3, "MISS"))
+        self.assertNotEqual(second["ETag"], first["ETag"])
+
+
+class CandidateSubmissionTest(TestCase):
+    """POST /submit-candidate/ answers 202 straight away; the queued job creates the candidate."""
+
+    def submit(self) -> str:
+        response = self.client.post("/submit-candidate/", {"name": "Amala Skoto", "city": "Lagos", "lat": 6.5172, "lng": 3.3781},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status"], Job.Status.QUEUED)
+        return response.json()["submission_id"]
+
+    def status(self, submission_id: str):
+        response = self.client.get(f"/submit-candidate/{submission_id}/", {"format": "json"})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_accepted_then_created_by_the_worker(self):
+        submission_id = self.submit()
+        self.assertFalse(Candidate.objects.exists())
+        self.assertEqual(self.status(submission_id)["status"], Job.Status.QUEUED)
+
+        [job] = jobs.claim("worker", limit=10)
+        jobs.run_job(job)
+        status = self.status(submission_id)
+        self.assertEqual((status["status"], status["attempts"], status["candidate_status"]),
+                         (Job.Status.SUCCEEDED, 1, "pending_verification"))
+        self.assertEqual(status["candidate_id"], str(Candidate.objects.get().public_id))
+        jobs.run_job(job)  # a retried run finds the candidate already created
+        self.assertEqual(Candidate.objects.count(), 1)
+
+    def test_eager_mode(self):
+        with self.settings(JOB_QUEUE_EAGER=True), self.captureOnCommitCallbacks(execute=True):
+            submission_id = self.submit()
+        self.assertEqual(self.status(submission_id)["status"], Job.Status.SUCCEEDED)
+        self.assertEqual(self.client.get(f"/submit-candidate/{uuid.uuid4()}/").status_code, 404)
+
+
+class GazetteerTest(TestCase):
+
+    def test_lookup(self):
+        self.assertEqual(gazetteer.lookup("Ibadan")[:3], ("Ibadan", "city", "Oyo"))
+        self.assertEqual(gazetteer.lookup("  ÍBADAN! ").name, "Ibadan")
+        self.assertEqual(gazetteer.lookup("Ibadn").name, "Ibadan")  # one typo
+        self.assertEqual(gazetteer.lookup("ogbomoso").name, "Ogbomosho")  # alias
+        self.assertEqual(gazetteer.lookup("Eko").name, "Lagos")
+        self.assertIsNone(gazetteer.lookup("Ibadn", fuzzy=False))
+        self.assertIsNone(gazetteer.lookup("Ibadan", state="Lagos"))
+        self.assertIsNone(gazetteer.lookup("Atlantis"))
+        # the city, not the state of the same name
+        self.assertEqual(gazetteer.lookup("Oyo")[:2], ("Oyo", "city"))
+        self.assertEqual(gazetteer.lookup_state("Oyo")[:2], ("Oyo", "state"))
+
+    def test_geocode(self):
+        self.assertEqual(gazetteer.geocode("Ibadan")[:2], ("Ibadan", "city"))
+        # an address part refines the city to an LGA, matched exactly and within the city's state
+        self.assertEqual(gazetteer.geocode("Ibadan", address="12 Awolowo Road, Bodija")[:2], ("Ibadan North", "lga"))
+        self.assertEqual(gazetteer.geocode("Lagos", address="Bodija")[:2], ("Lagos", "city"))
+        self.assertEqual(gazetteer.geocode("Lagos", address="Allen Avenue, Ikeja")[:2], ("Ikeja", "lga"))
+        self.assertEqual(gazetteer.geocode("", state="Oyo")[:2], ("Oyo", "state"))  # state centroid fallback
+        self.assertIsNone(gazetteer.geocode("Atlantis"))
+
+    def test_submission_geocoding(self):
+        self.assertEqual(services.geocode_if_needed(Submission(name="x", city="Ibadan")), (7.3775, 3.947, "city"))
+        self.assertEqual(services.geocode_if_needed(Submission(name="x", city="Ibadan", lat=7.4, lng=3.9)),
+                         (7.4, 3.9, "address"))
+        self.assertEqual(services.geocode_if_needed(Submission(name="x", city="Atlantis")), (None, None, "city"))
+
+
+class NearDuplicateTest(TestCase):
+    """MinHash/LSH lookup finds names close to an indexed one, and cluster_near_duplicates groups them."""
+
+    NAMES = ["Iya Oyo Amala", "Amala Skoto", "Mama Put Buka", "Iya Basira Kitchen", "Ewedu Palace", "Gbegiri House",
+             "Olaiya Amala Spot", "Amala Shitta", "Buka Joint Surulere", "Iya Eba Canteen", "Amala Ibadan", "Yellow Chilli"]
+
+    @staticmethod
+    def jaccard(a: str, b: str) -> float:
+        a, b = set(minhash.shingles(a)), set(minhash.shingles(b))
+        return len(a & b) / len(a | b)
+
+    def test_recall(self):
+        spots = [Spot.objects.create(name=name, lat=6.5, lng=3.3) for name in self.NAMES]
+        near_duplicates.index(near_duplicates.SPOT, spots)
+        variants = [(spot, variant) for spot in spots
+                    for variant in (spot.name.upper(), f"{spot.name} Joint", f"The {spot.name}", spot.name[:-1] + "x",
+                                    spot.name.replace("a", "à", 1), spot.name.replace(" ", ""))]
+        variants = [(spot, variant) for spot, variant in variants if self.jaccard(spot.name, variant) >= 0.6]
+        self.assertGreater(len(variants), 50)
+        found = [
+            (near_duplicates.SPOT, spot.pk) in [(match.kind, match.object_id) for match in
+                                                near_duplicates.find_near_duplicates(variant, 6.5001, 3.3001)]
+            for spot, variant in variants
+        ]
+        self.assertGreaterEqual(sum(found) / len(found), 0.9)
+        # unrelated names and far away places do not match
+        self.assertEqual(near_duplicates.find_near_duplicates("Suya Spot Yaba", 6.5, 3.3), [])
+        self.assertEqual(near_duplicates.find_near_duplicates("Amala Skoto", 9.0, 7.4), [])
+
+    def test_cluster_command(self):
+        first = Candidate.objects.create(name="Iya Oyo Amala", lat=6.5172, lng=3.3781, geo_precision="address")
+        second = Candidate.objects.create(name="Iya Oyo Amala Joint", lat=6.52, lng=3.38, geo_precision="address")
+        centroid = Candidate.objects.create(name="IYA OYO AMALA", lat=6.6, lng=3.4, geo_precision="city")
+        far = Candidate.objects.create(name="Iya Oyo Amala", lat=9.0, lng=7.4, geo_precision="address")
+        other = Candidate.objects.create(name="Buka Joint", lat=6.5172, lng=3.3781, geo_precision="address")
+        Candidate.objects.filter(pk=other.pk).update(near_duplicate_cluster=other.pk)  # stale
+
+        out = io.StringIO()
+        call_command("cluster_near_duplicates", workers=1, stdout=out)
+        self.assertIn("3 candidates in 1 clusters", out.getvalue())
+        clusters = dict(Candidate.objects.values_list("id", "near_duplicate_cluster"))
+        self.assertEqual([clusters[c.pk] for c in (first, second, centroid, far, other)],
+                         [first.pk, first.pk, first.pk, None, None])
+
+
+class SpotValuesFastPathTest(TestCase):
+    """The `.values_list()` rendering of the spot list must stay byte-identical to GetSpotSerializer."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Spot.objects.create(
+            name="Àmàlà Skoto", lat=6.5172, lng=3.3781, city="Lagos", price_band="₦₦", tags=["ewedu", "gbegiri"],
+            photos=[{"url": "https://example.com/1.jpg", "at": "2025-01-01T00:00:00Z"}],
+            open_hours={"mon": [["08:00", "20:00"]]},
+        )
+        Spot.objects.create(name='Line\u2028break "quoted" \\ spot', lat=1e-05, lng=-0.0, open_hours=None)
+        spot = Spot.objects.create(
+            name="Mama Put", lat=7.3775, lng=3.947, city="Ibadan", state="Oyo", zipcode="200001", tags=["buka"],
+            photos=[{"url": "https://example.com/2.jpg", "meta": {"width": 1.5, "ok": True, "by": None}}],
+        )
+        Spot.objects.filter(pk=spot.pk).update(last_modified_at=None)
+
+    def setUp(self):
+        SpotViewSet.response_cache.clear()
+        self.queryset = Spot.objects.order_by("-created_at", "-id")
+
+    def serializer_bytes(self) -> bytes:
+        return JSONRenderer().render(GetSpotSerializer(self.queryset, many=True).data)
+
+    def test_fields_match_serializer(self):
+        self.assertEqual(ValuesRepresentation(GetSpotSerializer).names, list(GetSpotSerializer().fields))
+
+    def test_bytes_match_serializer(self):
+        representation = ValuesRepresentation(GetSpotSerializer)
+        for zone in ("UTC", "Africa/Lagos"):
+            for chunk_size in (1, 2, 1000):
+                with self.subTest(timezone=zone, chunk_size=chunk_size), timezone.override(zone):
+                    rendered = render_json_list(representation.iter_chunks(self.queryset, chunk_size), JSONRenderer())
+                    self.assertEqual(rendered, self.serializer_bytes())
+
+    def test_empty_list(self):
+        representation = ValuesRepresentation(GetSpotSerializer)
+        self.assertEqual(render_json_list(representation.iter_chunks(Spot.objects.none()), JSONRenderer()), b"[]")
+
+    def test_list_endpoint(self):
+        response = self.client.get("/spots/", {"format": "json"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.serializer_bytes())
+
+    def test_ndjson_endpoint(self):
+        response = self.client.get("/spots/", {"format": "ndjson"})
+        expected = "".join(_dumps(item) + "\n" for item in GetSpotSerializer(self.queryset, many=True).data)
+        self.assertEqual(b"".join(response.streaming_content), expected.encode())
+
+    def test_unsupported_serializer_is_rejected(self):
+        class WithMethodField(GetSpotSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta(GetSpotSerializer.Meta):
+                fields = GetSpotSerializer.Meta.fields + ("label",)
+
+            def get_label(self, spot):
+                return spot.name
+
+        with self.assertRaises(UnsupportedSerializer):
+            ValuesRepresentation(WithMethodField)
+
+
+class OpenHoursTest(TestCase):
+    """places.hours parsing, and the open_now/open_at filters over SpotOpenInterval."""
+
+    def test_parse_hours_text(self):
+        self.assertEqual(hours.format_open_hours(hours.parse_hours_text("Mon-Sat 8am-9pm, Sun 12-6pm")), {
+            **{day: [["08:00", "21:00"]] for day in ("mon", "tue", "wed", "thu", "fri", "sat")},
+            "sun": [["12:00", "18:00"]],
+        })
+        self.assertEqual(hours.parse_hours_text("24/7"), [(0, hours.MINUTES_PER_WEEK)])
+        self.assertEqual(hours.parse_hours_text("Weekdays 9-5; closed sunday"),
+                         [(day * 1440 + 540, day * 1440 + 1020) for day in range(5)])
+        self.assertEqual(hours.parse_hours_text("fri to mon noon-midnight"),
+                         [(720, 1440), (4 * 1440 + 720, 5 * 1440), (5 * 1440 + 720, 6 * 1440), (6 * 1440 + 720, 7 * 1440)])
+        self.assertEqual(hours.parse_hours_text("call for hours"), [])
+        self.assertEqual(hours.parse_hours_text(None), [])
+
+    def test_overnight(self):
+        # Friday 22:00 to Saturday 02:00, split at midnight for storage
+        self.assertEqual(hours.parse_open_hours({"fri": "22:00-02:00"}), [(4 * 1440 + 1320, 5 * 1440 + 120)])
+        self.assertEqual(hours.split_by_day([(4 * 1440 + 1320, 5 * 1440 + 120)]),
+                         [(4 * 1440 + 1320, 5 * 1440), (5 * 1440, 5 * 1440 + 120)])
+        self.assertEqual(hours.format_open_hours(hours.parse_hours_text("Fri 10pm - 2am")),
+                         {"fri": [["22:00", "24:00"]], "sat": [["00:00", "02:00"]]})
+
+    def test_sunday_into_monday(self):
+        self.assertEqual(hours.parse_open_hours({"sun": [["22:00", "02:00"]]}), [(0, 120), (6 * 1440 + 1320, hours.MINUTES_PER_WEEK)])
+        # wraps onto Monday and merges with Monday's own hours
+        self.assertEqual(hours.parse_open_hours({"sun": [["20:00", "03:00"]], "mon": [["02:00", "05:00"]]}),
+                         [(0, 300), (6 * 1440 + 1200, hours.MINUTES_PER_WEEK)])
+
+    def test_parse_open_hours_shapes(self):
+        expected = [(480, 1080), (1440 + 480, 1440 + 1080)]
+        for value in ({"mon": [["08:00", "18:00"]], "tue": ["8am-6pm"]}, {"mon-tue": "8am - 6pm"},
+                      [{"day": "monday", "open": "8:00", "close": "18:00"}, {"days": "tue", "hours": [["08:00", "18:00"]]}],
+                      "Mon-Tue 8am-6pm"):
+            with self.subTest(value=value):
+                self.assertEqual(hours.parse_open_hours(value), expected)
+        self.assertEqual(hours.parse_open_hours({"mon": None, "blursday": "8-6", "tue": "later"}), [])
+
+    def test_parse_moment(self):
+        self.assertEqual(hours.parse_moment("sat 19:30"), 5 * 1440 + 1170)
+        self.assertEqual(hours.parse_moment("Friday 8pm"), 4 * 1440 + 1200)
+        self.assertEqual(hours.parse_moment("2026-10-17T18:30:00Z"), 5 * 1440 + 1170)  # 19:30 in Lagos
+        self.assertEqual(hours.parse_moment("2026-10-17T19:30"), 5 * 1440 + 1170)  # naive: already local
+        self.assertIsNone(hours.parse_moment("sat 25:00"))
+        self.assertIsNone(hours.parse_moment("soon"))
+
+    def test_open_at_filter(self):
+        late = Spot.objects.create(name="Late Buka", lat=6.5, lng=3.3, open_hours={"sun": [["22:00", "02:00"]]})
+        Spot.objects.create(name="Day Buka", lat=6.5, lng=3.3, open_hours="Mon-Sat 8am-9pm")
+        Spot.objects.create(name="No Hours", lat=6.5, lng=3.3)
+
+        def open_at(moment):
+            response = self.client.get("/spots/", {"format": "json", "open_at": moment})
+            self.assertEqual(response.status_code, 200)
+            return sorted(spot["name"] for spot in response.json())
+
+        self.assertEqual(open_at("sun 23:00"), ["Late Buka"])
+        self.assertEqual(open_at("mon 01:59"), ["Late Buka"])
+        self.assertEqual(open_at("mon 02:00"), [])  # closing time is exclusive
+        self.assertEqual(open_at("mon 08:00"), ["Day Buka"])
+        self.assertEqual(self.client.get("/spots/", {"format": "json", "open_at": "whenever"}).status_code, 400)
+
+        late.open_hours = {"mon": "8am-9pm"}
+        late.save()
+        self.assertEqual(open_at("mon 08:00"), ["Day Buka", "Late Buka"])
+        self.assertEqual(open_at("sun 23:00"), [])
+
+
+class CandidateScoringTest(TestCase):
+    """A rescore under unchanged rules must reproduce the score given at insert."""
+
+    def create(self, **fields) -> Candidate:
+        sub = Submission.objects.create(**fields)
+        candidate = services.create_candidate_from_submission(sub)
+        Submission.objects.filter(pk=sub.pk).update(candidate=candidate)
+        candidate.refresh_from_db()
+        return candidate
+
+    def test_rescore_matches_insert(self):
+        geocoded = self.create(name="Iya Basira Amala", city="Ibadan")
+        positioned = self.create(name="Amala Skoto", city="Lagos", lat=6.5172, lng=3.3781,
+                                 photo_url="https://example.com/1.jpg")
+        self.assertIsNotNone(geocoded.lat)  # the city centroid
+        self.assertEqual((geocoded.score, positioned.score), (Decimal("0.350"), Decimal("0.550")))
+
+        self.assertEqual(scoring.rescore_candidates(), {"scanned": 2, "updated": 0})
+        for candidate in (geocoded, positioned):
+            stored = Candidate.objects.get(pk=candidate.pk)
+            self.assertEqual(stored.score, candidate.score)
+            self.assertEqual(stored.signals["has_coords"], candidate.signals["has_coords"])
+
+
+class SpotSearchTest(TestCase):
+    """`?query=` goes through the FTS5 index, ignoring case and Yoruba tone marks."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Spot.objects.create(name="Iya Gbẹ̀gìrì Buka", lat=7.3775, lng=3.947, city="Ibadan")
+        Spot.objects.create(name="Mama Put", lat=6.5172, lng=3.3781, city="Lagos", address="Oke-Àdó")
+
+    def search(self, query: str):
+        return list(selectors.search_spots(Spot.objects.all(), query).values_list("name", flat=True))
+
+    def test_fts_query(self):
+        self.assertEqual(selectors.build_fts_query("Gbẹ̀gìrì  oyo!"), '"gbegiri"* "oyo"*')
+        self.assertEqual(selectors.build_fts_query("  "), "")
+
+    def test_tone_marked_queries(self):
+        for query in ("gbẹ̀gìrì", "Gbẹ̀gìrì", "GBEGIRI", "gbeg", "iya gbẹ̀"):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query), ["Iya Gbẹ̀gìrì Buka"])
+        self.assertEqual(self.search("oke ado"), ["Mama Put"])
+        self.assertEqual(self.search("gbegiri lagos"), [])
+
+    def test_query_filter(self):
+        response = self.client.get("/spots/", {"format": "json", "query": "Gbẹ̀gìrì"})
+        self.assertEqual([spot["name"] for spot in response.json()], ["Iya Gbẹ̀gìrì Buka"])
+
+
+class AsyncSpotListTest(TestCase):
+
+    async def test_invalid_cursor(self):
+        for path in ("/spots/", "/async/spots/"):
+            with self.subTest(path=path):
+                response = await self.async_client.get(path, {"format": "json", "cursor": "zzz"})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {"detail": "Invalid cursor"})
+
+    async def test_error_bodies_match_the_sync_views(self):
+        spot = await Spot.objects.acreate(name="Amala Skoto", lat=6.5172, lng=3.3781)
+        for path, params, status in (
+            ("spots/999999/", {}, 404),
+            ("spots/", {"open_at": "someday"}, 400),
+            (f"spots/{spot.pk}/", {"open_at": "someday"}, 400),
+        ):
+            with self.subTest(path=path, params=params):
+                sync = await self.async_client.get(f"/{path}", {"format": "json", **params})
+                async_ = await self.async_client.get(f"/async/{path}", {"format": "json", **params})
+                self.assertEqual((sync.status_code, async_.status_code), (status, status))
+                self.assertEqual(async_.json(), sync.json())
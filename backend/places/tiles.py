@@ -0,0 +1,180 @@
+"""
+Spot points as Mapbox Vector Tiles (https://github.com/mapbox/vector-tile-spec, v2), with an on-disk tile cache.
+
+The encoder only covers what the spots layer needs (point features with string attributes),
+so there is no protobuf dependency. Cached tiles are keyed by TILE_SCHEMA_VERSION; bump it
+whenever the layer's attributes or encoding change. Saving or deleting a spot only drops
+the tiles containing its old and new positions (see places.signals); a tile encoded while
+the spots dataset version moved is not kept, as it may predate that write. Writers that
+bypass the model signals (bulk_create, queryset.update) must `clear()` the cache.
+"""
+import os
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from commons.versioning import get_version
+from places import selectors
+from places.geo import mercator_cell, mercator_cell_bounds, mercator_position
+from places.models import Spot
+
+TILE_SCHEMA_VERSION = 1
+TILE_MIN_ZOOM = 0
+TILE_MAX_ZOOM = 18
+TILE_EXTENT = 4096
+TILE_LAYER = "spots"
+TILE_CONTENT_TYPE = "application/vnd.mapbox-vector-tile"
+TILE_ATTRIBUTES = ("public_id", "name", "price_band", "tags")
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint((field << 3) | wire_type)
+
+
+def _length_delimited(field: int, payload: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(payload)) + payload
+
+
+def _packed(field: int, values: Iterable[int]) -> bytes:
+    return _length_delimited(field, b"".join(_varint(v) for v in values))
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(min_lng, min_lat, max_lng, max_lat) of a slippy-map tile."""
+    return mercator_cell_bounds(1 << z, x, y)
+
+
+def tile_for(lat: float, lng: float, z: int) -> Tuple[int, int]:
+    return mercator_cell(lat, lng, 1 << z)
+
+
+def tiles_containing(lat: float, lng: float, z: int) -> List[Tuple[int, int]]:
+    """
+    Every tile whose bounds contain the point. Bounds are inclusive, as in spots_in_tile, so a
+    point on a tile edge (or corner) is encoded in two (or four) tiles.
+    """
+    n = 1 << z
+    column, row = tile_for(lat, lng, z)
+    found = []
+    for x in range(max(0, column - 1), min(n, column + 2)):
+        for y in range(max(0, row - 1), min(n, row + 2)):
+            min_lng, min_lat, max_lng, max_lat = tile_bounds(z, x, y)
+            if min_lng <= lng <= max_lng and min_lat <= lat <= max_lat:
+                found.append((x, y))
+    return found
+
+
+def _tile_pixel(lat: float, lng: float, z: int, x: int, y: int) -> Tuple[int, int]:
+    world_x, world_y = mercator_position(lat, lng, 1 << z)
+    return int(round((world_x - x) * TILE_EXTENT)), int(round((world_y - y) * TILE_EXTENT))
+
+
+def encode_tile(z: int, x: int, y: int, rows: Iterable[tuple]) -> bytes:
+    """rows: (id, public_id, name, price_band, tags, lat, lng) tuples."""
+    keys = {name: i for i, name in enumerate(TILE_ATTRIBUTES)}
+    values: dict = {}
+    features: List[bytes] = []
+    for spot_id, public_id, name, price_band, tags, lat, lng in rows:
+        attributes = (str(public_id), name or "", price_band or "", ",".join(tags or []))
+        tags_field = []
+        for attribute, value in zip(TILE_ATTRIBUTES, attributes):
+            if value == "":
+                continue
+            tags_field += [keys[attribute], values.setdefault(value, len(values))]
+        px, py = _tile_pixel(lat, lng, z, x, y)
+        features.append(
+            _key(1, 0) + _varint(spot_id)
+            + _packed(2, tags_field)
+            + _key(3, 0) + _varint(1)  # POINT
+            + _packed(4, (9, _zigzag(px), _zigzag(py)))  # MoveTo(1)
+        )
+
+    layer = _key(15, 0) + _varint(2) + _length_delimited(1, TILE_LAYER.encode())
+    layer += b"".join(_length_delimited(2, feature) for feature in features)
+    layer += b"".join(_length_delimited(3, key.encode()) for key in TILE_ATTRIBUTES)
+    layer += b"".join(_length_delimited(4, _length_delimited(1, value.encode())) for value in values)
+    layer += _key(5, 0) + _varint(TILE_EXTENT)
+    return _length_delimited(3, layer)
+
+
+def spots_in_tile(z: int, x: int, y: int) -> QuerySet:
+    return selectors.filter_spots_in_bbox(Spot.objects.order_by("id"), *tile_bounds(z, x, y)).values_list(
+        "id", "public_id", "name", "price_band", "tags", "lat", "lng",
+    )
+
+
+def _cache_root() -> Path:
+    return Path(settings.SPOT_TILE_CACHE_DIR) / f"v{TILE_SCHEMA_VERSION}"
+
+
+def _cache_path(z: int, x: int, y: int) -> Path:
+    return _cache_root() / str(z) / str(x) / f"{y}.pbf"
+
+
+def get_tile(z: int, x: int, y: int) -> bytes:
+    path = _cache_path(z, x, y)
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+    version = get_version("spots")
+    data = encode_tile(z, x, y, spots_in_tile(z, x, y))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp, path)
+    # A spot write that commits after this check invalidates the tile after it was written. One
+    # that committed since the read above may have run its invalidation before the write: drop it.
+    if get_version("spots") != version:
+        _unlink(path)
+    return data
+
+
+def _unlink(path: Path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def invalidate_position(lat: float, lng: float):
+    """Drops every cached tile containing (lat, lng), at every zoom level."""
+    for z in range(TILE_MIN_ZOOM, TILE_MAX_ZOOM + 1):
+        for x, y in tiles_containing(lat, lng, z):
+            _unlink(_cache_path(z, x, y))
+
+
+def clear():
+    """
+    Drops every cached tile. The tree is renamed away before it is deleted, so requests
+    meanwhile miss and re-encode instead of reading from a half-deleted cache.
+    """
+    root = _cache_root()
+    stale = root.with_name(f"{root.name}.stale-{uuid.uuid4().hex}")
+    try:
+        os.replace(root, stale)
+    except FileNotFoundError:
+        return
+    shutil.rmtree(stale, ignore_errors=True)
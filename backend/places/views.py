@@ -1,16 +1,30 @@
 from json import JSONDecodeError
 
-from django.http import JsonResponse
+from django.db import transaction
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views import View
 from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
 from rest_framework import views, status, viewsets, pagination, generics
+from rest_framework.decorators import action
 from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.status import HTTP_201_CREATED
-
-from places import services
-from places.filters import GetSpotsFilter
+from rest_framework.status import HTTP_202_ACCEPTED
+
+from commons.cache import VersionedResponseCache
+from commons.models import Job
+from commons.pagination import KeysetPagination
+from commons.renderers import NDJSONRenderer, astream_ndjson
+from commons.views import AsyncJSONView, NDJSONStreamingListMixin, ReadReplicaMixin, ValuesListMixin, VersionedCacheMixin
+from places import clusters, selectors, tiles
+from places import jobs as places_jobs
+from places.filters import GetSpotsFilter, resolve_open_now
 from places.models import Spot, Submission, Candidate
-from places.serializers import SpotSerializer, GetSpotSerializer, CandidateSubmissionSerializer
+from places.serializers import SpotSerializer, GetSpotSerializer, CandidateSubmissionSerializer, NearbySpotSerializer, \
+    NearbySpotsQuerySerializer, SpotClusterSerializer, SpotClustersQuerySerializer, \
+    TagFacetSerializer
 
 
 class SpotApiView(views.APIView):
@@ -46,21 +60,136 @@ class SpotPagination(pagination.PageNumberPagination):
     max_page_size = 10
 
 
-"""
+class SpotCursorPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
 
 """
-class SpotViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Spot.objects.all().order_by("-created_at")
+Spots, newest first. Filters: bbox, city, price_band, tags, query, and open_now=true / open_at=
+(ISO datetime or "sat 19:30", Africa/Lagos time) through the SpotOpenInterval index.
+Unpaginated unless `cursor`/`page_size` is given (see KeysetPagination);
+`?format=ndjson` streams the full filtered set; both are rendered from `.values_list()` rows
+(commons.views.ValuesListMixin). List and detail responses are cached per spots dataset version
+and carry ETags.
+"""
+class SpotViewSet(ReadReplicaMixin, VersionedCacheMixin, ValuesListMixin, NDJSONStreamingListMixin,
+                  viewsets.ReadOnlyModelViewSet):
+    cache_dataset = "spots"
+    response_cache = VersionedResponseCache("spots")
+    queryset = Spot.objects.all().order_by("-created_at", "-id")
     serializer_class = GetSpotSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = GetSpotsFilter
-    pagination_class = None
+    pagination_class = SpotCursorPagination
+
+    def cache_query_params(self, params):
+        return resolve_open_now(params)
+
+    """
+    /spots/nearby/?lat=&lng=&k=&radius_km= : the k closest spots within radius_km, nearest first.
+    The usual spot filters (city, price_band, tags, query) still apply.
+    """
+    @action(detail=False, methods=["get"])
+    def nearby(self, request):
+        params = NearbySpotsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        spots = selectors.get_nearby_spots(self.filter_queryset(self.get_queryset()), **params.validated_data)
+        return Response(NearbySpotSerializer(spots, many=True, context=self.get_serializer_context()).data)
+
+    """
+    /spots/clusters/?bbox=min_lng,min_lat,max_lng,max_lat&zoom= : precomputed grid clusters for a map viewport,
+    each with its centroid, spot count and a representative spot. Spot filters do not apply here.
+    """
+    @action(detail=False, methods=["get"])
+    def clusters(self, request):
+        params = SpotClustersQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = clusters.clusters_in_bbox(params.validated_data["zoom"], *params.validated_data["bbox"])
+        return Response(SpotClusterSerializer(queryset, many=True, context=self.get_serializer_context()).data)
+
+    """
+    /spots/tags/ : spot count per tag, computed from the SpotTag index.
+    Narrowed to the matching spots when any spot filter is given.
+    """
+    @action(detail=False, methods=["get"])
+    def tags(self, request):
+        spots = None
+        if any(name in request.query_params for name in self.filterset_class.base_filters):
+            spots = self.filter_queryset(self.get_queryset())
+        return Response(TagFacetSerializer(selectors.get_tag_facets(spots), many=True).data)
+
+
+class AsyncSpotView(ReadReplicaMixin, AsyncJSONView):
+    cache_dataset = "spots"
+    response_cache = VersionedResponseCache("spots_async")
+
+    def cache_query_params(self, params):
+        return resolve_open_now(params)
+
+    def filtered(self, request: Request):
+        """The spot filters of SpotViewSet, with the same ValidationError as DjangoFilterBackend when they do not validate."""
+        filterset = GetSpotsFilter(request.query_params, queryset=SpotViewSet.queryset.all(), request=request)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        return filterset.qs
+
+
+"""
+/async/spots/ : SpotViewSet.list for the ASGI application, same filters, keyset pagination,
+NDJSON streaming and bodies, fetched through the async ORM.
+"""
+class AsyncSpotListView(AsyncSpotView):
+
+    async def get(self, request):
+        api_request = Request(request)  # query_params and absolute URIs for the filterset and paginator
+        queryset = self.filtered(api_request)
+        if api_request.query_params.get("format") == NDJSONRenderer.format:
+            return astream_ndjson(queryset, GetSpotSerializer, {"request": api_request})
+        return await self.cached(request, "list", lambda: self._list(api_request, queryset))
+
+    async def _list(self, request: Request, queryset) -> HttpResponse:
+        context = {"request": request}
+        paginator = SpotCursorPagination()
+        page = await paginator.apaginate_queryset(queryset, request)
+        if page is None:
+            return self.render(GetSpotSerializer([spot async for spot in queryset], many=True, context=context).data)
+        return self.render(paginator.get_paginated_response(GetSpotSerializer(page, many=True, context=context).data).data)
+
+
+"""
+/async/spots/{id}/ : SpotViewSet.retrieve for the ASGI application.
+"""
+class AsyncSpotDetailView(AsyncSpotView):
+
+    async def get(self, request, pk):
+        return await self.cached(request, "retrieve", lambda: self._retrieve(Request(request), pk))
+
+    async def _retrieve(self, request: Request, pk) -> HttpResponse:
+        spot = await self.filtered(request).filter(pk=pk).afirst()
+        if spot is None:
+            raise Http404("No Spot matches the given query.")
+        return self.render(GetSpotSerializer(spot, context={"request": request}).data)
+
+
+"""
+/spots/tiles/{z}/{x}/{y}.pbf : spot points as a Mapbox Vector Tile (layer "spots"),
+carrying only public_id, name, price_band and tags. Served from the on-disk tile cache.
+"""
+class SpotTileView(ReadReplicaMixin, View):
+
+    def get(self, request, z, x, y):
+        if not tiles.TILE_MIN_ZOOM <= z <= tiles.TILE_MAX_ZOOM or x >= 1 << z or y >= 1 << z:
+            raise Http404("Tile out of range")
+        response = HttpResponse(tiles.get_tile(z, x, y), content_type=tiles.TILE_CONTENT_TYPE)
+        response["Cache-Control"] = "public, max-age=300"
+        return response
 
 
 """
 Accepts both manual and agentic submissions.
 - Saves a Submission row (audit)
-- Creates a Candidate with status=pending_verification
+- Enqueues the Candidate creation (status=pending_verification) as a background job,
+  polled at /submit-candidate/<submission_id>/
 """
 class CandidateSubmissionView(generics.CreateAPIView):
 
@@ -70,11 +199,27 @@ class CandidateSubmissionView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        submission: Submission = serializer.save(submitted_by=request.user if getattr(request, 'user', None) and request.user.is_authenticated else None)
-        candidate: Candidate = services.create_candidate_from_submission(submission)
+        with transaction.atomic():
+            submission: Submission = serializer.save(submitted_by=request.user if getattr(request, 'user', None) and request.user.is_authenticated else None)
+            job = places_jobs.enqueue_candidate_creation(submission)
 
         return Response(
             {
-                "ok": True, "candidate_id": candidate.public_id,
-                "status": candidate.status, "score":candidate.score
-            }, status=HTTP_201_CREATED)
+                "ok": True, "submission_id": submission.public_id, "status": job.status,
+            }, status=HTTP_202_ACCEPTED)
+
+
+class CandidateSubmissionStatusView(ReadReplicaMixin, views.APIView):
+
+    def get(self, request, public_id):
+        submission = get_object_or_404(Submission.objects.select_related("candidate"), public_id=public_id)
+        job = places_jobs.get_candidate_creation_job(submission)
+        candidate = submission.candidate
+        return Response({
+            "submission_id": submission.public_id,
+            "status": Job.Status.SUCCEEDED if candidate else (job.status if job else Job.Status.QUEUED),
+            "attempts": job.attempts if job else 0,
+            "candidate_id": candidate.public_id if candidate else None,
+            "candidate_status": candidate.status if candidate else None,
+            "score": candidate.score if candidate else None,
+        })
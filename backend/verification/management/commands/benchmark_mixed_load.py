@@ -0,0 +1,146 @@
+import itertools
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+
+from commons.benchmark import scratch_database, summarize
+from places.management.commands._bench import MAX_LAT, MAX_LNG, MIN_LAT, MIN_LNG, populate_random_spots
+from places.models import Candidate
+from users.models import User
+from verification import services
+from verification.views import candidate_queue
+
+
+class Command(BaseCommand):
+    help = ("Throughput of concurrent reads (/spots/nearby/, /verify/queue/) and review votes on a scratch "
+            "database, under the active DATABASE_PROFILE (run once per profile to compare). --votes picks how "
+            "writers choose candidates: random ones, the top of the queue (every reviewer on the same few), or "
+            "leased batches (verification.services.claim_candidates). Contended votes are those cast while "
+            "another reviewer's vote on the same candidate was in flight, i.e. waiting on its row lock.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--spots", type=int, default=50_000)
+        parser.add_argument("--candidates", type=int, default=5_000)
+        parser.add_argument("--reviewers", type=int, default=50)
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load.")
+        parser.add_argument("--votes", choices=("random", "top", "claim"), default="random")
+        parser.add_argument("--claim-size", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with scratch_database() as connection:
+            populate_random_spots(rng, options["spots"])
+            Candidate.objects.bulk_create([
+                Candidate(name=f"Candidate {i}", lat=rng.uniform(MIN_LAT, MAX_LAT), lng=rng.uniform(MIN_LNG, MAX_LNG),
+                          score=round(rng.random(), 3))
+                for i in range(options["candidates"])
+            ], batch_size=2000)
+            candidate_ids = list(Candidate.objects.values_list("id", flat=True))
+            reviewers = User.objects.bulk_create([User(username=f"reviewer{i}") for i in range(options["reviewers"])])
+            with connection.cursor() as cursor:
+                journal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+            connection.close()
+
+            samples = defaultdict(list)
+            errors = Counter()
+            in_flight = Counter()  # candidate id -> votes being recorded on it
+            contended = [0]
+            lock = threading.Lock()
+            barrier = threading.Barrier(options["readers"] + options["writers"] + 1)
+            deadline = [0.0]
+
+            def run(kind, operation, seed):
+                local_rng = random.Random(seed)
+                local_samples = defaultdict(list)
+                try:
+                    barrier.wait()
+                    while time.perf_counter() < deadline[0]:
+                        name = None
+                        started = time.perf_counter()
+                        try:
+                            name = operation(local_rng)
+                        except Exception as exc:
+                            with lock:
+                                errors[f"{kind}: {type(exc).__name__}: {exc}"] += 1
+                            continue
+                        local_samples[name].append((time.perf_counter() - started) * 1000)
+                finally:
+                    connections.close_all()
+                    with lock:
+                        for name, values in local_samples.items():
+                            samples[name] += values
+
+            clients = threading.local()
+
+            def read(local_rng):
+                client = clients.__dict__.setdefault("client", Client())
+                if local_rng.random() < 0.5:
+                    response = client.get("/spots/nearby/", {
+                        "lat": local_rng.uniform(MIN_LAT, MAX_LAT), "lng": local_rng.uniform(MIN_LNG, MAX_LNG),
+                        "k": 10, "radius_km": 25, "format": "json",
+                    })
+                    name = "GET /spots/nearby/"
+                else:
+                    response = client.get("/verify/queue/", {"page_size": 50, "format": "json"})
+                    name = "GET /verify/queue/"
+                assert response.status_code == 200, response.status_code
+                return name
+
+            writers = threading.local()
+            assigned = itertools.cycle(reviewers)  # one reviewer per writer thread
+
+            def next_candidate(local_rng, reviewer):
+                if options["votes"] == "random":
+                    return local_rng.choice(candidate_ids)
+                if options["votes"] == "top":
+                    return candidate_queue({}).exclude(verifications__by_user=reviewer).values_list("id", flat=True)[0]
+                claimed = writers.__dict__.setdefault("claimed", [])
+                if not claimed:
+                    claimed += [candidate.id for candidate in
+                                services.claim_candidates(reviewer, options["claim_size"]).candidates]
+                return claimed.pop(0)
+
+            def write(local_rng):
+                if not hasattr(writers, "reviewer"):
+                    with lock:
+                        writers.reviewer = next(assigned)
+                reviewer = writers.reviewer
+                candidate_id = next_candidate(local_rng, reviewer)
+                with lock:
+                    contended[0] += bool(in_flight[candidate_id])
+                    in_flight[candidate_id] += 1
+                try:
+                    services.record_vote(candidate_id, reviewer, local_rng.choice(("approve", "reject")))
+                finally:
+                    with lock:
+                        in_flight[candidate_id] -= 1
+                return "vote"
+
+            threads = [threading.Thread(target=run, args=("read", read, i)) for i in range(options["readers"])]
+            threads += [threading.Thread(target=run, args=("write", write, 1000 + i)) for i in range(options["writers"])]
+            for thread in threads:
+                thread.start()
+            deadline[0] = time.perf_counter() + options["duration"]
+            barrier.wait()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(
+            f"profile={settings.DATABASE_PROFILE} journal_mode={journal_mode} "
+            f"readers={options['readers']} writers={options['writers']} votes={options['votes']} "
+            f"duration={options['duration']}s"
+        )
+        for name, values in sorted(samples.items()):
+            self.stdout.write(f"  {name}: {len(values) / options['duration']:.1f}/s {summarize(values)}")
+        self.stdout.write(f"  contended votes: {contended[0]} of {len(samples['vote'])}")
+        for error, count in errors.most_common():
+            self.stdout.write(self.style.WARNING(f"  {count} x {error}"))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:00
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('places', '0006_candidate_open_hours_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # The table itself is created by places.0006, which renames the old places_verification.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Verification',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('created_at', models.DateTimeField(auto_now_add=True)),
+                        ('last_modified_at', models.DateTimeField(auto_now=True, null=True)),
+                        ('public_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                        ('action', models.CharField(choices=[('approve', 'Approve'), ('reject', 'Reject'), ('merge', 'Merge'), ('edit', 'Edit')], max_length=10)),
+                        ('notes', models.TextField(blank=True)),
+                        ('by_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                        ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='verifications', to='places.candidate')),
+                    ],
+                    options={
+                        'abstract': False,
+                    },
+                ),
+            ],
+        ),
+    ]
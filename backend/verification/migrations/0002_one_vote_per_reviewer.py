@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:43
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def drop_duplicate_votes(apps, schema_editor):
+    """Keeps the latest vote per (candidate, reviewer); the old view also wrote an extra anonymous row per vote."""
+    Verification = apps.get_model('verification', 'Verification')
+    duplicated = (
+        Verification.objects.values('candidate_id', 'by_user_id')
+        .annotate(n=Count('id'), keep=Max('id')).filter(n__gt=1)
+    )
+    for group in duplicated.iterator():
+        Verification.objects.filter(candidate_id=group['candidate_id'], by_user_id=group['by_user_id']) \
+            .exclude(id=group['keep']).delete()
+
+
+def backfill_vote_counters(apps, schema_editor):
+    Candidate = apps.get_model('places', 'Candidate')
+    counts = Candidate.objects.annotate(
+        approvals=Count('verifications', filter=Q(verifications__action='approve')),
+        rejections=Count('verifications', filter=Q(verifications__action='reject')),
+    ).filter(Q(approvals__gt=0) | Q(rejections__gt=0)).values_list('id', 'approvals', 'rejections')
+    for candidate_id, approvals, rejections in counts.iterator():
+        Candidate.objects.filter(id=candidate_id).update(approvals_count=approvals, rejections_count=rejections)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0014_candidate_vote_counters'),
+        ('verification', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_votes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='verification',
+            constraint=models.UniqueConstraint(condition=models.Q(('by_user__isnull', False)), fields=('candidate', 'by_user'), name='uniq_verification_candidate_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='verification',
+            constraint=models.UniqueConstraint(condition=models.Q(('by_user__isnull', True)), fields=('candidate',), name='uniq_verification_candidate_anonymous'),
+        ),
+        migrations.RunPython(backfill_vote_counters, migrations.RunPython.noop),
+    ]
@@ -21,4 +21,13 @@ class Verification(BaseModel):
     notes       = models.TextField(blank=True)
     by_user  = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
 
+    class Meta:
+        # one vote per reviewer per candidate; anonymous votes share a single slot
+        constraints = [
+            models.UniqueConstraint(fields=["candidate", "by_user"], condition=models.Q(by_user__isnull=False),
+                                    name="uniq_verification_candidate_user"),
+            models.UniqueConstraint(fields=["candidate"], condition=models.Q(by_user__isnull=True),
+                                    name="uniq_verification_candidate_anonymous"),
+        ]
+
 
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 
-from places.models import Candidate
+from places.models import Candidate, Spot
 from . import models
 from .models import Verification
+from .services import CLAIM_MAX_COUNT
 
 
 class VerificationSerializer(serializers.ModelSerializer):
@@ -22,7 +23,25 @@ class VerificationActionSerializer(serializers.Serializer):
     merge_into_spot_id = serializers.IntegerField(required=False)
 
 
+class ClaimSerializer(serializers.Serializer):
+    count = serializers.IntegerField(min_value=1, max_value=CLAIM_MAX_COUNT, default=10)
+    lease_seconds = serializers.IntegerField(min_value=30, max_value=60 * 60, required=False)
+
+
+class ReleaseSerializer(serializers.Serializer):
+    candidate_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+
+class SuggestedSpotSerializer(serializers.ModelSerializer):
+    class Meta:
+        model  = Spot
+        fields = ("id","public_id","name","address","city","lat","lng")
+
+
 class CandidateQueueSerializer(serializers.ModelSerializer):
+    suggested_spot = SuggestedSpotSerializer(read_only=True)
+
     class Meta:
         model  = Candidate
-        fields = ("id","name","city","score","source_kind","evidence","signals","lat","lng","raw_address")
+        fields = ("id","name","city","score","source_kind","evidence","signals","lat","lng","raw_address","tags",
+                  "suggested_spot","suggested_spot_score","near_duplicate_cluster")
@@ -0,0 +1,217 @@
+import datetime
+from typing import Dict, List, NamedTuple, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
+
+from media import jobs as media_jobs
+from places.models import Candidate, Spot
+from places.services import normalize_tags
+from users.models import User
+from verification.models import Verification
+
+APPROVE_THRESHOLD = 2
+REJECT_THRESHOLD  = 3
+CLAIM_MAX_COUNT   = 50  # candidates per claim
+
+_COUNTER_FIELDS = {
+    Verification.Actions.APPROVE: "approvals_count",
+    Verification.Actions.REJECT: "rejections_count",
+}
+
+
+class Claim(NamedTuple):
+    candidates: List[Candidate]
+    expires_at: datetime.datetime
+
+
+class VoteResult(NamedTuple):
+    candidate: Candidate
+    approvals: int
+    rejections: int
+    spot: Spot | None  # set when this vote approved the candidate
+
+
+def _upsert_vote(candidate_id: int, user: User | None, action: str, notes: str) -> str | None:
+    """Returns the reviewer's previous action, None on their first vote."""
+    votes = Verification.objects.filter(candidate_id=candidate_id, by_user=user)
+    previous = votes.values_list("action", flat=True).first()
+    if previous is not None:
+        votes.update(action=action, notes=notes, last_modified_at=timezone.now())
+        return previous
+    try:
+        with transaction.atomic():
+            Verification.objects.create(candidate_id=candidate_id, action=action, notes=notes, by_user=user)
+    except IntegrityError:
+        # the same reviewer's concurrent request won the insert (only possible without a row lock)
+        previous = votes.values_list("action", flat=True).get()
+        votes.update(action=action, notes=notes, last_modified_at=timezone.now())
+    return previous
+
+
+def _lock_candidate(candidate_id: int, user: User | None) -> bool:
+    """
+    The first statement of a vote or merge: a write to the candidate row, which takes its row lock
+    (SQLite: the database write lock) up front. It also ends the reviewer's lease on the candidate.
+    False if the candidate does not exist.
+    """
+    changes = {"last_modified_at": timezone.now()}
+    if user is not None:
+        changes["leased_by"] = Case(When(leased_by=user, then=None), default=F("leased_by"))
+        changes["lease_expires_at"] = Case(When(leased_by=user, then=None), default=F("lease_expires_at"))
+    return bool(Candidate.objects.filter(pk=candidate_id).update(**changes))
+
+
+@transaction.atomic
+def claim_candidates(user: User, count: int, lease_seconds: int | None = None) -> Claim:
+    """
+    Leases the reviewer the next `count` pending candidates, in queue order, that they have not
+    voted on and nobody else holds; their earlier leases are released. The lease is taken by one
+    UPDATE ... WHERE id IN (SELECT ... LIMIT count FOR UPDATE SKIP LOCKED): on PostgreSQL a
+    concurrent claim skips the rows another one has locked instead of re-reading them after its
+    commit; SQLite ignores the lock clause, its single writer already serializes the UPDATEs.
+    Expired leases are not swept, a claim simply treats them as free.
+    """
+    now = timezone.now()
+    expires_at = now + datetime.timedelta(seconds=lease_seconds or settings.VERIFICATION_LEASE_SECONDS)
+    claimable = (
+        Candidate.objects.filter(status="pending_verification")
+        .filter(Q(leased_by__isnull=True) | Q(lease_expires_at__lte=now) | Q(leased_by=user))
+        .exclude(verifications__by_user=user)
+        .order_by("-score", "-created_at", "-id")
+        .select_for_update(skip_locked=True)
+        .values("id")[:min(count, CLAIM_MAX_COUNT)]
+    )
+    Candidate.objects.filter(id__in=claimable).update(leased_by=user, lease_expires_at=expires_at)
+    Candidate.objects.filter(leased_by=user).exclude(lease_expires_at=expires_at).update(
+        leased_by=None, lease_expires_at=None)
+    candidates = list(
+        Candidate.objects.filter(leased_by=user, lease_expires_at=expires_at)
+        .select_related("suggested_spot").order_by("-score", "-created_at", "-id")
+    )
+    return Claim(candidates, expires_at)
+
+
+def release_candidates(user: User, candidate_ids: List[int] | None = None) -> int:
+    """Ends the reviewer's leases, on the given candidates or on all of them."""
+    leased = Candidate.objects.filter(leased_by=user)
+    if candidate_ids is not None:
+        leased = leased.filter(id__in=candidate_ids)
+    return leased.update(leased_by=None, lease_expires_at=None)
+
+
+def _candidate_photo_urls(candidate: Candidate) -> List[str]:
+    urls = [candidate.photo_url] + [item.get("photo_url") for item in candidate.evidence or [] if isinstance(item, dict)]
+    return list(dict.fromkeys(url for url in urls if url))
+
+
+def _candidate_photos(candidate: Candidate) -> List[Dict[str, str]]:
+    """Spot.photos entries: the uploaded photo by media id, remote URLs until media.jobs imports them."""
+    at = timezone.now().isoformat()
+    photos = [{"media_id": candidate.photo_id, "at": at}] if candidate.photo_id else []
+    return photos + [{"url": url, "at": at} for url in _candidate_photo_urls(candidate)]
+
+
+def _apply_vote(candidate_id: int, user: User | None, action: str, notes: str):
+    """Upserts the vote and moves the counters by the difference from the reviewer's previous vote."""
+    previous = _upsert_vote(candidate_id, user, action, notes)
+    deltas = {}
+    if previous in _COUNTER_FIELDS and previous != action:
+        deltas[_COUNTER_FIELDS[previous]] = F(_COUNTER_FIELDS[previous]) - 1
+    if action in _COUNTER_FIELDS and previous != action:
+        deltas[_COUNTER_FIELDS[action]] = F(_COUNTER_FIELDS[action]) + 1
+    if deltas:
+        Candidate.objects.filter(pk=candidate_id).update(**deltas)
+
+
+def _promote(candidate: Candidate) -> Spot:
+    spot = Spot.objects.create(
+        name=candidate.name, lat=candidate.lat or 0.0, lng=candidate.lng or 0.0,
+        address=candidate.raw_address or "", city=candidate.city, country=candidate.country,
+        price_band=candidate.price_band or "", tags=list(candidate.tags or []),
+        photos=_candidate_photos(candidate),
+        open_hours=candidate.open_hours, evidence=list(candidate.evidence or []), source="verified",
+    )
+    media_jobs.enqueue_spot_photo_import(spot)
+    return spot
+
+
+@transaction.atomic
+def record_vote(candidate_id: int, user: User | None, action: str, notes: str = "") -> VoteResult | None:
+    """
+    Upserts the reviewer's approve/reject vote and moves the denormalized counters by the
+    difference, then applies the thresholds to the counters. None if the candidate does not exist.
+
+    The row lock is taken first (_lock_candidate), so concurrent votes queue behind it instead of
+    deadlocking on a read-then-write upgrade.
+    """
+    if not _lock_candidate(candidate_id, user):
+        return None
+
+    _apply_vote(candidate_id, user, action, notes)
+    candidate = Candidate.objects.get(pk=candidate_id)
+    spot = None
+    # only a pending candidate transitions: a late reject must not flip an approved candidate
+    # back, or the next approval would promote it into a second Spot
+    if action == Verification.Actions.APPROVE and candidate.approvals_count >= APPROVE_THRESHOLD \
+            and candidate.status == "pending_verification":
+        spot = _promote(candidate)
+        candidate.status = "approved"
+        candidate.save(update_fields=["status", "last_modified_at"])
+    elif action == Verification.Actions.REJECT and candidate.rejections_count >= REJECT_THRESHOLD \
+            and candidate.status == "pending_verification":
+        candidate.status = "rejected"
+        candidate.save(update_fields=["status", "last_modified_at"])
+    return VoteResult(candidate, candidate.approvals_count, candidate.rejections_count, spot)
+
+
+class MergeError(Exception):
+    pass
+
+
+def fold_candidate_into_spot(candidate: Candidate, spot: Spot) -> Spot:
+    """Adds the candidate's photos, evidence and tags to the spot, and its hours when the spot has none."""
+    known_photos = {
+        photo.get(key) for photo in spot.photos if isinstance(photo, dict) for key in ("media_id", "url", "source_url")
+    }
+    spot.photos = spot.photos + [
+        photo for photo in _candidate_photos(candidate) if (photo.get("media_id") or photo["url"]) not in known_photos
+    ]
+    spot.tags = normalize_tags([*spot.tags, *(candidate.tags or [])])
+    if not spot.open_hours and candidate.open_hours:
+        spot.open_hours = candidate.open_hours
+    if not spot.price_band and candidate.price_band:
+        spot.price_band = candidate.price_band
+    evidence = [item for item in candidate.evidence or [] if item not in spot.evidence]
+    evidence.append({"kind": "merge", "candidate_id": str(candidate.public_id), "source_url": candidate.source_url})
+    spot.evidence = spot.evidence + evidence
+    spot.save()
+    media_jobs.enqueue_spot_photo_import(spot)
+    return spot
+
+
+@transaction.atomic
+def merge_candidate(candidate_id: int, spot_id: int | None, user: User | None, notes: str = "") -> Tuple[Candidate, Spot] | None:
+    """
+    Folds a pending candidate into an existing Spot (the reviewer's pick, else the precomputed
+    suggestion) and records the merge as the reviewer's vote. None if the candidate does not exist.
+    """
+    if not _lock_candidate(candidate_id, user):
+        return None
+    candidate = Candidate.objects.get(pk=candidate_id)
+    if candidate.status != "pending_verification":
+        raise MergeError(f"Candidate is already {candidate.status}")
+    spot_id = spot_id or candidate.suggested_spot_id
+    if spot_id is None:
+        raise MergeError("No merge_into_spot_id given and no suggested spot for this candidate")
+    spot = Spot.objects.filter(pk=spot_id).first()
+    if spot is None:
+        raise MergeError(f"Spot {spot_id} does not exist")
+
+    _apply_vote(candidate_id, user, Verification.Actions.MERGE, notes)
+    fold_candidate_into_spot(candidate, spot)
+    candidate.status = "merged"
+    candidate.save(update_fields=["status", "last_modified_at"])
+    return candidate, spot
@@ -1,3 +1,182 @@
-from django.test import TestCase
+import datetime
+import threading
 
-# Create your tests here.
+from django.db import close_old_connections, connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from places import services as places_services
+from places.models import Candidate, Spot, Submission
+from users.models import User
+from verification import services
+from verification.models import Verification
+
+
+class ConcurrentVotesTest(TransactionTestCase):
+    reviewers = 12
+
+    def setUp(self):
+        self.candidate = Candidate.objects.create(name="Amala Skoto", lat=6.517, lng=3.378, city="Lagos")
+        self.users = [User.objects.create(username=f"reviewer{i}") for i in range(self.reviewers)]
+
+    def _in_parallel(self, votes):
+        barrier = threading.Barrier(len(votes))
+        errors = []
+
+        def vote(user, action):
+            try:
+                close_old_connections()
+                barrier.wait()
+                services.record_vote(self.candidate.pk, user, action)
+            except Exception as exc:  # surfaced in the main thread
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=vote, args=args) for args in votes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_parallel_reviewers(self):
+        half = self.reviewers // 2
+        self._in_parallel(
+            [(user, Verification.Actions.APPROVE) for user in self.users[:half]]
+            + [(user, Verification.Actions.REJECT) for user in self.users[half:]]
+        )
+        self.candidate.refresh_from_db()
+        self.assertEqual(self.candidate.approvals_count, half)
+        self.assertEqual(self.candidate.rejections_count, self.reviewers - half)
+        self.assertEqual(Verification.objects.filter(candidate=self.candidate).count(), self.reviewers)
+        self.assertIn(self.candidate.status, ("approved", "rejected"))
+        self.assertLessEqual(Spot.objects.count(), 1)
+
+    def test_parallel_approvals_promote_once(self):
+        self._in_parallel([(user, Verification.Actions.APPROVE) for user in self.users])
+        self.candidate.refresh_from_db()
+        self.assertEqual(self.candidate.approvals_count, self.reviewers)
+        self.assertEqual(self.candidate.status, "approved")
+        self.assertEqual(Spot.objects.count(), 1)
+
+    def test_same_reviewer_keeps_one_vote(self):
+        user = self.users[0]
+        self._in_parallel([(user, Verification.Actions.APPROVE)] * 4 + [(user, Verification.Actions.REJECT)] * 4)
+        self.candidate.refresh_from_db()
+        vote = Verification.objects.get(candidate=self.candidate, by_user=user)
+        self.assertEqual(self.candidate.approvals_count + self.candidate.rejections_count, 1)
+        counter = "approvals_count" if vote.action == Verification.Actions.APPROVE else "rejections_count"
+        self.assertEqual(getattr(self.candidate, counter), 1)
+
+    def test_changed_vote_moves_counters(self):
+        user = self.users[0]
+        services.record_vote(self.candidate.pk, user, Verification.Actions.APPROVE)
+        services.record_vote(self.candidate.pk, user, Verification.Actions.REJECT)
+        self.candidate.refresh_from_db()
+        self.assertEqual((self.candidate.approvals_count, self.candidate.rejections_count), (0, 1))
+
+
+class MergeTest(TestCase):
+    """Candidates get the spot they most likely duplicate as a stored suggestion, and MERGE folds them into it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.spot = Spot.objects.create(name="Amala Skoto", lat=6.5172, lng=3.3781, city="Lagos", tags=["ewedu"],
+                                       evidence=[{"kind": "web", "source_url": "https://example.com/skoto"}])
+        Spot.objects.create(name="Iya Basira", lat=7.3775, lng=3.947, city="Ibadan")
+
+    def create(self, **fields) -> Candidate:
+        return places_services.create_candidate_from_submission(Submission.objects.create(**fields))
+
+    def merge(self, candidate: Candidate, **data):
+        return self.client.post("/verify/action/", {"candidate_id": candidate.pk, "action": "merge", **data},
+                                content_type="application/json")
+
+    def test_suggestions(self):
+        nearby = self.create(name="AMALA SKOTO!", lat=6.5175, lng=3.3783, city="Lagos")
+        self.assertEqual(nearby.suggested_spot_id, self.spot.pk)
+        self.assertGreater(nearby.suggested_spot_score, 0.9)
+        by_name = self.create(name="Amala Skoto", city="Lagos")  # no coordinates: FTS name match in the city
+        self.assertEqual(by_name.suggested_spot_id, self.spot.pk)
+        self.assertIsNone(self.create(name="Amala Skoto", lat=6.6, lng=3.5, city="Lagos").suggested_spot_id)  # ~17 km away
+        self.assertIsNone(self.create(name="Buka Joint", lat=6.5172, lng=3.3781, city="Lagos").suggested_spot_id)
+
+    def test_merge_into_suggested_spot(self):
+        candidate = self.create(name="Amala Skoto", lat=6.5173, lng=3.3782, city="Lagos", tags=["Gbegiri", "ewedu"],
+                                price_band="₦")
+        response = self.merge(candidate)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["spot_id"], str(self.spot.public_id))
+        candidate.refresh_from_db()
+        self.spot.refresh_from_db()
+        self.assertEqual(candidate.status, "merged")
+        self.assertEqual(self.spot.tags, ["ewedu", "gbegiri"])
+        self.assertEqual(self.spot.price_band, "₦")
+        self.assertEqual(self.spot.evidence[-1]["candidate_id"], str(candidate.public_id))
+        self.assertEqual(Verification.objects.get(candidate=candidate).action, Verification.Actions.MERGE)
+        self.assertEqual(Spot.objects.count(), 2)
+        self.assertEqual(self.merge(candidate).status_code, 400)  # no longer pending
+
+    def test_merge_into_chosen_spot(self):
+        candidate = self.create(name="Buka Joint", city="Lagos")
+        self.assertEqual(self.merge(candidate).status_code, 400)  # nothing suggested, nothing chosen
+        other = Spot.objects.get(name="Iya Basira")
+        self.assertEqual(self.merge(candidate, merge_into_spot_id=other.pk).status_code, 200)
+        self.assertEqual(Candidate.objects.get(pk=candidate.pk).status, "merged")
+        self.assertEqual(self.merge(Candidate(pk=10 ** 6)).status_code, 404)
+
+
+class ConcurrentClaimsTest(TransactionTestCase):
+    reviewers = 50
+    claim_size = 3
+
+    def setUp(self):
+        Candidate.objects.bulk_create([Candidate(name=f"Candidate {i}", score=i / 100) for i in range(200)])
+        self.users = [User.objects.create(username=f"reviewer{i}") for i in range(self.reviewers)]
+
+    def test_parallel_claims_do_not_overlap(self):
+        barrier = threading.Barrier(self.reviewers)
+        claimed, errors = {}, []
+
+        def claim(user):
+            try:
+                close_old_connections()
+                barrier.wait()
+                claimed[user.pk] = [candidate.pk for candidate in services.claim_candidates(user, self.claim_size).candidates]
+            except Exception as exc:  # surfaced in the main thread
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=claim, args=(user,)) for user in self.users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        ids = [pk for pks in claimed.values() for pk in pks]
+        self.assertEqual(len(ids), self.reviewers * self.claim_size)
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_vote_ends_lease_and_expired_leases_are_reclaimed(self):
+        first, second = self.users[:2]
+        leased = services.claim_candidates(first, 2).candidates
+        services.record_vote(leased[0].pk, first, Verification.Actions.APPROVE)
+        self.assertIsNone(Candidate.objects.get(pk=leased[0].pk).leased_by_id)
+        self.assertNotIn(leased[0].pk, [c.pk for c in services.claim_candidates(first, 2).candidates])
+
+        Candidate.objects.filter(leased_by=first).update(lease_expires_at=timezone.now() - datetime.timedelta(seconds=1))
+        reclaimed = [candidate.pk for candidate in services.claim_candidates(second, 3).candidates]
+        self.assertIn(leased[0].pk, reclaimed)  # voted on by first only, so second may review it
+        self.assertIn(leased[1].pk, reclaimed)
+
+
+class AsyncVerificationQueueTest(TestCase):
+
+    async def test_invalid_cursor(self):
+        for path in ("/verify/queue/", "/async/verify/queue/"):
+            with self.subTest(path=path):
+                response = await self.async_client.get(path, {"format": "json", "cursor": "zzz"})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {"detail": "Invalid cursor"})
@@ -1,40 +1,113 @@
 import logging
 
-from django.db import transaction
+from django.http import Http404
 from rest_framework import generics, status
 from rest_framework.generics import ListAPIView, RetrieveAPIView, get_object_or_404
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
 from rest_framework.response import Response
 
-from places.models import Candidate, Spot
+from commons.pagination import KeysetPagination
+from commons.renderers import NDJSONRenderer, astream_ndjson
+from commons.views import AsyncJSONView, NDJSONStreamingListMixin, ReadReplicaMixin
+from places.models import Candidate
+from verification import services
 from verification.models import Verification
-from verification.serializers import VerificationSerializer, CandidateQueueSerializer, VerificationActionSerializer
-
-APPROVE_THRESHOLD = 2
-REJECT_THRESHOLD  = 3
+from verification.serializers import (
+    ClaimSerializer, ReleaseSerializer, VerificationSerializer, CandidateQueueSerializer, VerificationActionSerializer,
+)
 
 logger = logging.getLogger(__name__)
 
 
+class CandidateQueuePagination(KeysetPagination):
+    ordering = ("-score", "-created_at", "-id")
+
+
+def candidate_queue(params):
+    query_set = (
+        Candidate.objects.filter(status="pending_verification")
+        .select_related("suggested_spot")
+        .order_by('-score', '-created_at', '-id')
+    )
+    city = params.get('city', None)
+    src = params.get('source_kind', None)
+    if city: query_set = query_set.filter(city__iexact=city)
+    if src: query_set = query_set.filter(source_kind__iexact=src)
+    return query_set
+
+
 """
 List candidates pending verification, highest score first.
+Unpaginated unless `cursor`/`page_size` is given; `?format=ndjson` streams the full queue.
 """
-class GetVerificationCandidateQueue(ListAPIView):
+class GetVerificationCandidateQueue(ReadReplicaMixin, NDJSONStreamingListMixin, ListAPIView):
 
     serializer_class = CandidateQueueSerializer
+    pagination_class = CandidateQueuePagination
+    # Filtering happens in get_queryset; the JSON:API defaults would reject city/cursor/page_size
+    filter_backends = []
 
     def get_queryset(self):
-        query_set = Candidate.objects.filter(status="pending_verification").order_by('-score', '-created_at')
-        city = self.request.query_params.get('city', None)
-        src = self.request.query_params.get('source_kind', None)
-        if city: query_set = query_set.filter(city__iexact=city)
-        if src: query_set = query_set.filter(source_kind__iexact=src)
-        return query_set
+        return candidate_queue(self.request.query_params)
+
+
+"""
+/async/verify/queue/ : the same queue for the ASGI application, fetched through the async ORM.
+"""
+class AsyncVerificationCandidateQueue(ReadReplicaMixin, AsyncJSONView):
+
+    async def get(self, request):
+        api_request = Request(request)  # query_params and absolute URIs for the paginator
+        queryset = candidate_queue(api_request.query_params)
+        context = {"request": api_request}
+        if api_request.query_params.get("format") == NDJSONRenderer.format:
+            return astream_ndjson(queryset, CandidateQueueSerializer, context)
+        paginator = CandidateQueuePagination()
+        page = await paginator.apaginate_queryset(queryset, api_request)
+        if page is None:
+            return self.render(CandidateQueueSerializer([candidate async for candidate in queryset], many=True, context=context).data)
+        return self.render(paginator.get_paginated_response(CandidateQueueSerializer(page, many=True, context=context).data).data)
+
+
+"""
+POST /verify/claim/ {count, lease_seconds?} : leases the reviewer the next `count` queue candidates they
+have not voted on, so concurrent reviewers work on different ones. Replaces their earlier leases;
+voting on a candidate ends its lease.
+"""
+class ClaimCandidatesView(generics.GenericAPIView):
+    serializer_class = ClaimSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        claim = services.claim_candidates(request.user, serializer.validated_data["count"],
+                                          serializer.validated_data.get("lease_seconds"))
+        return Response({
+            "lease_expires_at": claim.expires_at,
+            "candidates": CandidateQueueSerializer(claim.candidates, many=True, context={"request": request}).data,
+        })
+
+
+"""
+POST /verify/release/ {candidate_ids?} : gives back the reviewer's leases, on the listed candidates or all.
+"""
+class ReleaseCandidatesView(generics.GenericAPIView):
+    serializer_class = ReleaseSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        released = services.release_candidates(request.user, serializer.validated_data.get("candidate_ids"))
+        return Response({"ok": True, "released": released})
 
 
 """
 
 """
-class GetVerificationCandidate(RetrieveAPIView):
+class GetVerificationCandidate(ReadReplicaMixin, RetrieveAPIView):
     queryset = Verification.objects.all()
     serializer_class = VerificationSerializer
     filterset_fields = ['city', 'source_kind']
@@ -46,7 +119,6 @@ class GetVerificationCandidate(RetrieveAPIView):
 class VerificationActionView(generics.CreateAPIView):
     serializer_class = VerificationActionSerializer
 
-    @transaction.atomic
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -55,49 +127,30 @@ class VerificationActionView(generics.CreateAPIView):
         action = serializer.validated_data['action']
         notes = serializer.validated_data.get("notes", "")
 
-        candidate: Candidate = get_object_or_404(Candidate.objects.select_for_update(), pk=candidate_id)
-
         user = getattr(request, "user", None)
         if user and not getattr(user, "is_authenticated", False):
             user = None
 
-        existing_q = candidate.verifications
-        if user:
-            existing_q = existing_q.filter(by_user=user)
-        else:
-            existing_q = existing_q.filter(by_user__isnull=True)
+        if action == Verification.Actions.MERGE:
+            try:
+                merged = services.merge_candidate(candidate_id, user=user, notes=notes,
+                                                  spot_id=serializer.validated_data.get("merge_into_spot_id"))
+            except services.MergeError as exc:
+                return Response({"error": str(exc)}, status=400)
+            if merged is None:
+                raise Http404("No Candidate matches the given query.")
+            return Response({"ok": True, "spot_id": merged[1].public_id, "message": "Candidate Merged"}, status=status.HTTP_200_OK)
 
-        value = existing_q.first()
-        if value:
-            value.action = action
-            value.notes = notes
-            value.save(update_fields=["action", "notes"])
-        else:
-            Verification.objects.create(candidate=candidate, action=action, notes=notes, by_user=user)
+        if action not in (Verification.Actions.APPROVE, Verification.Actions.REJECT):
+            return Response({"error": "unknown action"}, status=400)
 
-        Verification.objects.create(candidate=candidate, action=action, notes=notes)
-
-        approvals = candidate.verifications.filter(action=Verification.Actions.APPROVE).count()
-        rejects = candidate.verifications.filter(action=Verification.Actions.REJECT).count()
+        result = services.record_vote(candidate_id, user, action, notes)
+        if result is None:
+            raise Http404("No Candidate matches the given query.")
 
         if action == Verification.Actions.APPROVE:
-            if approvals >= APPROVE_THRESHOLD and candidate.status != "approved":
-                Spot.objects.create(
-                    name=candidate.name, lat=candidate.lat or 0.0, lng=candidate.lng or 0.0,
-                    address=candidate.raw_address or "", city=candidate.city, country=candidate.country,
-                    price_band=candidate.price_band or "", tags=[],
-                    photos=[{"url": candidate.photo_url}] if candidate.photo_url else [],
-                    open_hours=candidate.open_hours, source="verified",
-                )
-                candidate.status = "approved"
-                candidate.save(update_fields=["status"])
+            if result.spot is not None:
                 return Response({"ok": True}, status=status.HTTP_201_CREATED, )
+            return Response({"ok": True, "approvals": result.approvals}, status=status.HTTP_200_OK)
 
-        if action == Verification.Actions.REJECT:
-            if rejects >= REJECT_THRESHOLD and candidate.status != "rejected":
-                candidate.status = "rejected"
-                candidate.save(update_fields=["status"])
-            return Response({"ok": True, "rejections": rejects, "message": "Candidate Rejected"}, status=status.HTTP_200_OK)
-
-        return Response({"error": "unknown action"}, status=400)
-
+        return Response({"ok": True, "rejections": result.rejections, "message": "Candidate Rejected"}, status=status.HTTP_200_OK)